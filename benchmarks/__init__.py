@@ -0,0 +1,18 @@
+"""Замеры производительности страниц блога.
+
+    python -m benchmarks run --scale small --output before.json
+    python -m benchmarks run --scale small --output after.json
+    python -m benchmarks compare before.json after.json
+
+run заполняет отдельную БД синтетическими данными заданного масштаба
+(benchmarks/dataset.py, генератор команды seed_blog; заполненная БД
+переиспользуется между запусками),
+прогоняет сценарии из benchmarks/scenarios.py через тестовый клиент
+Django — задержка p50/p90/p99, число SQL-запросов и пиковый объём
+выделенной памяти на запрос — и нагружает те же адреса встроенным
+WSGI-генератором нагрузки в несколько потоков. Результат — JSON, который
+можно сравнивать между коммитами.
+
+Отдельные скрипты: asgi_vs_wsgi.py (uvicorn против gunicorn) и
+sqlite_contention.py (конкурентная запись в SQLite).
+"""
@@ -0,0 +1,157 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from . import env
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=env.PROJECT_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    database_url = env.setup(args.database_url, args.scale)
+    # Импорты моделей — только после django.setup()
+    import django
+    from django.test.utils import override_settings
+
+    from . import dataset, measure, scenarios
+
+    seeded = dataset.prepare(args.scale, args.seed, args.seed_workers)
+    if seeded:
+        print(f"Данные масштаба {args.scale}: {json.dumps(seeded)}")
+    overrides = {} if args.page_cache else {"BLOG_PAGE_CACHE_TIMEOUT": 0}
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "scale": args.scale,
+            "database": database_url.split(":", 1)[0],
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "page_cache": args.page_cache,
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "scenarios": {},
+        "load": {},
+    }
+    with override_settings(**overrides):
+        users = scenarios.bench_users()
+        selected = [
+            scenario
+            for scenario in scenarios.build_scenarios()
+            if not args.only or scenario.name in args.only
+        ]
+        for scenario in selected:
+            result = measure.measure_client(scenario, users, args.iterations)
+            if args.allocations:
+                result.update(measure.measure_allocations(scenario, users))
+            results["scenarios"][scenario.name] = result
+            print(
+                f"{scenario.name:24}{result['p50_ms']:>10} мс"
+                f"{result['p99_ms']:>10} мс{result['queries']:>5} SQL"
+            )
+        if args.concurrency:
+            # POST-сценарии требуют CSRF-токена и в нагрузку не входят
+            for scenario in selected:
+                if scenario.method != "GET":
+                    continue
+                result = measure.wsgi_load(
+                    scenario, users, args.concurrency, args.load_requests
+                )
+                results["load"][scenario.name] = result
+                print(f"{scenario.name:24}{result['rps']:>10} запр/с")
+
+    output = Path(args.output or f"benchmarks/results/{args.scale}-"
+                  f"{results['meta']['revision'] or 'local'}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2, ensure_ascii=False))
+    print(f"Результаты: {output}")
+
+
+COMPARED = (
+    ("scenarios", "p50_ms"),
+    ("scenarios", "p99_ms"),
+    ("scenarios", "queries"),
+    ("scenarios", "alloc_peak_kb"),
+    ("load", "rps"),
+)
+
+
+def compare(args):
+    before = json.loads(Path(args.before).read_text())
+    after = json.loads(Path(args.after).read_text())
+    print(
+        f"{before['meta']['revision']} -> {after['meta']['revision']}, "
+        f"масштаб {after['meta']['scale']}"
+    )
+    for section, metric in COMPARED:
+        for name, result in after.get(section, {}).items():
+            old = before.get(section, {}).get(name, {}).get(metric)
+            new = result.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            marker = ""
+            if abs(change) >= args.threshold:
+                marker = " <-" if (change > 0) != (metric == "rps") else ""
+            print(
+                f"{section:10}{name:24}{metric:14}{old:>10}{new:>10}"
+                f"{change:>+9.1f}%{marker}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="прогнать замеры")
+    run_parser.add_argument(
+        "--scale",
+        choices=("tiny", "small", "medium", "large"),
+        default="small",
+    )
+    run_parser.add_argument(
+        "--database-url",
+        help="БД замеров; по умолчанию benchmarks/.data/<масштаб>.sqlite3",
+    )
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--seed-workers", type=int, default=1,
+                            help="процессов для заполнения (seed_blog)")
+    run_parser.add_argument("--iterations", type=int, default=50)
+    run_parser.add_argument(
+        "--allocations", action=argparse.BooleanOptionalAction, default=True
+    )
+    run_parser.add_argument("--concurrency", type=int, default=8,
+                            help="потоков WSGI-нагрузки; 0 — без нагрузки")
+    run_parser.add_argument("--load-requests", type=int, default=500)
+    run_parser.add_argument("--page-cache", action="store_true",
+                            help="не отключать кэш страниц для анонимов")
+    run_parser.add_argument("--only", action="append",
+                            help="только указанные сценарии")
+    run_parser.add_argument("--output")
+
+    compare_parser = commands.add_parser("compare", help="сравнить два JSON")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="отмечать изменения больше, %%")
+
+    args = parser.parse_args()
+    {"run": run, "compare": compare}[args.command](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""Сравнение ASGI (uvicorn, асинхронные страницы) и WSGI (gunicorn).
+
+Запускает оба сервера на одной и той же БД, нагружает страницы блога
+заданным числом параллельных клиентов и печатает запросы в секунду,
+медиану и p99 времени ответа.
+
+    pip install uvicorn gunicorn
+    python benchmarks/asgi_vs_wsgi.py --concurrency 200 --requests 5000
+
+Серверы не поднимаются, если переданы --asgi-url/--wsgi-url: тогда
+нагружаются уже запущенные экземпляры. Перед замером заполните БД
+(например, manage.py loaddata db.json). Анонимные страницы лент
+отдаются из кэша страниц; чтобы сравнить именно рендеринг, задайте
+BLOG_PAGE_CACHE_TIMEOUT = 0.
+"""
+import argparse
+import http.client
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / "blogicum"
+DEFAULT_PATHS = ("/", "/posts/1/", "/category/travel/", "/profile/admin/")
+
+
+def start_server(kind, port, workers):
+    if kind == "asgi":
+        command = [
+            "uvicorn",
+            "blogicum.asgi:application",
+            "--port", str(port),
+            "--workers", str(workers),
+            "--no-access-log",
+        ]
+    else:
+        command = [
+            "gunicorn",
+            "blogicum.wsgi:application",
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers),
+            "--threads", "8",
+        ]
+    if shutil.which(command[0]) is None:
+        sys.exit(f"{command[0]} не установлен: pip install {command[0]}")
+    process = subprocess.Popen(
+        command,
+        cwd=PROJECT_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            http.client.HTTPConnection("127.0.0.1", port, timeout=1).request(
+                "GET", "/"
+            )
+            return process, base_url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    sys.exit(f"Сервер {kind} не запустился")
+
+
+def run_load(base_url, paths, concurrency, total):
+    address = urlsplit(base_url)
+    local = threading.local()
+    counter = iter(range(total))
+    lock = threading.Lock()
+
+    def next_index():
+        with lock:
+            return next(counter, None)
+
+    def worker():
+        # У каждого клиента своё keep-alive соединение
+        latencies, errors = [], 0
+        while (index := next_index()) is not None:
+            if not hasattr(local, "connection"):
+                local.connection = http.client.HTTPConnection(
+                    address.hostname, address.port, timeout=30
+                )
+            started = time.perf_counter()
+            try:
+                local.connection.request("GET", paths[index % len(paths)])
+                response = local.connection.getresponse()
+                response.read()
+                if response.status >= 500:
+                    errors += 1
+            except OSError:
+                errors += 1
+                del local.connection
+                continue
+            latencies.append(time.perf_counter() - started)
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: worker(), range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(value for values, _ in results for value in values)
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(
+            latencies[int(len(latencies) * 0.99) - 1] * 1000, 2
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--path", action="append", dest="paths")
+    parser.add_argument("--asgi-url")
+    parser.add_argument("--wsgi-url")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    paths = args.paths or DEFAULT_PATHS
+
+    report = {}
+    for kind, url, port in (
+        ("wsgi", args.wsgi_url, 8101),
+        ("asgi", args.asgi_url, 8102),
+    ):
+        process = None
+        if url is None:
+            process, url = start_server(kind, port, args.workers)
+        try:
+            run_load(url, paths, args.concurrency, min(200, args.requests))
+            report[kind] = run_load(
+                url, paths, args.concurrency, args.requests
+            )
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{'':6}{'rps':>10}{'p50, мс':>10}{'p99, мс':>10}{'ошибки':>8}")
+    for kind, result in report.items():
+        print(
+            f"{kind:6}{result['rps']:>10}{result['p50_ms']:>10}"
+            f"{result['p99_ms']:>10}{result['errors']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Синтетические данные для замеров.
+
+Объёмы задаются масштабом (SCALES); данные генерирует blog.seeding —
+то же, что и команда seed_blog: неравномерные авторы и «горячие»
+публикации, отложенные и скрытые записи.
+"""
+from django.core.management import call_command
+
+from blog.models import Post
+from blog.seeding import seed as seed_blog
+
+SCALES = {
+    "tiny": {
+        "users": 50,
+        "categories": 10,
+        "locations": 20,
+        "posts": 1_000,
+        "comments": 5_000,
+    },
+    "small": {
+        "users": 1_000,
+        "categories": 100,
+        "locations": 200,
+        "posts": 10_000,
+        "comments": 100_000,
+    },
+    "medium": {
+        "users": 10_000,
+        "categories": 1_000,
+        "locations": 1_000,
+        "posts": 100_000,
+        "comments": 1_000_000,
+    },
+    "large": {
+        "users": 50_000,
+        "categories": 5_000,
+        "locations": 5_000,
+        "posts": 1_000_000,
+        "comments": 10_000_000,
+    },
+}
+
+
+def is_seeded():
+    return Post.objects.exists()
+
+
+def seed(scale, random_seed=0, workers=1):
+    """Заполняет БД; возвращает число строк и скорость по таблицам."""
+    return seed_blog(workers=workers, seed=random_seed, **SCALES[scale])
+
+
+def prepare(scale, random_seed=0, workers=1):
+    """Миграции и, если БД пуста, заполнение; возвращает отчёт о заполнении."""
+    call_command("migrate", verbosity=0)
+    if is_seeded():
+        return None
+    return seed(scale, random_seed, workers)
@@ -0,0 +1,30 @@
+"""Подготовка Django для замеров: отдельная БД и настройки без отладки."""
+import os
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / "blogicum"
+DATA_DIR = Path(__file__).resolve().parent / ".data"
+
+
+def setup(database_url=None, scale="small"):
+    """Настраивает Django на БД замеров.
+
+    По умолчанию БД — .data/<масштаб>.sqlite3.
+    """
+    if database_url is None:
+        DATA_DIR.mkdir(exist_ok=True)
+        database_url = f"sqlite:///{DATA_DIR / f'{scale}.sqlite3'}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "blogicum.settings")
+    os.environ.setdefault("BLOG_REQUEST_LOG_LEVEL", "WARNING")
+    sys.path.insert(0, str(PROJECT_DIR))
+    import django
+
+    django.setup()
+    from django.conf import settings
+
+    settings.DEBUG = False
+    settings.BLOG_SERVER_TIMING = False
+    settings.BLOG_IMAGE_PROCESSING = "inline"
+    return database_url
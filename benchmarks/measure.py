@@ -0,0 +1,165 @@
+"""Замеры одного сценария тестовым клиентом и WSGI-нагрузка в потоках."""
+import statistics
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import Client
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def summarize(latencies):
+    return {
+        "p50_ms": round(statistics.median(latencies) * 1000, 3),
+        "p90_ms": round(percentile(latencies, 0.9) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+    }
+
+
+def make_client(scenario, users):
+    client = Client(HTTP_HOST="localhost")
+    if scenario.user is not None:
+        client.force_login(users[scenario.user])
+    return client
+
+
+def request(client, scenario):
+    if scenario.method == "POST":
+        return client.post(scenario.path, scenario.data)
+    return client.get(scenario.path)
+
+
+def measure_client(scenario, users, iterations, warmup=3):
+    """Задержка и SQL-запросы через тестовый клиент."""
+    client = make_client(scenario, users)
+    for _ in range(warmup):
+        request(client, scenario)
+    latencies, queries, duplicates = [], [], []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = request(client, scenario)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != scenario.expected_status:
+            raise RuntimeError(
+                f"{scenario.name}: ответ {response.status_code}, "
+                f"ожидался {scenario.expected_status}"
+            )
+        # Статистику запроса собирает core.middleware
+        stats = response.wsgi_request.query_stats
+        queries.append(stats.queries)
+        duplicates.append(stats.duplicates)
+    return {
+        **summarize(latencies),
+        "iterations": iterations,
+        "queries": max(queries),
+        "duplicate_queries": max(duplicates),
+    }
+
+
+def measure_allocations(scenario, users, iterations=5):
+    """Пиковый объём памяти, выделенной за запрос (tracemalloc).
+
+    Отдельным проходом: трассировка замедляет запросы в разы.
+    """
+    client = make_client(scenario, users)
+    request(client, scenario)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            request(client, scenario)
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+    finally:
+        tracemalloc.stop()
+    return {"alloc_peak_kb": round(statistics.median(peaks) / 1024, 1)}
+
+
+def _environ(scenario, cookie):
+    url = urlsplit(scenario.path)
+    body = urlencode(scenario.data or {}).encode()
+    return {
+        "REQUEST_METHOD": scenario.method,
+        "PATH_INFO": url.path,
+        "QUERY_STRING": url.query,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "HTTP_HOST": "localhost",
+        "HTTP_COOKIE": cookie,
+        "CONTENT_TYPE": "application/x-www-form-urlencoded",
+        "CONTENT_LENGTH": str(len(body)),
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(body),
+        "wsgi.errors": BytesIO(),
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+
+
+def wsgi_load(scenario, users, concurrency, requests):
+    """Нагрузка на WSGI-приложение без сети: concurrency потоков вызывают
+    его напрямую, пока не выполнят requests запросов.
+    """
+    application = WSGIHandler()
+    cookie = ""
+    if scenario.user is not None:
+        client = make_client(scenario, users)
+        cookie = (
+            f"{settings.SESSION_COOKIE_NAME}="
+            f"{client.cookies[settings.SESSION_COOKIE_NAME].value}"
+        )
+    counter = iter(range(requests))
+    lock = threading.Lock()
+
+    def worker():
+        from django.db import connections
+
+        latencies, errors = [], 0
+        try:
+            while True:
+                with lock:
+                    if next(counter, None) is None:
+                        break
+                status = []
+                started = time.perf_counter()
+                body = application(
+                    _environ(scenario, cookie),
+                    lambda code, headers, exc_info=None: status.append(code),
+                )
+                for _ in body:
+                    pass
+                body.close()
+                latencies.append(time.perf_counter() - started)
+                if int(status[0].split()[0]) != scenario.expected_status:
+                    errors += 1
+        finally:
+            connections.close_all()
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(lambda _: worker(), range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies = [value for values, _ in results for value in values]
+    return {
+        **summarize(latencies),
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "rps": round(len(latencies) / elapsed, 1),
+        "errors": sum(errors for _, errors in results),
+    }
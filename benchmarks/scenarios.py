@@ -0,0 +1,82 @@
+"""Сценарии замеров: какой адрес, каким методом и от чьего имени."""
+from typing import NamedTuple, Optional
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from blog.models import Post
+
+ADMIN_USERNAME = "bench_admin"
+READER_USERNAME = "bench_reader"
+
+
+class Scenario(NamedTuple):
+    name: str
+    path: str
+    method: str = "GET"
+    data: Optional[dict] = None
+    user: Optional[str] = None  # None — анонимный посетитель
+    expected_status: int = 200
+
+
+def bench_users():
+    # Пользователи сценариев создаются один раз и переживают перезапуски
+    User = get_user_model()
+    admin, _ = User.objects.get_or_create(
+        username=ADMIN_USERNAME,
+        defaults={"is_staff": True, "is_superuser": True},
+    )
+    reader, _ = User.objects.get_or_create(username=READER_USERNAME)
+    return {ADMIN_USERNAME: admin, READER_USERNAME: reader}
+
+
+def build_scenarios():
+    # «Горячая» публикация — с наибольшим числом комментариев; её автор
+    # и категория — самые нагруженные профиль и лента категории
+    hot = (
+        Post.objects.published()
+        .select_related("author", "category")
+        .order_by("-comment_count")
+        .first()
+    )
+    typical = (
+        Post.objects.published().filter(comment_count__lte=3).order_by("id")
+        .first()
+    ) or hot
+    scenarios = [
+        Scenario("index", reverse("blog:index")),
+        Scenario("index_page_2", reverse("blog:index") + "?page=2"),
+        Scenario(
+            "index_logged_in", reverse("blog:index"), user=READER_USERNAME
+        ),
+        Scenario(
+            "category_posts",
+            reverse("blog:category_posts", args=[hot.category.slug]),
+        ),
+        Scenario(
+            "profile", reverse("blog:profile", args=[hot.author.username])
+        ),
+        Scenario(
+            "post_detail_hot", reverse("blog:post_detail", args=[hot.id])
+        ),
+        Scenario(
+            "post_detail", reverse("blog:post_detail", args=[typical.id])
+        ),
+        Scenario(
+            "add_comment",
+            reverse("blog:add_comment", args=[typical.id]),
+            method="POST",
+            data={"text": "Комментарий из замера"},
+            user=READER_USERNAME,
+            expected_status=302,
+        ),
+    ]
+    for model in ("blog_post", "blog_comment", "blog_category", "auth_user"):
+        scenarios.append(
+            Scenario(
+                f"admin_{model}",
+                reverse(f"admin:{model}_changelist"),
+                user=ADMIN_USERNAME,
+            )
+        )
+    return scenarios
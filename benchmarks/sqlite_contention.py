@@ -0,0 +1,250 @@
+"""Конкурентная запись в SQLite: профиль по умолчанию и sqlite-production.
+
+N потоков-писателей отправляют комментарии через представление
+add_comment, M потоков-читателей в это же время открывают страницу
+другой публикации. SQLite блокирует запись во всю БД, так что читатели
+конкурируют с писателями, но объём отрисовки у них не растёт вместе
+с числом новых комментариев. Для каждого профиля (DB_PROFILE, см.
+blogicum/db.py) создаётся отдельная временная БД; печатаются операции
+в секунду и доля ошибок "database is locked" у писателей и читателей.
+
+Все клиенты работают в одном процессе, поэтому делят GIL: рост числа
+записей в секунду может отнимать процессорное время у отрисовки страниц.
+
+    python benchmarks/sqlite_contention.py --writers 8 --seconds 10
+
+Каждый профиль замеряется в отдельном процессе, потому что настройки БД
+читаются один раз при запуске Django. Кэш страниц на время замера
+отключается, чтобы читатели действительно обращались к БД.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / "blogicum"
+PROFILES = ("default", "sqlite-production")
+READ_POST_COMMENTS = 20
+
+
+def setup_data(writers):
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+    from django.utils import timezone
+
+    from blog.models import Category, Comment, Post
+
+    call_command("migrate", verbosity=0)
+    User = get_user_model()
+    author = User.objects.create_user("author", password="benchmark")
+    category = Category.objects.create(
+        title="Нагрузка", slug="load", description="Замер", is_published=True
+    )
+    commented, read = (
+        Post.objects.create(
+            title=title,
+            text="Текст",
+            author=author,
+            category=category,
+            pub_date=timezone.now(),
+            is_published=True,
+        )
+        for title in ("Публикация для комментариев", "Публикация для чтения")
+    )
+    for index in range(READ_POST_COMMENTS):
+        Comment.objects.create(
+            post=read, author=author, text=f"Комментарий {index}"
+        )
+    users = [
+        User.objects.create_user(f"writer{index}", password="benchmark")
+        for index in range(writers)
+    ]
+    return commented, read, users
+
+
+def _request(client, kind, comment_url, detail_url):
+    # True — запрос выполнен успешно
+    if kind == "write":
+        response = client.post(
+            comment_url, {"text": "Комментарий под нагрузкой"}
+        )
+        return response.status_code == 302
+    return client.get(detail_url).status_code == 200
+
+
+def _client_loop(kind, user, urls, barrier, seconds):
+    """Отправляет запросы до истечения seconds.
+
+    Возвращает (kind, задержки, число "database is locked", неудачи).
+    """
+    from django.db import OperationalError, connection
+    from django.test import Client
+
+    client = Client(HTTP_HOST="localhost")
+    if user is not None:
+        client.force_login(user)
+    latencies, errors, failures = [], 0, 0
+    barrier.wait()
+    deadline = time.perf_counter() + seconds
+    try:
+        while (started := time.perf_counter()) < deadline:
+            try:
+                ok = _request(client, kind, *urls)
+            except OperationalError as error:
+                if "locked" not in str(error):
+                    raise
+                errors += 1
+                continue
+            if not ok:
+                failures += 1
+            latencies.append(time.perf_counter() - started)
+    finally:
+        connection.close()
+    return kind, latencies, errors, failures
+
+
+def _milliseconds(value):
+    return round(value * 1000, 2) if value is not None else None
+
+
+def _summary(results, seconds):
+    # Сводка по писателям и читателям: оп/с, блокировки, перцентили
+    report = {}
+    for kind in ("write", "read"):
+        own = [result for result in results if result[0] == kind]
+        latencies = sorted(
+            value for _, values, _, _ in own for value in values
+        )
+        errors = sum(result[2] for result in own)
+        attempts = len(latencies) + errors
+        p99_index = max(int(len(latencies) * 0.99) - 1, 0)
+        report[kind] = {
+            "ops": len(latencies),
+            "ops_per_sec": round(len(latencies) / seconds, 1),
+            "locked": errors,
+            "locked_rate": round(errors / attempts, 4) if attempts else 0.0,
+            "failures": sum(result[3] for result in own),
+            "p50_ms": _milliseconds(
+                statistics.median(latencies) if latencies else None
+            ),
+            "p99_ms": _milliseconds(
+                latencies[p99_index] if latencies else None
+            ),
+        }
+    return report
+
+
+def run_clients(commented, read, users, readers, seconds):
+    from django.urls import reverse
+
+    urls = (
+        reverse("blog:add_comment", args=[commented.id]),
+        reverse("blog:post_detail", args=[read.id]),
+    )
+    # Все клиенты стартуют одновременно, после входа писателей
+    barrier = threading.Barrier(len(users) + readers)
+    results = []
+    lock = threading.Lock()
+
+    def target(kind, user=None):
+        result = _client_loop(kind, user, urls, barrier, seconds)
+        with lock:
+            results.append(result)
+
+    threads = [
+        threading.Thread(target=target, args=("write", user))
+        for user in users
+    ] + [
+        threading.Thread(target=target, args=("read",))
+        for _ in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return _summary(results, seconds)
+
+
+def child(args):
+    # Выполняется в отдельном процессе с DATABASE_URL и DB_PROFILE профиля
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "blogicum.settings")
+    import django
+
+    django.setup()
+    from django.test import override_settings
+
+    with override_settings(BLOG_PAGE_CACHE_TIMEOUT=0):
+        commented, read, users = setup_data(args.writers)
+        report = run_clients(
+            commented, read, users, args.readers, args.seconds
+        )
+    print(json.dumps(report))
+
+
+def measure(profile, args):
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{directory}/db.sqlite3",
+            DB_PROFILE=profile,
+        )
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--child",
+                "--writers", str(args.writers),
+                "--readers", str(args.readers),
+                "--seconds", str(args.seconds),
+            ],
+            env=env,
+            cwd=PROJECT_DIR,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--profile", action="append", choices=PROFILES)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    report = {
+        profile: measure(profile, args)
+        for profile in args.profile or PROFILES
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(
+        f"{'':26}{'оп/с':>8}{'locked':>8}{'доля':>8}"
+        f"{'p50, мс':>10}{'p99, мс':>10}"
+    )
+    for profile, kinds in report.items():
+        for kind, result in kinds.items():
+            print(
+                f"{profile + ' / ' + kind:26}{result['ops_per_sec']:>8}"
+                f"{result['locked']:>8}{result['locked_rate']:>8}"
+                f"{result['p50_ms']!s:>10}{result['p99_ms']!s:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
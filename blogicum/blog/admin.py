@@ -1,5 +1,7 @@
 from django.contrib import admin
 from .models import Post, Category, Location, Comment
+from .moderation import approve_comments, reject_comments
+from .search import search_backend, search_posts
 
 # Регистрация модели категорий с настройкой отображения
 @admin.register(Category)
@@ -20,14 +22,35 @@ class LocationAdmin(admin.ModelAdmin):
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = ('title', 'author', 'category', 'location',
-                    'is_published', 'pub_date', 'created_at')  # Отображаемые поля
+                    'is_published', 'pub_date', 'created_at',
+                    'comment_count')  # Отображаемые поля
     list_filter = ('is_published', 'category', 'location', 'author')  # Фильтры
     search_fields = ('title', 'text')  # Поля для поиска публикаций
     date_hierarchy = 'pub_date'  # Навигация по дате публикации
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по полнотекстовому индексу вместо LIKE '%...%' по всей таблице
+        if not search_term or search_backend(queryset.db) is None:
+            return super().get_search_results(request, queryset, search_term)
+        return search_posts(queryset, search_term, ranked=False), False
+
 # Регистрация модели комментариев
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ('post', 'author', 'text', 'created_at')  # Поля списка комментариев
+    list_display = ('post', 'author', 'text', 'created_at',
+                    'is_approved')  # Поля списка комментариев
+    list_filter = ('is_approved',)  # Очередь модерации — «Нет»
     search_fields = ('author__username', 'text', 'post__title')  # Поля для поиска
-    date_hierarchy = 'created_at'  # Навигация по дате добавления
\ No newline at end of file
+    date_hierarchy = 'created_at'  # Навигация по дате добавления
+    actions = ('approve', 'reject')
+
+    @admin.action(description='Одобрить выбранные комментарии')
+    def approve(self, request, queryset):
+        # Один UPDATE комментариев и один UPDATE счётчиков публикаций
+        count = approve_comments(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, f'Одобрено комментариев: {count}')
+
+    @admin.action(description='Отклонить (удалить) выбранные комментарии')
+    def reject(self, request, queryset):
+        count = reject_comments(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, f'Отклонено комментариев: {count}')
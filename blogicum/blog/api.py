@@ -0,0 +1,282 @@
+"""Лёгкий JSON API только для чтения.
+
+Те же правила видимости, что и у HTML-страниц, но без шаблонов и без
+создания объектов моделей: строки читаются через values() и сразу
+превращаются в JSON. Списки листаются курсором (?cursor=) по
+(pub_date, id) для публикаций и (created_at, id) для комментариев,
+состав полей задаётся параметром ?fields=id,title,...
+"""
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.views import View
+
+from .cache import (
+    ALL_TAG,
+    FEED_TAG,
+    author_tag,
+    category_tag,
+    get_tag_versions,
+    post_tag,
+)
+from .models import Category, Comment, Post, User, published_filter
+from .moderation import visible_comments
+from .paginators import CursorPaginator, InvalidCursor
+from .views import PAGINATE_BY, ConditionalGetMixin, feed_validators
+
+MAX_LIMIT = 100
+
+# Имя поля в ответе -> путь для values()
+POST_FIELDS = {
+    "id": "id",
+    "title": "title",
+    "text": "text",
+    "pub_date": "pub_date",
+    "updated_at": "updated_at",
+    "is_published": "is_published",
+    "author": "author__username",
+    "category": "category__slug",
+    "category_title": "category__title",
+    "location": "location__name",
+    "image": "image",
+    "comment_count": "comment_count",
+}
+COMMENT_FIELDS = {
+    "id": "id",
+    "text": "text",
+    "created_at": "created_at",
+    "author": "author__username",
+}
+CATEGORY_FIELDS = {
+    "slug": "slug",
+    "title": "title",
+    "description": "description",
+}
+
+
+class ApiError(Exception):
+    # Ошибка в параметрах запроса: ответ 400 с описанием
+    pass
+
+
+class ApiView(ConditionalGetMixin, View):
+    http_method_names = ["get", "head", "options"]
+    fields = POST_FIELDS
+    query_budget = 6
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as error:
+            return self.render({"error": str(error)}, status=400)
+        except Http404 as error:
+            return self.render({"error": str(error)}, status=404)
+
+    def render(self, data, status=200):
+        return JsonResponse(
+            data,
+            status=status,
+            encoder=DjangoJSONEncoder,
+            json_dumps_params={"ensure_ascii": False},
+        )
+
+    def get_fields(self):
+        # Выбранные поля ответа; неизвестное поле — ошибка, а не тишина
+        requested = self.request.GET.get("fields")
+        if not requested:
+            return dict(self.fields)
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Неизвестные поля: {', '.join(unknown)}")
+        return {name: self.fields[name] for name in names}
+
+    def get_paths(self, fields):
+        # Пути для values(): запрошенные поля и то, что нужно serialize()
+        paths = set(fields.values())
+        if "location" in fields:
+            paths.add("location__is_published")
+        return paths
+
+    def serialize(self, row, fields):
+        data = {name: row[path] for name, path in fields.items()}
+        if "location" in data and not row["location__is_published"]:
+            # Снятое с публикации место шаблоны не показывают, API тоже
+            data["location"] = None
+        if "image" in data:
+            data["image"] = (
+                default_storage.url(data["image"]) if data["image"] else None
+            )
+        return data
+
+
+class ApiListView(ApiView):
+    # Список с курсорной пагинацией; наследники определяют get_queryset()
+    # и теги кэша
+    ordering = ("-pub_date", "-id")
+    queryset = None
+
+    def get_cache_tags(self):
+        return (ALL_TAG,)
+
+    def get_validators(self):
+        # Выборка строится один раз: в ней уже проверены категория/автор
+        self.queryset = self.get_queryset()
+        return feed_validators(self.queryset, self.get_cache_tags())
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get("limit", PAGINATE_BY))
+        except ValueError:
+            raise ApiError("limit должен быть числом")
+        return max(1, min(limit, MAX_LIMIT))
+
+    def page_url(self, cursor):
+        if cursor is None:
+            return None
+        query = self.request.GET.copy()
+        query["cursor"] = cursor
+        return self.request.build_absolute_uri(
+            f"{self.request.path}?{query.urlencode()}"
+        )
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        # Поля сортировки нужны для курсора, даже если их не запросили
+        paths = self.get_paths(fields) | {
+            name.lstrip("-") for name in self.ordering
+        }
+        paginator = CursorPaginator(
+            self.queryset.values(*paths), self.get_limit(), self.ordering
+        )
+        try:
+            page = paginator.page(request.GET.get("cursor"))
+        except InvalidCursor:
+            raise ApiError("Некорректный курсор")
+        return self.render(
+            {
+                "results": [self.serialize(row, fields) for row in page],
+                "next": self.page_url(page.next_cursor),
+                "previous": self.page_url(page.previous_cursor),
+            }
+        )
+
+
+class PostListApiView(ApiListView):
+    def get_queryset(self):
+        return Post.objects.published()
+
+    def get_cache_tags(self):
+        return ALL_TAG, FEED_TAG
+
+
+class CategoryPostListApiView(ApiListView):
+    def get_queryset(self):
+        category = get_object_or_404(
+            Category, slug=self.kwargs["category_slug"], is_published=True
+        )
+        return Post.objects.published().filter(category=category)
+
+    def get_cache_tags(self):
+        return ALL_TAG, category_tag(self.kwargs["category_slug"])
+
+
+class ProfilePostListApiView(ApiListView):
+    def get_queryset(self):
+        # Автор видит и свои неопубликованные посты, как на странице профиля
+        author = get_object_or_404(User, username=self.kwargs["username"])
+        queryset = Post.objects.filter(author=author)
+        if self.request.user != author:
+            queryset = queryset.published()
+        return queryset
+
+    def get_cache_tags(self):
+        return ALL_TAG, author_tag(self.kwargs["username"])
+
+
+def visible_posts(request):
+    # Автор видит свой пост всегда, остальные — только опубликованный
+    visible = published_filter()
+    if request.user.is_authenticated:
+        visible |= Q(author_id=request.user.pk)
+    return Post.objects.filter(visible)
+
+
+class PostDetailApiView(ApiView):
+    row = None
+
+    def get_validators(self):
+        fields = self.get_fields()
+        paths = self.get_paths(fields) | {"updated_at", "comment_count"}
+        rows = (
+            visible_posts(self.request)
+            .filter(id=self.kwargs["post_id"])
+            .values(*paths)
+            .order_by()
+        )
+        self.row = next(iter(rows[:1]), None)
+        if self.row is None:
+            raise Http404("Публикация не найдена")
+        tags = get_tag_versions(ALL_TAG, post_tag(self.kwargs["post_id"]))
+        state = (self.row["updated_at"], self.row["comment_count"], tags)
+        return state, self.row["updated_at"]
+
+    def get(self, request, *args, **kwargs):
+        return self.render(self.serialize(self.row, self.get_fields()))
+
+
+class CommentListApiView(ApiListView):
+    fields = COMMENT_FIELDS
+    ordering = ("created_at", "id")
+
+    def get_queryset(self):
+        if not visible_posts(self.request).filter(
+            id=self.kwargs["post_id"]
+        ).exists():
+            raise Http404("Публикация не найдена")
+        # Как на странице поста: одобренные комментарии и свои
+        return Comment.objects.filter(
+            visible_comments(self.request.user),
+            post_id=self.kwargs["post_id"],
+        )
+
+    def get_validators(self):
+        self.queryset = self.get_queryset()
+        # Любая правка комментариев поста меняет его тег
+        tags = get_tag_versions(ALL_TAG, post_tag(self.kwargs["post_id"]))
+        return tags, None
+
+
+class CategoryListApiView(ApiView):
+    fields = CATEGORY_FIELDS
+
+    def get_validators(self):
+        # Правка и удаление категорий меняют тег ALL_TAG
+        return get_tag_versions(ALL_TAG), None
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        rows = (
+            Category.objects.filter(is_published=True)
+            .order_by("title")
+            .values(*fields.values())
+        )
+        return self.render(
+            {"results": [self.serialize(row, fields) for row in rows]}
+        )
+
+
+class ProfileApiView(ApiView):
+    def get_validators(self):
+        profiles = User.objects.filter(
+            username=self.kwargs["username"]
+        ).values("username", "first_name", "last_name", "date_joined")
+        self.profile = next(iter(profiles[:1]), None)
+        if self.profile is None:
+            raise Http404("Пользователь не найден")
+        return tuple(self.profile.values()), None
+
+    def get(self, request, *args, **kwargs):
+        return self.render(self.profile)
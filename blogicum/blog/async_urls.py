@@ -0,0 +1,46 @@
+"""URL-адреса блога с асинхронными версиями страниц только для чтения.
+
+Те же маршруты и имена, что в blog/urls.py; подменяются только
+представления из ASYNC_VIEWS.
+"""
+from django.urls import URLPattern, URLResolver
+
+from . import async_views
+from .urls import app_name, urlpatterns as sync_urlpatterns  # noqa: F401
+
+ASYNC_VIEWS = {
+    "index": async_views.post_list,
+    "category_posts": async_views.category_posts,
+    "post_detail": async_views.post_detail,
+    "profile": async_views.profile,
+}
+
+
+def _swap_views(patterns):
+    result = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            result.append(
+                URLResolver(
+                    pattern.pattern,
+                    _swap_views(pattern.url_patterns),
+                    pattern.default_kwargs,
+                    pattern.app_name,
+                    pattern.namespace,
+                )
+            )
+        elif pattern.name in ASYNC_VIEWS:
+            result.append(
+                URLPattern(
+                    pattern.pattern,
+                    ASYNC_VIEWS[pattern.name],
+                    pattern.default_args,
+                    pattern.name,
+                )
+            )
+        else:
+            result.append(pattern)
+    return result
+
+
+urlpatterns = _swap_views(sync_urlpatterns)
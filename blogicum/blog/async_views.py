@@ -0,0 +1,117 @@
+"""Асинхронные версии страниц только для чтения (для запуска под ASGI).
+
+В Django 3.2 нет асинхронного ORM, поэтому запросы к БД и рендеринг
+выполняются в отдельном пуле потоков (BLOG_ASYNC_THREADS). Без этого
+ASGI-обработчик запускает синхронные представления через
+sync_to_async(thread_sensitive=True) — в одном общем потоке, по очереди.
+
+Анонимный запрос страницы, которая есть в кэше страниц, обслуживается
+прямо в цикле событий, без перехода в поток и без обращений к БД.
+
+Представления подключает blog/async_urls.py; какой URLconf использовать,
+определяет переменная окружения BLOG_URLCONF (см. blogicum/asgi.py).
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponse
+
+from core import instrumentation
+
+from .views import (
+    AnonymousPageCacheMixin,
+    CategoryPostListView,
+    PostDetailView,
+    PostListView,
+    UserProfileView,
+)
+
+_executor = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "BLOG_ASYNC_THREADS", 16),
+            thread_name_prefix="blog-async",
+        )
+    return _executor
+
+
+async def run_in_pool(func, *args, **kwargs):
+    # thread_sensitive=False: потоки пула работают параллельно, у каждого
+    # своё соединение с БД
+    return await sync_to_async(
+        func, thread_sensitive=False, executor=get_executor()
+    )(*args, **kwargs)
+
+
+def _plain_response(response):
+    # TemplateResponse уже отрисован в пуле; отдаём обычный HttpResponse,
+    # чтобы обработчик не отправлял render() в общий поток ещё раз
+    if not hasattr(response, "render"):
+        return response
+    plain = HttpResponse(response.content, status=response.status_code)
+    for header, value in response.items():
+        plain[header] = value
+    plain.cookies = response.cookies
+    return plain
+
+
+def _render(view, request, *args, **kwargs):
+    # Соединения потоков пула живут по тем же правилам CONN_MAX_AGE,
+    # что и соединения обычных запросов
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, "render"):
+            started = time.perf_counter()
+            response.render()
+            # Рендеринг идёт здесь, а не в process_template_response
+            stats = instrumentation.current()
+            if stats is not None:
+                stats.render_time += time.perf_counter() - started
+        return _plain_response(response)
+    finally:
+        close_old_connections()
+
+
+def _cached_page(view_class, initkwargs, request, args, kwargs):
+    # Без cookie сессии пользователь заведомо анонимный: проверить кэш
+    # страниц можно без обращения к БД
+    if (
+        not issubclass(view_class, AnonymousPageCacheMixin)
+        or not getattr(settings, "BLOG_PAGE_CACHE_TIMEOUT", 0)
+        or request.method != "GET"
+        or settings.SESSION_COOKIE_NAME in request.COOKIES
+    ):
+        return None
+    view = view_class(**initkwargs)
+    view.setup(request, *args, **kwargs)
+    return view.get_cached_page()
+
+
+def as_async_view(view_class, **initkwargs):
+    """Асинхронное представление поверх синхронного класса view_class."""
+    sync_view = view_class.as_view(**initkwargs)
+
+    async def view(request, *args, **kwargs):
+        response = _cached_page(view_class, initkwargs, request, args, kwargs)
+        if response is not None:
+            return response
+        return await run_in_pool(_render, sync_view, request, *args, **kwargs)
+
+    view.view_class = view_class
+    view.view_initkwargs = initkwargs
+    view.__name__ = view.__qualname__ = f"async_{view_class.__name__}"
+    return view
+
+
+post_list = as_async_view(PostListView)
+category_posts = as_async_view(CategoryPostListView)
+post_detail = as_async_view(PostDetailView)
+profile = as_async_view(UserProfileView)
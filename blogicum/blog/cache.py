@@ -0,0 +1,80 @@
+"""Кэширование с инвалидацией по тегам.
+
+Каждый тег хранит в кэше свою «версию». Ключи закэшированных значений
+включают версии всех тегов, от которых значение зависит, поэтому для
+инвалидации достаточно сменить версию тега: старые записи просто
+перестают находиться и вытесняются по таймауту.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from .models import Post
+
+TAG_PREFIX = "blog:tag:"
+
+# Всё, что показывает публикации: меняется при правке категорий и мест
+ALL_TAG = "all"
+# Общая лента на главной странице
+FEED_TAG = "feed"
+
+
+def category_tag(slug):
+    return f"category:{slug}"
+
+
+def author_tag(username):
+    return f"author:{username}"
+
+
+def post_tag(post_id):
+    # Страница самой публикации: меняется при правке её комментариев
+    return f"post:{post_id}"
+
+
+def _new_version():
+    # Время в наносекундах не повторяется даже после вытеснения тега из кэша
+    return time.time_ns()
+
+
+def get_tag_versions(*tags):
+    keys = [TAG_PREFIX + tag for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return tuple(versions[key] for key in keys)
+
+
+def invalidate_tags(*tags):
+    cache.set_many(
+        {TAG_PREFIX + tag: _new_version() for tag in set(tags) if tag}, None
+    )
+
+
+def make_key(prefix, tags, *parts):
+    # Хэшируем, чтобы ключ не зависел от длины и символов URL/slug
+    raw = repr((parts, get_tag_versions(*tags)))
+    return f"blog:{prefix}:{hashlib.md5(raw.encode()).hexdigest()}"
+
+
+def post_scope_tags(category_slug, author_username):
+    # Теги всех лент, в которых может появиться публикация
+    tags = [FEED_TAG, author_tag(author_username)]
+    if category_slug:
+        tags.append(category_tag(category_slug))
+    return tags
+
+
+def stored_post_tags(post_id):
+    # Теги лент по сохранённому в БД состоянию публикации
+    row = (
+        Post.objects.filter(pk=post_id)
+        .values("category__slug", "author__username")
+        .first()
+    )
+    if row is None:
+        return []
+    return post_scope_tags(row["category__slug"], row["author__username"])
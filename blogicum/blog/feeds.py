@@ -0,0 +1,237 @@
+"""RSS- и Atom-ленты публикаций: общая, по категории и по автору.
+
+Ленты отдаются через StreamingHttpResponse: публикации читаются из БД
+итератором values() и сериализуются по одной, так что память не растёт
+с длиной ленты. Готовое тело ленты кэшируется; ключ включает версии тегов
+и состояние ленты из feed_validators(), поэтому правки постов, выход
+отложенных публикаций и удаление сразу дают новый ключ.
+"""
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import (
+    Atom1Feed,
+    Rss201rev2Feed,
+    SimplerXMLGenerator,
+)
+from django.utils.text import Truncator
+from django.views import View
+
+from .cache import ALL_TAG, FEED_TAG, author_tag, category_tag, make_key
+from .models import Category, Post, User
+from .views import ConditionalGetMixin, feed_validators
+
+FEED_ITEMS = 50  # Сколько последних публикаций попадает в ленту
+DESCRIPTION_WORDS = 100
+
+
+class StreamingFeedMixin:
+    # Генератор ленты, который выдаёт XML по частям: шапку, затем каждую
+    # запись отдельно, затем закрывающие теги
+    closing_tag = None
+    latest = None
+
+    def latest_post_date(self):
+        # Дата ленты берётся из агрегата, а не из списка записей в памяти
+        return self.latest or super().latest_post_date()
+
+    def stream(self, items, encoding="utf-8"):
+        self.items = []
+        document = self.writeString(encoding)
+        head, tag, tail = document.rpartition(self.closing_tag)
+        yield head
+        for item in items:
+            self.items = []
+            self.add_item(**item)
+            buffer = StringIO()
+            self.write_items(SimplerXMLGenerator(buffer, encoding))
+            yield buffer.getvalue()
+        self.items = []
+        yield tag + tail
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    closing_tag = "</channel>"
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+    closing_tag = "</feed>"
+
+
+FEED_TYPES = {
+    "rss": StreamingRssFeed,
+    "atom": StreamingAtomFeed,
+}
+
+
+class PostFeedView(ConditionalGetMixin, View):
+    # Общая лента; наследники сужают выборку и меняют заголовок
+    feed_tags = (ALL_TAG, FEED_TAG)
+    url_name = "blog:index"
+    vary_on_cookie = False  # Лента одинакова для всех пользователей
+    # Записи ленты читаются уже после ответа middleware, при потоковой
+    # отдаче; бюджет покрывает проверку категории/автора и валидаторы
+    query_budget = 4
+
+    def get_viewer_state(self):
+        return None
+
+    def get_feed_class(self):
+        feed_class = FEED_TYPES.get(self.kwargs["feed_type"])
+        if feed_class is None:
+            raise Http404("Неизвестный формат ленты")
+        return feed_class
+
+    def get_scope(self):
+        return Post.objects.published()
+
+    def get_cache_tags(self):
+        return self.feed_tags
+
+    def get_title(self):
+        return "Блогикум"
+
+    def get_description(self):
+        return "Новые публикации Блогикума"
+
+    def get_link(self):
+        return reverse(self.url_name)
+
+    def get_validators(self):
+        self.get_feed_class()
+        self.state, _ = feed_validators(
+            self.get_scope(), self.get_cache_tags()
+        )
+        # Время последней публикации — дата самой ленты. Last-Modified
+        # не отдаём: MAX(pub_date) не сдвигается при правке поста и уходит
+        # назад при удалении новейшего, и клиент, присылающий только
+        # If-Modified-Since, получил бы 304 на устаревшую ленту. Версии
+        # тегов в ETag меняются при любой из этих правок
+        self.latest = self.state[0]
+        return self.state, None
+
+    def get_items(self):
+        rows = (
+            self.get_scope()
+            .order_by("-pub_date", "-id")
+            .values(
+                "id",
+                "title",
+                "text",
+                "pub_date",
+                "updated_at",
+                "author__username",
+                "author__first_name",
+                "author__last_name",
+                "category__title",
+            )[:FEED_ITEMS]
+            .iterator()
+        )
+        for row in rows:
+            link = self.request.build_absolute_uri(
+                reverse("blog:post_detail", args=[row["id"]])
+            )
+            names = (row["author__first_name"], row["author__last_name"])
+            full_name = " ".join(name for name in names if name)
+            yield {
+                "title": row["title"],
+                "link": link,
+                "unique_id": link,
+                "description": Truncator(row["text"]).words(DESCRIPTION_WORDS),
+                "pubdate": row["pub_date"],
+                "updateddate": row["updated_at"],
+                "author_name": full_name or row["author__username"],
+                "categories": (
+                    [row["category__title"]] if row["category__title"] else []
+                ),
+            }
+
+    def get(self, request, *args, **kwargs):
+        feed_class = self.get_feed_class()
+        feed = feed_class(
+            title=self.get_title(),
+            link=request.build_absolute_uri(self.get_link()),
+            description=self.get_description(),
+            feed_url=request.build_absolute_uri(),
+            language="ru",
+        )
+        feed.latest = self.latest
+        key = make_key(
+            "feed",
+            self.get_cache_tags(),
+            request.build_absolute_uri(),
+            self.state,
+        )
+        content_type = feed.content_type
+        body = cache.get(key)
+        if body is not None:
+            return StreamingHttpResponse([body], content_type=content_type)
+        return StreamingHttpResponse(
+            self.stream_and_cache(feed, key), content_type=content_type
+        )
+
+    def stream_and_cache(self, feed, key):
+        # Части ленты отдаются клиенту сразу; в кэш тело попадает целиком,
+        # только если клиент дочитал ответ до конца
+        chunks = []
+        for chunk in feed.stream(self.get_items()):
+            chunks.append(chunk)
+            yield chunk
+        cache.set(
+            key,
+            "".join(chunks),
+            getattr(settings, "BLOG_FEED_CACHE_TIMEOUT", 3600),
+        )
+
+
+class CategoryFeedView(PostFeedView):
+    url_name = "blog:category_posts"
+
+    def get_validators(self):
+        self.category = get_object_or_404(
+            Category, slug=self.kwargs["category_slug"], is_published=True
+        )
+        return super().get_validators()
+
+    def get_scope(self):
+        return super().get_scope().filter(category=self.category)
+
+    def get_cache_tags(self):
+        return ALL_TAG, category_tag(self.category.slug)
+
+    def get_title(self):
+        return f"Блогикум: {self.category.title}"
+
+    def get_description(self):
+        return self.category.description
+
+    def get_link(self):
+        return reverse(self.url_name, args=[self.category.slug])
+
+
+class AuthorFeedView(PostFeedView):
+    url_name = "blog:profile"
+
+    def get_validators(self):
+        self.author = get_object_or_404(User, username=self.kwargs["username"])
+        return super().get_validators()
+
+    def get_scope(self):
+        return super().get_scope().filter(author=self.author)
+
+    def get_cache_tags(self):
+        return ALL_TAG, author_tag(self.author.username)
+
+    def get_title(self):
+        return f"Блогикум: публикации {self.author.username}"
+
+    def get_description(self):
+        name = self.author.get_full_name() or self.author.username
+        return f"Публикации пользователя {name}"
+
+    def get_link(self):
+        return reverse(self.url_name, args=[self.author.username])
@@ -1,8 +1,36 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from PIL import Image
 
 from .models import Comment, Post, User
 
 
+class HeaderImageField(forms.ImageField):
+    # Проверяет только заголовок файла: Image.open() не декодирует пиксели.
+    # Полностью изображение разбирает фоновая задача (blog/jobs.py).
+    def to_python(self, data):
+        f = forms.FileField.to_python(self, data)
+        if f is None:
+            return None
+        if hasattr(data, "temporary_file_path"):
+            file = data.temporary_file_path()
+        elif hasattr(data, "read"):
+            file = data
+        else:
+            file = data["content"]
+        try:
+            image = Image.open(file)
+        except Exception as exc:
+            raise ValidationError(
+                self.error_messages["invalid_image"], code="invalid_image"
+            ) from exc
+        f.image = image
+        f.content_type = Image.MIME.get(image.format)
+        if hasattr(f, "seek") and callable(f.seek):
+            f.seek(0)
+        return f
+
+
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
@@ -20,6 +48,7 @@ class PostForm(forms.ModelForm):
                 attrs={"type": "datetime-local"}
             )
         }
+        field_classes = {"image": HeaderImageField}
     
 
 
@@ -0,0 +1,228 @@
+"""Уменьшенные копии (renditions) изображений публикаций.
+
+Для каждого загруженного изображения создаются копии нескольких ширин
+в WebP и JPEG рядом с оригиналом: posts_images/renditions/<имя>_<ширина>w.*
+Список готовых ширин хранится в Post.image_renditions, поэтому шаблонам
+не нужно обращаться к файловой системе.
+
+По умолчанию (BLOG_IMAGE_PROCESSING = "background") изображение
+обрабатывается задачей очереди core.jobs (см. blog/jobs.py), а до её
+выполнения шаблоны показывают заглушку. Если задача исчерпала попытки,
+в image_renditions записывается "failed" и выводится исходный файл.
+"""
+import logging
+import posixpath
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+# (расширение, формат Pillow, MIME-тип)
+FORMATS = (
+    ("webp", "WEBP", "image/webp"),
+    ("jpg", "JPEG", "image/jpeg"),
+)
+JPEG_QUALITY = 82
+WEBP_QUALITY = 80
+# Форматы, которые normalize_image сохраняет как есть, и их расширения.
+# MPO — JPEG со снимками серии (камеры телефонов): пишем как обычный JPEG
+KEPT_FORMATS = {
+    "JPEG": ".jpg",
+    "PNG": ".png",
+    "WEBP": ".webp",
+    "GIF": ".gif",
+}
+FORMAT_ALIASES = {"MPO": "JPEG"}
+
+
+def processing_mode():
+    # "background" — задачей очереди, "inline" — прямо при сохранении поста
+    return getattr(settings, "BLOG_IMAGE_PROCESSING", "background")
+
+
+def max_side():
+    return getattr(settings, "BLOG_IMAGE_MAX_SIDE", 2560)
+
+
+def rendition_widths():
+    return getattr(settings, "BLOG_IMAGE_WIDTHS", (320, 640, 1024))
+
+
+def available_formats():
+    return [
+        fmt for fmt in FORMATS
+        if fmt[1] != "WEBP" or features.check("webp")
+    ]
+
+
+def rendition_name(name, width, extension):
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(
+        directory, "renditions", f"{stem}_{width}w.{extension}"
+    )
+
+
+def _encode(image, pillow_format):
+    buffer = BytesIO()
+    if pillow_format == "JPEG":
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        image.save(
+            buffer,
+            "JPEG",
+            quality=JPEG_QUALITY,
+            optimize=True,
+            progressive=True,
+        )
+    else:
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        image.save(buffer, pillow_format, quality=WEBP_QUALITY, method=4)
+    return buffer.getvalue()
+
+
+def normalize_image(name, storage=default_storage):
+    """Поворачивает изображение по EXIF, удаляет метаданные и уменьшает
+    слишком большие изображения. Если что-то изменилось, сохраняет
+    результат в новый файл и возвращает его имя; исходный файл остаётся
+    на месте, его удаляет save_renditions после обновления поля.
+    """
+    with storage.open(name) as file, Image.open(file) as original:
+        source_format = original.format
+        has_metadata = (
+            bool(original.getexif()) or "icc_profile" in original.info
+        )
+        too_large = max(original.size) > max_side()
+        if not (has_metadata or too_large):
+            return name
+        original.load()
+        image = ImageOps.exif_transpose(original)
+    image.thumbnail((max_side(), max_side()), Image.Resampling.LANCZOS)
+    pillow_format = FORMAT_ALIASES.get(source_format, source_format)
+    if pillow_format not in KEPT_FORMATS:
+        pillow_format = "PNG"
+    if pillow_format != source_format:
+        # Расширение должно соответствовать содержимому: x.tif -> x.png
+        name = posixpath.splitext(name)[0] + KEPT_FORMATS[pillow_format]
+    # Без info Pillow не запишет EXIF, ICC-профиль и прочие метаданные
+    image.info = {
+        key: value for key, value in image.info.items()
+        if key == "transparency"
+    }
+    content = (
+        _encode(image, pillow_format)
+        if pillow_format in ("JPEG", "WEBP")
+        else _save(image, pillow_format)
+    )
+    # Исходный файл ещё занимает имя, поэтому хранилище выберет новое
+    return storage.save(name, ContentFile(content))
+
+
+def _save(image, pillow_format):
+    buffer = BytesIO()
+    image.save(buffer, pillow_format, optimize=True)
+    return buffer.getvalue()
+
+
+def build_renditions(name, storage=default_storage):
+    """Создаёт копии изображения name и возвращает данные для image_renditions.
+
+    Функция не обращается к БД, поэтому её можно вызывать в дочерних
+    процессах (см. команду build_renditions).
+    """
+    with storage.open(name) as file, Image.open(file) as original:
+        original.load()
+        image = ImageOps.exif_transpose(original)
+    # Не увеличиваем: маленькая картинка получает одну копию своей ширины
+    widths = sorted({min(width, image.width) for width in rendition_widths()})
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for extension, pillow_format, _ in available_formats():
+            target = rendition_name(name, width, extension)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, ContentFile(_encode(resized, pillow_format)))
+    return {
+        "name": name,
+        "widths": widths,
+        "formats": [extension for extension, _, _ in available_formats()],
+    }
+
+
+def needs_renditions(post):
+    return bool(post.image) and (
+        (post.image_renditions or {}).get("name") != post.image.name
+    )
+
+
+def process_image(name, storage=default_storage):
+    # Полная обработка загруженного файла; как и build_renditions, без БД
+    return build_renditions(normalize_image(name, storage), storage)
+
+
+def save_renditions(post, data):
+    # update() вместо save(): не запускаем сигналы публикации повторно,
+    # но меняем updated_at, чтобы сбросить кэш карточки
+    previous = post.image.name
+    post.image_renditions = data
+    post.image.name = data["name"]
+    post.updated_at = timezone.now()
+    Post.objects.filter(pk=post.pk).update(
+        image=data["name"], image_renditions=data, updated_at=post.updated_at
+    )
+    # Исходный файл удаляем только после того, как поле указывает на новый:
+    # ошибка на любом предыдущем шаге не теряет загруженное изображение
+    if previous and previous != data["name"]:
+        default_storage.delete(previous)
+
+
+def mark_failed(post):
+    # Копий нет, но имя совпадает с image: needs_renditions() становится
+    # ложным, и шаблоны выводят исходный файл без srcset
+    save_renditions(
+        post,
+        {"name": post.image.name, "widths": [], "formats": [], "failed": True},
+    )
+
+
+def update_renditions(post):
+    try:
+        data = process_image(post.image.name)
+    except Exception:
+        logger.exception("Не удалось обработать изображение %s", post.image)
+        return
+    save_renditions(post, data)
+
+
+def is_processing(post):
+    # Изображение загружено, но фоновая задача его ещё не обработала
+    return processing_mode() == "background" and needs_renditions(post)
+
+
+def srcsets(post):
+    """Возвращает {MIME-тип: srcset} для готовых копий изображения поста."""
+    data = post.image_renditions or {}
+    if not post.image or data.get("name") != post.image.name:
+        return {}
+    result = {}
+    for extension, _, mime in FORMATS:
+        if extension in data.get("formats", ()):
+            result[mime] = ", ".join(
+                "{} {}w".format(
+                    default_storage.url(
+                        rendition_name(post.image.name, width, extension)
+                    ),
+                    width,
+                )
+                for width in data["widths"]
+            )
+    return result
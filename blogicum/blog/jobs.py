@@ -0,0 +1,34 @@
+from core.jobs import enqueue, register
+
+from .cache import invalidate_tags, post_tag, stored_post_tags
+from .images import mark_failed, process_image, save_renditions
+from .models import Post
+
+PROCESS_IMAGE = "blog.process_post_image"
+
+
+def enqueue_image_processing(post):
+    return enqueue(
+        PROCESS_IMAGE,
+        {"post_id": post.pk, "name": post.image.name},
+        key=f"post-image:{post.pk}:{post.image.name}",
+    )
+
+
+def image_processing_failed(post_id, name):
+    # Задача исчерпала попытки: вместо вечной заглушки показываем оригинал
+    post = Post.objects.filter(pk=post_id, image=name).first()
+    if post is None:
+        return
+    mark_failed(post)
+    invalidate_tags(post_tag(post_id), *stored_post_tags(post_id))
+
+
+@register(PROCESS_IMAGE, on_failure=image_processing_failed)
+def process_post_image(post_id, name):
+    post = Post.objects.filter(pk=post_id, image=name).first()
+    if post is None:
+        return  # Публикацию удалили или заменили изображение
+    save_renditions(post, process_image(name))
+    # Ленты и страница поста перестают показывать заглушку
+    invalidate_tags(post_tag(post_id), *stored_post_tags(post_id))
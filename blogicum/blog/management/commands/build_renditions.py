@@ -0,0 +1,99 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.utils import timezone
+
+from blog.images import build_renditions
+from blog.models import Post
+
+
+def _build(pk, name):
+    # Выполняется в дочернем процессе: только файлы, без обращений к БД
+    try:
+        return pk, build_renditions(name), None
+    except Exception as error:
+        return pk, None, f"{type(error).__name__}: {error}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт уменьшенные копии изображений публикаций, у которых их ещё "
+        "нет, в нескольких процессах."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Количество процессов для обработки изображений.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Сколько публикаций выбирать из БД и сохранять за раз.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Пересоздать копии и для уже обработанных изображений.",
+        )
+
+    def pending(self, batch_size, force):
+        # Постранично по первичному ключу, без загрузки моделей целиком
+        last_id = 0
+        while True:
+            rows = list(
+                Post.objects.filter(pk__gt=last_id)
+                .exclude(image="")
+                .exclude(image__isnull=True)
+                .order_by("pk")
+                .values_list("pk", "image", "image_renditions")[:batch_size]
+            )
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [
+                (pk, name)
+                for pk, name, data in rows
+                # Неудачные фоновые обработки тоже пробуем ещё раз
+                if force
+                or (data or {}).get("name") != name
+                or (data or {}).get("failed")
+            ]
+
+    def handle(self, *args, workers, batch_size, force, **options):
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for batch in self.pending(batch_size, force):
+                # Процессы создаются при первой отправке задачи: соединения
+                # с БД не должны наследоваться дочерними процессами
+                connections.close_all()
+                futures = [
+                    executor.submit(_build, pk, name) for pk, name in batch
+                ]
+                results = []
+                now = timezone.now()
+                for future in as_completed(futures):
+                    pk, data, error = future.result()
+                    if error:
+                        failed += 1
+                        self.stderr.write(f"Публикация {pk}: {error}")
+                    else:
+                        # updated_at сбрасывает кэш карточки публикации
+                        results.append(
+                            Post(pk=pk, image_renditions=data, updated_at=now)
+                        )
+                with transaction.atomic():
+                    Post.objects.bulk_update(
+                        results, ["image_renditions", "updated_at"]
+                    )
+                done += len(results)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обработано изображений: {done}, с ошибками: {failed}"
+            )
+        )
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = (
+        "Собирает карты сайта в SITEMAP_ROOT: пересоздаёт только шарды "
+        "месяцев, публикации которых изменились с прошлого запуска."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--base-url",
+            default=settings.SITEMAP_BASE_URL,
+            help="Адрес сайта для ссылок в картах.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Пересобрать все шарды.",
+        )
+
+    def handle(self, *args, base_url, force, **options):
+        result = build_sitemaps(base_url, force=force)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Пересобрано месяцев: {len(result['rebuilt'])}, "
+                f"удалено: {len(result['removed'])}"
+            )
+        )
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from blog.transfer import CHUNK_SIZE, export_blog, open_dump
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает пользователей, категории, места, публикации и "
+        "комментарии в JSON Lines (.gz — со сжатием), не загружая "
+        "таблицы в память целиком."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="Файл дампа: blog.jsonl, blog.jsonl.gz или - для stdout.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Сколько строк читать из БД за раз.",
+        )
+
+    def handle(self, *args, path, chunk_size, **options):
+        with open_dump(path, "w") as stream:
+            counts = export_blog(stream, chunk_size)
+        # При выгрузке в stdout отчёт не должен попасть в дамп
+        report = self.stderr if path == "-" else self.stdout
+        for label, count in counts.items():
+            report.write(f"{label:16}{count:>12}")
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.transfer import (
+    CHUNK_SIZE,
+    TransferError,
+    import_blog,
+    open_dump,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Загружает дамп export_blog пачками bulk_create с сохранением pk. "
+        "Внешние ключи проверяются после загрузки, как в loaddata."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="Файл дампа: blog.jsonl, blog.jsonl.gz или - для stdin.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Строк в одной транзакции bulk_create.",
+        )
+        parser.add_argument(
+            "--ignore-conflicts",
+            action="store_true",
+            help="Пропускать строки, pk которых уже есть в БД.",
+        )
+
+    def handle(self, *args, path, batch_size, ignore_conflicts, **options):
+        try:
+            with open_dump(path, "r") as stream:
+                counts = import_blog(stream, batch_size, ignore_conflicts)
+        except TransferError as error:
+            raise CommandError(error)
+        for label, count in counts.items():
+            self.stdout.write(f"{label:16}{count:>12}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Загружено строк: {sum(counts.values())}")
+        )
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает Post.comment_count (одобренные комментарии) "
+        "пакетами. Нужна для ремонта счётчиков после loaddata, ручных "
+        "правок БД и т. п."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Количество публикаций, пересчитываемых за одну транзакцию.",
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_id = 0
+        checked = fixed = 0
+        while True:
+            # Идём по первичному ключу, без OFFSET и без загрузки моделей
+            current = dict(
+                Post.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", "comment_count")[:batch_size]
+            )
+            if not current:
+                break
+            last_id = max(current)
+            with transaction.atomic():
+                actual = dict(
+                    Comment.objects.filter(
+                        post_id__in=current, is_approved=True
+                    )
+                    .order_by()
+                    .values("post_id")
+                    .annotate(total=Count("pk"))
+                    .values_list("post_id", "total")
+                )
+                changed = [
+                    Post(pk=pk, comment_count=actual.get(pk, 0))
+                    for pk, count in current.items()
+                    if count != actual.get(pk, 0)
+                ]
+                Post.objects.bulk_update(changed, ["comment_count"])
+            checked += len(current)
+            fixed += len(changed)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Проверено публикаций: {checked}, исправлено: {fixed}"
+            )
+        )
@@ -0,0 +1,108 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.seeding import DEFAULTS, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет БД синтетическими пользователями, категориями, местами, "
+        "публикациями и комментариями; печатает скорость вставки."
+    )
+
+    def add_arguments(self, parser):
+        for name in ("users", "categories", "locations", "posts", "comments"):
+            parser.add_argument(
+                f"--{name}",
+                type=int,
+                default=DEFAULTS[name],
+                help=(
+                    "Сколько строк добавить "
+                    f"(по умолчанию {DEFAULTS[name]})."
+                ),
+            )
+        parser.add_argument(
+            "--author-skew",
+            type=float,
+            default=DEFAULTS["author_skew"],
+            help="Показатель Ципфа для авторов: 0 — равномерно, "
+                 "больше — несколько авторов пишут почти всё.",
+        )
+        parser.add_argument(
+            "--comment-skew",
+            type=float,
+            default=DEFAULTS["comment_skew"],
+            help="Показатель Ципфа для комментариев: чем больше, тем "
+                 "сильнее они сосредоточены на «горячих» публикациях.",
+        )
+        parser.add_argument(
+            "--category-skew",
+            type=float,
+            default=DEFAULTS["category_skew"],
+        )
+        parser.add_argument(
+            "--future-share",
+            type=float,
+            default=DEFAULTS["future_share"],
+            help="Доля отложенных публикаций с pub_date в будущем.",
+        )
+        parser.add_argument(
+            "--unpublished-share",
+            type=float,
+            default=DEFAULTS["unpublished_share"],
+        )
+        parser.add_argument(
+            "--location-share",
+            type=float,
+            default=DEFAULTS["location_share"],
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=DEFAULTS["days"],
+            help="За сколько дней в прошлом разбросаны публикации.",
+        )
+        parser.add_argument("--seed", type=int, default=DEFAULTS["seed"])
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Строк в одной транзакции bulk_create.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Процессов для генерации шардов; 1 — без пула. "
+                 f"На этой машине ядер: {os.cpu_count()}.",
+        )
+        parser.add_argument(
+            "--password",
+            help="Пароль для всех созданных пользователей "
+                 "(по умолчанию войти под ними нельзя).",
+        )
+
+    def handle(self, *args, verbosity, **options):
+        log = self.stdout.write if verbosity > 1 else None
+        options = {
+            key: options[key]
+            for key in (*DEFAULTS, "workers", "batch_size", "password")
+        }
+        try:
+            report = seed(log=log, **options)
+        except ValueError as error:
+            raise CommandError(error)
+        for table, result in report.items():
+            self.stdout.write(
+                f"{table:16}{result['rows']:>12} строк"
+                f"{result['seconds']:>10} с"
+                f"{result['rows_per_sec'] or 0:>12} строк/с"
+            )
+        total_rows = sum(result["rows"] for result in report.values())
+        total_seconds = sum(result["seconds"] for result in report.values())
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Добавлено строк: {total_rows} за {total_seconds:.1f} с"
+            )
+        )
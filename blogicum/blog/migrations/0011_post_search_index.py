@@ -0,0 +1,60 @@
+from django.db import migrations
+
+# Полнотекстовый индекс FTS5 по заголовку и тексту публикаций (только SQLite).
+# Таблица с внешним содержимым (content='blog_post'): индекс хранит только
+# токены, а триггеры обновляют его при любых изменениях blog_post.
+CREATE_SQL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_fts USING fts5("
+    "title, text, content='blog_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS blog_post_fts_ai AFTER INSERT ON blog_post "
+    "BEGIN "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS blog_post_fts_ad AFTER DELETE ON blog_post "
+    "BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); "
+    "END",
+    "CREATE TRIGGER IF NOT EXISTS blog_post_fts_au "
+    "AFTER UPDATE OF title, text ON blog_post "
+    "BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); "
+    "END",
+    "INSERT INTO blog_post_fts(blog_post_fts) VALUES ('rebuild')",
+)
+DROP_SQL = (
+    "DROP TRIGGER IF EXISTS blog_post_fts_ai",
+    "DROP TRIGGER IF EXISTS blog_post_fts_ad",
+    "DROP TRIGGER IF EXISTS blog_post_fts_au",
+    "DROP TABLE IF EXISTS blog_post_fts",
+)
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_post_image_renditions'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
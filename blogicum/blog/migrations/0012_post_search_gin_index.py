@@ -0,0 +1,31 @@
+from django.db import migrations
+
+# Полнотекстовый индекс публикаций для PostgreSQL. Выражение должно
+# совпадать с условием в blog/search.py, иначе планировщик его не возьмёт.
+# На SQLite ту же роль выполняет FTS5 (0011_post_search_index).
+INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS blog_post_search_gin ON blog_post "
+    "USING gin (to_tsvector('russian', title || ' ' || text))"
+)
+DROP_SQL = "DROP INDEX IF EXISTS blog_post_search_gin"
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(INDEX_SQL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.16 on 2026-10-18 03:11
+
+from django.db import migrations, models
+
+
+def approve_existing(apps, schema_editor):
+    # До модерации показывались все комментарии, и comment_count считал
+    # все: одобряем их, чтобы ни видимость, ни счётчики не изменились
+    Comment = apps.get_model('blog', 'Comment')
+    Comment.objects.using(schema_editor.connection.alias).filter(
+        is_approved=False
+    ).update(is_approved=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_search_gin_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['is_approved', 'created_at', 'id'], name='comment_moderation_idx'),
+        ),
+        migrations.RunPython(approve_existing, migrations.RunPython.noop),
+    ]
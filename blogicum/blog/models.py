@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 from core.models import PublishedModel, CreatedModel  # базовые абстрактные модели
 
@@ -52,6 +53,31 @@ class Location(PublishedModel, CreatedModel):
         return self.name
 
 
+def published_filter():
+    # Условие видимости публикации для всех, кроме её автора
+    return models.Q(
+        is_published=True,
+        category__is_published=True,
+        pub_date__lte=timezone.now(),
+    )
+
+
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        # Опубликованные посты в опубликованных категориях, дата которых
+        # наступила
+        return self.filter(published_filter())
+
+    def with_related(self):
+        # Категория, место и автор нужны в каждой карточке публикации
+        return self.select_related("category", "location", "author")
+
+    def with_comment_count(self):
+        # Счётчик хранится в поле comment_count (см. blog/signals.py),
+        # агрегировать комментарии не нужно; метод оставлен для цепочек
+        return self
+
+
 class Post(PublishedModel, CreatedModel):
     # Заголовок публикации
     title = models.CharField(
@@ -77,6 +103,13 @@ class Post(PublishedModel, CreatedModel):
         null=True,
         verbose_name="Изображение",
     )
+    # Готовые уменьшенные копии изображения (см. blog/images.py)
+    image_renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Копии изображения",
+    )
 
     # Автор публикации (связь с моделью пользователя)
     author = models.ForeignKey(
@@ -102,11 +135,46 @@ class Post(PublishedModel, CreatedModel):
         related_name="posts",
         verbose_name="Категория",
     )
+    # Количество одобренных комментариев: хранится в таблице и обновляется
+    # сигналами и массовой модерацией (blog/signals.py, blog/moderation.py)
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество комментариев",
+    )
+
+    # Время последнего изменения: входит в ключи кэша карточки публикации
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Изменено",
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
         ordering = ("-pub_date",)
+        indexes = (
+            # Частичный индекс ровно под условие published(): обратный
+            # проход по (pub_date, id) даёт сортировку -pub_date, -id
+            models.Index(
+                fields=("pub_date", "id"),
+                condition=models.Q(is_published=True),
+                name="post_published_pub_date_idx",
+            ),
+            # Лента категории: category_id = ? и та же сортировка
+            models.Index(
+                fields=("category", "pub_date", "id"),
+                condition=models.Q(is_published=True),
+                name="post_category_pub_date_idx",
+            ),
+            # Профиль: автор видит и неопубликованные посты, индекс полный
+            models.Index(
+                fields=("author", "pub_date", "id"),
+                name="post_author_pub_date_idx",
+            ),
+        )
 
     def __str__(self):
         return self.title
@@ -140,6 +208,18 @@ class Comment(CreatedModel):
         verbose_name = "комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ("created_at",)  # Старые комментарии сначала
+        indexes = (
+            # Комментарии к посту в порядке добавления
+            models.Index(
+                fields=("post", "created_at", "id"),
+                name="comment_post_created_idx",
+            ),
+            # Очередь модерации: неодобренные от старых к новым
+            models.Index(
+                fields=("is_approved", "created_at", "id"),
+                name="comment_moderation_idx",
+            ),
+        )
 
     def __str__(self):
         return f"Комментарий от {self.author} к посту «{self.post.title[:50]}»"
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""Модерация комментариев.
+
+Остальным пользователям видны только одобренные комментарии, автору —
+ещё и свои. Post.comment_count считает только одобренные: одиночные
+изменения учитывают сигналы (blog/signals.py), массовые одобрение и
+отклонение — функции ниже. Каждая выполняет один UPDATE или DELETE
+комментариев ... WHERE id IN (...) и один UPDATE счётчиков всех
+затронутых публикаций, без COUNT(*) и без сигналов на каждую строку.
+"""
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest
+
+from .cache import invalidate_tags, post_scope_tags, post_tag
+from .models import Comment, Post
+
+MODERATE_PERMISSION = "blog.change_comment"
+
+
+def premoderation():
+    # True — новый комментарий виден остальным только после одобрения
+    return getattr(settings, "BLOG_COMMENT_PREMODERATION", False)
+
+
+def visible_comments(user):
+    # Условие для Comment.objects.filter(): одобренные и свои
+    condition = Q(is_approved=True)
+    if user.is_authenticated:
+        condition |= Q(author_id=user.pk)
+    return condition
+
+
+def _shift_counts(deltas):
+    # comment_count = comment_count + CASE id WHEN ... END одним запросом.
+    # Как и change_comment_count, не уводим счётчик ниже нуля: если он
+    # разошёлся с данными, CHECK PositiveIntegerField отменил бы всю пачку
+    deltas = {post_id: delta for post_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    Post.objects.filter(pk__in=deltas).update(
+        comment_count=Greatest(
+            F("comment_count") + Case(
+                *(
+                    When(pk=post_id, then=Value(delta))
+                    for post_id, delta in deltas.items()
+                ),
+                default=Value(0),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+    )
+
+
+def _invalidate(post_ids):
+    # Страницы публикаций и ленты, где выводится их счётчик комментариев
+    rows = Post.objects.filter(pk__in=post_ids).values(
+        "pk", "category__slug", "author__username"
+    )
+    tags = [post_tag(post_id) for post_id in post_ids]
+    for row in rows:
+        tags += post_scope_tags(row["category__slug"], row["author__username"])
+    invalidate_tags(*tags)
+
+
+def approve_comments(comment_ids):
+    """Одобряет комментарии; возвращает число одобренных."""
+    with transaction.atomic():
+        pending = list(
+            Comment.objects.select_for_update()
+            .filter(pk__in=comment_ids, is_approved=False)
+            .values_list("pk", "post_id")
+        )
+        if not pending:
+            return 0
+        Comment.objects.filter(pk__in=[pk for pk, _ in pending]).update(
+            is_approved=True
+        )
+        deltas = Counter(post_id for _, post_id in pending)
+        _shift_counts(deltas)
+    _invalidate(list(deltas))
+    return len(pending)
+
+
+def _delete_rows(model, pks):
+    # Прямой DELETE вместо QuerySet.delete(): тот загрузил бы комментарии
+    # и отправил post_delete на каждый, а счётчики и теги здесь и так
+    # обновляются пачкой. На комментарии ничто не ссылается, каскада нет
+    alias = router.db_for_write(model)
+    connection = connections[alias]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.pk.column)
+    placeholders = ", ".join(["%s"] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE {column} IN ({placeholders})", pks
+        )
+
+
+def reject_comments(comment_ids):
+    """Удаляет отклонённые комментарии; возвращает число удалённых."""
+    with transaction.atomic():
+        rows = list(
+            Comment.objects.select_for_update()
+            .filter(pk__in=comment_ids)
+            .values_list("pk", "post_id", "is_approved")
+        )
+        if not rows:
+            return 0
+        _delete_rows(Comment, [pk for pk, _, _ in rows])
+        deltas = Counter()
+        for _, post_id, approved in rows:
+            if approved:
+                deltas[post_id] -= 1
+        _shift_counts(deltas)
+    _invalidate({post_id for _, post_id, _ in rows})
+    return len(rows)
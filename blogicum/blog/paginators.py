@@ -0,0 +1,243 @@
+import base64
+import json
+from collections.abc import Sequence
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from core.routers import replica_cache_timeout
+
+from .cache import make_key
+
+
+class InvalidCursor(Exception):
+    # Курсор не удалось разобрать или он не подходит к сортировке
+    pass
+
+
+class CursorPage(Sequence):
+    # Страница курсорной пагинации: не знает ни номера, ни общего числа страниц
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage ({len(self.object_list)} objects)>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset-пагинация по набору полей сортировки.
+
+    Вместо OFFSET страница выбирается условием «строго после/до ключа»
+    последней показанной записи, поэтому глубокие страницы стоят столько же,
+    сколько первая, а COUNT(*) не нужен вовсе.
+    """
+
+    cursor_mode = True  # Признак для шаблона includes/paginator.html
+    NEXT = "n"
+    PREVIOUS = "p"
+
+    def __init__(self, object_list, per_page, ordering=("-pub_date", "-id")):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        # Список пар (имя поля, по убыванию ли)
+        self.ordering = [
+            (name.lstrip("-"), name.startswith("-")) for name in ordering
+        ]
+        self.model = object_list.model
+
+    def encode_cursor(self, obj, direction):
+        if isinstance(obj, dict):
+            # Строка из values(): value_to_string() читает атрибуты объекта
+            obj = SimpleNamespace(
+                **{
+                    self.model._meta.get_field(name).attname: obj[name]
+                    for name, _ in self.ordering
+                }
+            )
+        values = [
+            self.model._meta.get_field(name).value_to_string(obj)
+            for name, _ in self.ordering
+        ]
+        raw = json.dumps([direction, values], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            direction, values = json.loads(raw)
+            if direction not in (self.NEXT, self.PREVIOUS):
+                raise ValueError(direction)
+            if len(values) != len(self.ordering):
+                raise ValueError(values)
+            return direction, [
+                self.model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+        except Exception as error:
+            raise InvalidCursor(cursor) from error
+
+    def _after(self, values, reverse=False):
+        # Условие «строго после ключа» в порядке сортировки (или до него).
+        # Ведущее поле дополнительно ограничено диапазоном, чтобы СУБД
+        # могла сделать index range scan.
+        condition = Q()
+        for index, (name, descending) in enumerate(self.ordering):
+            lookup = "lt" if descending != reverse else "gt"
+            term = Q(**{f"{name}__{lookup}": values[index]})
+            for prev_index, (prev_name, _) in enumerate(self.ordering[:index]):
+                term &= Q(**{prev_name: values[prev_index]})
+            condition |= term
+        first_name, first_descending = self.ordering[0]
+        bound = "lte" if first_descending != reverse else "gte"
+        return Q(**{f"{first_name}__{bound}": values[0]}) & condition
+
+    def _order_by(self, reverse=False):
+        return [
+            f"-{name}" if descending != reverse else name
+            for name, descending in self.ordering
+        ]
+
+    def page(self, cursor=None):
+        if not cursor:
+            direction, values = self.NEXT, None
+        else:
+            direction, values = self.decode_cursor(cursor)
+        reverse = direction == self.PREVIOUS
+        queryset = self.object_list.order_by(*self._order_by(reverse))
+        if values is not None:
+            queryset = queryset.filter(self._after(values, reverse))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = self.encode_cursor(rows[-1], self.NEXT)
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(rows[0], self.PREVIOUS)
+        return CursorPage(rows, self, next_cursor, previous_cursor)
+
+
+def estimate_table_count(model, using="default"):
+    """Приблизительное число строк в таблице модели без COUNT(*).
+
+    PostgreSQL хранит оценку в pg_class.reltuples, SQLite — в sqlite_stat1
+    после ANALYZE; если статистики нет, берём MAX(id), который читается
+    из индекса. None — статистика SQLite есть, но числа строк всей таблицы
+    в ней нет: тогда вызывающий считает COUNT(*).
+    """
+    table = model._meta.db_table
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = %s::regclass",
+                [table],
+            )
+            row = cursor.fetchone()
+            if row and row[0] and row[0] > 0:
+                return int(row[0])
+        elif connection.vendor == "sqlite":
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'table' AND name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone():
+                # Первое число stat — строки, попавшие в индекс. У частичного
+                # индекса их меньше, чем в таблице, поэтому годятся только
+                # строка самой таблицы (idx IS NULL) и полные индексы
+                cursor.execute(
+                    "SELECT stat FROM sqlite_stat1 WHERE tbl = %s AND ("
+                    "idx IS NULL OR idx IN (SELECT name FROM "
+                    "pragma_index_list(%s) WHERE \"partial\" = 0)) LIMIT 1",
+                    [table, table],
+                )
+                row = cursor.fetchone()
+                if row:
+                    return int(row[0].split()[0])
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_stat1 WHERE tbl = %s LIMIT 1",
+                    [table],
+                )
+                if cursor.fetchone():
+                    return None
+    pk_name = model._meta.pk.attname
+    return model.objects.using(using).order_by(f"-{pk_name}").values_list(
+        pk_name, flat=True
+    ).first() or 0
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который не считает COUNT(*) на каждый запрос.
+
+    Стратегии (settings.BLOG_COUNT_STRATEGY):
+    "exact" — обычный COUNT(*); "cached" — COUNT(*) кэшируется по ключу
+    count_key и сбрасывается сменой версий тегов count_tags;
+    "estimated" — как "cached", но для разрешённых лент на больших таблицах
+    вместо COUNT(*) используется оценка числа строк таблицы.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, count_key=None, count_tags=(),
+                 allow_estimate=False):
+        super().__init__(
+            object_list, per_page, orphans, allow_empty_first_page
+        )
+        self.count_key = count_key
+        self.count_tags = count_tags
+        self.allow_estimate = allow_estimate
+
+    @cached_property
+    def count(self):
+        strategy = getattr(settings, "BLOG_COUNT_STRATEGY", "cached")
+        if strategy == "exact" or self.count_key is None:
+            return super().count
+        if strategy == "estimated" and self.allow_estimate:
+            estimate = estimate_table_count(
+                self.object_list.model, self.object_list.db
+            )
+            if estimate is not None and estimate >= getattr(
+                settings, "BLOG_ESTIMATED_COUNT_THRESHOLD", 100_000
+            ):
+                return estimate
+        key = make_key("count", self.count_tags, self.count_key)
+        value = cache.get(key)
+        if value is None:
+            value = super().count
+            cache.set(
+                key,
+                value,
+                replica_cache_timeout(
+                    getattr(settings, "BLOG_COUNT_CACHE_TIMEOUT", 60)
+                ),
+            )
+        return value
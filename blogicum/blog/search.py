@@ -0,0 +1,190 @@
+"""Полнотекстовый поиск публикаций.
+
+На SQLite используется виртуальная таблица FTS5 blog_post_fts
+(миграция 0011_post_search_index), которую триггеры держат в актуальном
+состоянии. Результаты ранжируются функцией bm25: совпадение в заголовке
+весит больше, чем в тексте. На PostgreSQL — to_tsvector по GIN-индексу
+(0012_post_search_gin_index) и ts_rank. На других СУБД поиск сводится
+к icontains.
+"""
+import re
+
+from django.db import connections
+from django.db.models import Q
+
+FTS_TABLE = "blog_post_fts"
+# Веса столбцов title и text для bm25
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+MAX_TERMS = 10
+
+TRIGGERS_SQL = {
+    "blog_post_fts_ai": (
+        "CREATE TRIGGER blog_post_fts_ai AFTER INSERT ON blog_post "
+        "BEGIN "
+        "INSERT INTO blog_post_fts(rowid, title, text) "
+        "VALUES (new.id, new.title, new.text); "
+        "END"
+    ),
+    "blog_post_fts_ad": (
+        "CREATE TRIGGER blog_post_fts_ad AFTER DELETE ON blog_post "
+        "BEGIN "
+        "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+        "VALUES ('delete', old.id, old.title, old.text); "
+        "END"
+    ),
+    "blog_post_fts_au": (
+        "CREATE TRIGGER blog_post_fts_au "
+        "AFTER UPDATE OF title, text ON blog_post "
+        "BEGIN "
+        "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+        "VALUES ('delete', old.id, old.title, old.text); "
+        "INSERT INTO blog_post_fts(rowid, title, text) "
+        "VALUES (new.id, new.title, new.text); "
+        "END"
+    ),
+}
+
+
+def search_terms(query):
+    # Только слова: операторы FTS5 (AND, NEAR, *, кавычки) из ввода
+    # пользователя не интерпретируются
+    return re.findall(r"\w+", query)[:MAX_TERMS]
+
+
+def match_expression(query):
+    """Строка для MATCH: все слова обязательны, последнее — как префикс."""
+    terms = [f'"{term}"' for term in search_terms(query)]
+    if not terms:
+        return ""
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+# Выражение GIN-индекса; в WHERE должно стоять ровно оно
+PG_VECTOR = "to_tsvector('russian', blog_post.title || ' ' || blog_post.text)"
+PG_RANKED_VECTOR = (
+    "setweight(to_tsvector('russian', blog_post.title), 'A') || "
+    "setweight(to_tsvector('russian', blog_post.text), 'D')"
+)
+
+
+def pg_tsquery(query):
+    """Запрос для to_tsquery: все слова через &, последнее — как префикс."""
+    terms = search_terms(query)
+    if not terms:
+        return ""
+    return " & ".join(terms) + ":*"
+
+
+# Наличие индекса по имени файла БД: проверяем один раз, а не на каждый поиск
+_index_exists = {}
+
+
+def search_backend(using="default"):
+    # "fts5", "postgresql" или None — простой поиск через icontains
+    vendor = connections[using].vendor
+    if vendor == "postgresql":
+        return "postgresql"
+    if vendor == "sqlite" and has_fts_index(using):
+        return "fts5"
+    return None
+
+
+def has_fts_index(using="default"):
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return False
+    name = connection.settings_dict["NAME"]
+    if name not in _index_exists:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'table' AND name = %s",
+                [FTS_TABLE],
+            )
+            _index_exists[name] = cursor.fetchone() is not None
+    return _index_exists[name]
+
+
+def search_posts(queryset, query, ranked=True):
+    """Фильтрует queryset публикаций по запросу query.
+
+    При ranked=True результаты упорядочены по релевантности, затем
+    от новых к старым.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    backend = search_backend(queryset.db)
+    if backend == "postgresql":
+        return _search_postgresql(queryset, query, ranked)
+    if backend is None:
+        condition = Q()
+        for term in search_terms(query):
+            condition &= Q(title__icontains=term) | Q(text__icontains=term)
+        queryset = queryset.filter(condition)
+        return queryset.order_by("-pub_date", "-id") if ranked else queryset
+    queryset = queryset.extra(
+        tables=[FTS_TABLE],
+        where=[
+            f"{FTS_TABLE}.rowid = blog_post.id",
+            f"{FTS_TABLE} MATCH %s",
+        ],
+        params=[expression],
+    )
+    if not ranked:
+        return queryset
+    return queryset.extra(
+        select={
+            "search_rank": (
+                f"bm25({FTS_TABLE}, {TITLE_WEIGHT}, {TEXT_WEIGHT})"
+            ),
+        },
+        order_by=["search_rank", "-pub_date", "-id"],
+    )
+
+
+def _search_postgresql(queryset, query, ranked):
+    queryset = queryset.extra(
+        where=[f"{PG_VECTOR} @@ to_tsquery('russian', %s)"],
+        params=[pg_tsquery(query)],
+    )
+    if not ranked:
+        return queryset
+    return queryset.extra(
+        select={
+            "search_rank": (
+                f"ts_rank({PG_RANKED_VECTOR}, to_tsquery('russian', %s))"
+            ),
+        },
+        select_params=[pg_tsquery(query)],
+        order_by=["-search_rank", "-pub_date", "-id"],
+    )
+
+
+def ensure_search_index(using="default"):
+    """Восстанавливает триггеры индекса, если их нет.
+
+    SQLite не умеет менять столбцы на месте, и миграции Django пересоздают
+    таблицу blog_post — вместе с ней пропадают и триггеры.
+    """
+    _index_exists.pop(connections[using].settings_dict["NAME"], None)
+    if not has_fts_index(using):
+        return
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+            "AND tbl_name = 'blog_post'"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [
+            sql for name, sql in TRIGGERS_SQL.items() if name not in existing
+        ]
+        for sql in missing:
+            cursor.execute(sql)
+        if missing:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+            )
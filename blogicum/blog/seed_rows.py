@@ -0,0 +1,166 @@
+"""Генерация строк публикаций и комментариев для seed_blog.
+
+Модуль не импортирует Django: его функции выполняются и в процессах
+пула (spawn), где Django не настроен. Строки — словари «attname ->
+значение»; из них собираются модели для bulk_create или кортежи для
+шардов — отдельных SQLite-файлов, которые затем сливаются в основную БД.
+"""
+import json
+import random
+import sqlite3
+from datetime import timedelta
+from itertools import accumulate
+
+# Комментарии появляются в первый месяц после выхода публикации
+COMMENT_WINDOW = timedelta(days=30)
+
+
+def zipf_weights(count, exponent):
+    # Вес k-го элемента пропорционален 1 / k^exponent; 0 — равномерно
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def cumulative(weights):
+    return list(accumulate(weights))
+
+
+def allocate(total, weights, rng):
+    """Распределяет total поровну весам (метод наибольших остатков).
+
+    Ранги перемешиваются, поэтому «горячие» элементы оказываются
+    в случайных местах, а не в начале.
+    """
+    if not total or not weights:
+        return [0] * len(weights)
+    scale = total / sum(weights)
+    shares = [weight * scale for weight in weights]
+    counts = [int(share) for share in shares]
+    remainders = sorted(
+        range(len(shares)),
+        key=lambda index: shares[index] - counts[index],
+        reverse=True,
+    )
+    for index in remainders[: total - sum(counts)]:
+        counts[index] += 1
+    rng.shuffle(counts)
+    return counts
+
+
+def _pick(rng, first_id, cum_weights):
+    if not cum_weights:
+        return None  # Например, категорий нет: поле допускает NULL
+    return first_id + rng.choices(
+        range(len(cum_weights)), cum_weights=cum_weights
+    )[0]
+
+
+def generate(task):
+    """Публикации и комментарии одного куска.
+
+    task — словарь с диапазоном id, числом комментариев у каждой
+    публикации и параметрами распределений (см. blog/seeding.py).
+    Возвращает два списка словарей: публикации и комментарии.
+    """
+    rng = random.Random(f"{task['seed']}:{task['post_id']}")
+    now = task["now"]
+    span = task["days"] * 86400
+    posts, comments = [], []
+    comment_id = task["comment_id"]
+    for offset, comment_count in enumerate(task["comment_counts"]):
+        post_id = task["post_id"] + offset
+        if rng.random() < task["future_share"]:
+            pub_date = now + timedelta(seconds=rng.random() * 30 * 86400)
+            created_at = now - timedelta(seconds=rng.random() * 86400)
+        else:
+            pub_date = now - timedelta(seconds=rng.random() * span)
+            created_at = pub_date
+        posts.append({
+            "id": post_id,
+            "is_published": rng.random() >= task["unpublished_share"],
+            "created_at": created_at,
+            "updated_at": created_at,
+            "title": f"Публикация {post_id}",
+            "text": " ".join(
+                rng.choices(task["words"], k=rng.randint(20, 300))
+            ),
+            "pub_date": pub_date,
+            "image": "",
+            "image_renditions": {},
+            "author_id": _pick(
+                rng, task["user_id"], task["author_weights"]
+            ),
+            "category_id": _pick(
+                rng, task["category_id"], task["category_weights"]
+            ),
+            "location_id": (
+                rng.randint(
+                    task["location_id"],
+                    task["location_id"] + task["locations"] - 1,
+                )
+                if task["locations"] and rng.random() < task["location_share"]
+                else None
+            ),
+            "comment_count": comment_count,
+        })
+        # Комментарии идут по порядку времени, как при живом обсуждении
+        start = min(pub_date, now)
+        window = min(COMMENT_WINDOW, now - start).total_seconds()
+        moments = sorted(rng.random() * window for _ in range(comment_count))
+        for number, moment in enumerate(moments, start=1):
+            comments.append({
+                "id": comment_id,
+                "created_at": start + timedelta(seconds=moment),
+                "text": f"Комментарий {number}: " + " ".join(
+                    rng.choices(task["words"], k=rng.randint(3, 30))
+                ),
+                "post_id": post_id,
+                "author_id": rng.randint(
+                    task["user_id"], task["user_id"] + task["users"] - 1
+                ),
+                "is_approved": True,
+            })
+            comment_id += 1
+    return posts, comments
+
+
+def _db_value(value):
+    # Формат, в котором Django хранит значения в SQLite
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    if isinstance(value, dict):
+        return json.dumps(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def write_shard(task):
+    """Генерирует кусок и пишет его в SQLite-файл task["path"].
+
+    task["columns"] — колонки таблиц публикаций и комментариев; в шарде
+    они без типов, SQLite хранит значения как есть. Возвращает путь
+    и число строк.
+    """
+    posts, comments = generate(task)
+    connection = sqlite3.connect(task["path"])
+    try:
+        with connection:
+            for table, rows in (
+                (task["post_table"], posts),
+                (task["comment_table"], comments),
+            ):
+                columns = task["columns"][table]
+                connection.execute(
+                    f'CREATE TABLE "{table}" ({", ".join(columns)})'
+                )
+                connection.executemany(
+                    f'INSERT INTO "{table}" ({", ".join(columns)}) '
+                    f'VALUES ({", ".join("?" * len(columns))})',
+                    (
+                        tuple(_db_value(row[column]) for column in columns)
+                        for row in rows
+                    ),
+                )
+    finally:
+        connection.close()
+    return task["path"], len(posts), len(comments)
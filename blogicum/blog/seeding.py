@@ -0,0 +1,353 @@
+"""Заполнение БД синтетическими данными (команда seed_blog).
+
+Пользователи, категории и места вставляются bulk_create. Публикации
+и комментарии генерируются кусками по CHUNK_POSTS публикаций
+(blog/seed_rows.py): в одном процессе — bulk_create пачками внутри
+транзакций, с пулом процессов — каждый процесс пишет свой кусок в
+отдельный SQLite-шард, а основной процесс сливает шарды в БД.
+Все id назначаются заранее, поэтому результат не зависит от числа
+процессов и данные можно добавлять в непустую БД.
+
+В одном процессе заполнение идёт в одной транзакции и при ошибке
+откатывается целиком. С пулом отката нет: шарды подключаются через
+ATTACH, а SQLite не выполняет его внутри транзакции, так что после
+ошибки уже вставленные строки остаются в БД.
+"""
+import multiprocessing
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import seed_rows
+from .models import Category, Comment, Location, Post
+
+User = get_user_model()
+CHUNK_POSTS = 10_000
+WORDS = (
+    "блог путешествие город море горы лес река утро вечер дорога поезд "
+    "музей кофе книга парк мост улица праздник рынок история фото ветер "
+    "дождь солнце снег осень весна лето зима друзья ужин прогулка"
+).split()
+DEFAULTS = {
+    "users": 100,
+    "categories": 20,
+    "locations": 50,
+    "posts": 1_000,
+    "comments": 10_000,
+    "author_skew": 1.1,  # Показатель Ципфа: 0 — все авторы пишут поровну
+    "comment_skew": 1.0,  # Насколько комментарии сосредоточены на «горячих»
+    "category_skew": 0.8,
+    "future_share": 0.02,  # Доля отложенных публикаций
+    "unpublished_share": 0.03,
+    "location_share": 0.5,
+    "days": 3 * 365,  # За сколько дней в прошлом разбросаны публикации
+    "seed": 0,
+}
+
+
+def _next_id(model):
+    return (model.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+
+
+def _timed(report, name, function):
+    started = time.perf_counter()
+    rows = function()
+    elapsed = time.perf_counter() - started
+    report[name] = {
+        "rows": rows,
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": round(rows / elapsed) if elapsed else None,
+    }
+
+
+def _bulk_insert(model, objects, batch_size):
+    total = 0
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= batch_size:
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        with transaction.atomic():
+            model.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    # auto_now/auto_now_add перезаписали бы сгенерированные даты
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False)
+        or getattr(field, "auto_now_add", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _columns(model):
+    return [field.column for field in model._meta.concrete_fields]
+
+
+def _merge_shard(path, batch_size):
+    """Переносит строки шарда в основную БД одной транзакцией."""
+    tables = ((Post, _columns(Post)), (Comment, _columns(Comment)))
+    if connection.vendor == "sqlite":
+        # Один INSERT ... SELECT на таблицу, без Python в середине.
+        # ATTACH и DETACH — вне транзакции: внутри неё SQLite держит шард
+        with connection.cursor() as cursor:
+            cursor.execute("ATTACH DATABASE %s AS shard", [str(path)])
+            try:
+                with transaction.atomic():
+                    for model, columns in tables:
+                        names = ", ".join(f'"{column}"' for column in columns)
+                        table = model._meta.db_table
+                        cursor.execute(
+                            f'INSERT INTO main."{table}" ({names}) '
+                            f'SELECT {names} FROM shard."{table}"'
+                        )
+            finally:
+                cursor.execute("DETACH DATABASE shard")
+        return
+    shard = sqlite3.connect(path)
+    try:
+        with transaction.atomic(), connection.cursor() as cursor:
+            for model, columns in tables:
+                boolean = [
+                    field.get_internal_type() == "BooleanField"
+                    for field in model._meta.concrete_fields
+                ]
+                table = model._meta.db_table
+                names = ", ".join(
+                    connection.ops.quote_name(column) for column in columns
+                )
+                insert = (
+                    f"INSERT INTO {connection.ops.quote_name(table)} "
+                    f"({names}) VALUES ({', '.join(['%s'] * len(columns))})"
+                )
+                rows = shard.execute(
+                    f'SELECT {", ".join(columns)} FROM "{table}"'
+                )
+                while batch := rows.fetchmany(batch_size):
+                    cursor.executemany(insert, [
+                        tuple(
+                            bool(value) if is_bool else value
+                            for value, is_bool in zip(row, boolean)
+                        )
+                        for row in batch
+                    ])
+    finally:
+        shard.close()
+
+
+def check_options(options):
+    # Проверяем до вставки, чтобы не оставить в БД половину данных
+    for name in ("users", "categories", "locations", "posts", "comments"):
+        if options[name] < 0:
+            raise ValueError(f"{name} не может быть отрицательным")
+    if options["posts"] and not options["users"]:
+        raise ValueError("Публикациям нужны авторы: задайте users > 0")
+    if options["comments"] and not options["posts"]:
+        raise ValueError("Комментариям нужны публикации: задайте posts > 0")
+
+
+def seed(workers=1, batch_size=5000, password=None, log=None, **options):
+    """Добавляет в БД синтетические данные.
+
+    options — объёмы и параметры распределений, как в DEFAULTS.
+    Возвращает отчёт {таблица: {"rows", "seconds", "rows_per_sec"}}.
+    Некорректные объёмы — ValueError до начала вставки.
+    """
+    options = {**DEFAULTS, **options}
+    check_options(options)
+    if workers > 1:
+        return _seed(workers, batch_size, password, log, options)
+    with transaction.atomic():
+        return _seed(workers, batch_size, password, log, options)
+
+
+def _seed(workers, batch_size, password, log, options):
+    rng = random.Random(options["seed"])
+    now = timezone.now()
+    report = {}
+    first = {
+        "user": _next_id(User),
+        "category": _next_id(Category),
+        "location": _next_id(Location),
+        "post": _next_id(Post),
+        "comment": _next_id(Comment),
+    }
+    # Один хэш на всех: make_password медленный намеренно
+    password_hash = make_password(password) if password else "!"
+
+    _timed(report, "users", lambda: _bulk_insert(
+        User,
+        (
+            User(
+                id=user_id,
+                username=f"seed{user_id}",
+                password=password_hash,
+                date_joined=now,
+            )
+            for user_id in range(
+                first["user"], first["user"] + options["users"]
+            )
+        ),
+        batch_size,
+    ))
+    _timed(report, "categories", lambda: _bulk_insert(
+        Category,
+        (
+            Category(
+                id=category_id,
+                title=f"Категория {category_id}",
+                description=" ".join(rng.choices(WORDS, k=12)),
+                slug=f"seed-{category_id}",
+                # Каждая двадцатая категория скрыта
+                is_published=category_id % 20 != 0,
+            )
+            for category_id in range(
+                first["category"], first["category"] + options["categories"]
+            )
+        ),
+        batch_size,
+    ))
+    _timed(report, "locations", lambda: _bulk_insert(
+        Location,
+        (
+            Location(id=location_id, name=f"Место {location_id}")
+            for location_id in range(
+                first["location"], first["location"] + options["locations"]
+            )
+        ),
+        batch_size,
+    ))
+
+    comment_counts = seed_rows.allocate(
+        options["comments"],
+        seed_rows.zipf_weights(options["posts"], options["comment_skew"]),
+        rng,
+    )
+    common = {
+        "seed": options["seed"],
+        "now": now,
+        "days": options["days"],
+        "words": WORDS,
+        "future_share": options["future_share"],
+        "unpublished_share": options["unpublished_share"],
+        "location_share": options["location_share"],
+        "user_id": first["user"],
+        "users": options["users"],
+        "category_id": first["category"],
+        "location_id": first["location"],
+        "locations": options["locations"],
+        "author_weights": seed_rows.cumulative(
+            seed_rows.zipf_weights(options["users"], options["author_skew"])
+        ),
+        "category_weights": seed_rows.cumulative(
+            seed_rows.zipf_weights(
+                options["categories"], options["category_skew"]
+            )
+        ),
+        "post_table": Post._meta.db_table,
+        "comment_table": Comment._meta.db_table,
+        "columns": {
+            Post._meta.db_table: _columns(Post),
+            Comment._meta.db_table: _columns(Comment),
+        },
+    }
+    tasks = []
+    comment_id = first["comment"]
+    for start in range(0, options["posts"], CHUNK_POSTS):
+        counts = comment_counts[start:start + CHUNK_POSTS]
+        tasks.append({
+            **common,
+            "post_id": first["post"] + start,
+            "comment_id": comment_id,
+            "comment_counts": counts,
+        })
+        comment_id += sum(counts)
+
+    started = time.perf_counter()
+    if workers > 1:
+        posts, comments = _seed_with_pool(tasks, workers, batch_size, log)
+    else:
+        posts = comments = 0
+        with explicit_timestamps(Post, Comment):
+            for task in tasks:
+                post_rows, comment_rows = seed_rows.generate(task)
+                posts += _bulk_insert(
+                    Post, (Post(**row) for row in post_rows), batch_size
+                )
+                comments += _bulk_insert(
+                    Comment,
+                    (Comment(**row) for row in comment_rows),
+                    batch_size,
+                )
+                if log:
+                    log(f"Публикаций: {posts}, комментариев: {comments}")
+    # Публикации и комментарии пишутся вперемешку, время у них общее
+    elapsed = time.perf_counter() - started
+    report["posts+comments"] = {
+        "rows": posts + comments,
+        "posts": posts,
+        "comments": comments,
+        "seconds": round(elapsed, 2),
+        "rows_per_sec": (
+            round((posts + comments) / elapsed) if elapsed else None
+        ),
+    }
+
+    # Явные id не сдвигают последовательности PostgreSQL
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(
+            no_style(), [User, Category, Location, Post, Comment]
+        ):
+            cursor.execute(sql)
+    return report
+
+
+def _seed_with_pool(tasks, workers, batch_size, log):
+    # Процессы только генерируют шарды; в основную БД пишет один процесс,
+    # поэтому SQLite не упирается в блокировку записи
+    posts = comments = 0
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        for index, task in enumerate(tasks):
+            task["path"] = str(Path(directory) / f"shard-{index}.sqlite3")
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context
+        ) as executor:
+            for path, post_rows, comment_rows in executor.map(
+                seed_rows.write_shard, tasks
+            ):
+                _merge_shard(path, batch_size)
+                Path(path).unlink()
+                posts += post_rows
+                comments += comment_rows
+                if log:
+                    log(f"Публикаций: {posts}, комментариев: {comments}")
+    return posts, comments
@@ -0,0 +1,179 @@
+import threading
+
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete,
+    post_migrate,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from .cache import (
+    ALL_TAG,
+    author_tag,
+    invalidate_tags,
+    post_tag,
+    stored_post_tags,
+)
+from .images import needs_renditions, processing_mode, update_renditions
+from .jobs import enqueue_image_processing
+from .models import Category, Comment, Location, Post, User
+from .search import ensure_search_index
+
+# Публикации, которые сейчас удаляются вместе с комментариями каскадом:
+# для них счётчик комментариев обновлять бессмысленно
+_deleting = threading.local()
+
+
+def _deleting_post_ids():
+    if not hasattr(_deleting, "post_ids"):
+        _deleting.post_ids = set()
+    return _deleting.post_ids
+
+
+def change_comment_count(post_id, delta):
+    # Атомарно меняем счётчик одним UPDATE без чтения публикации
+    if post_id is None or post_id in _deleting_post_ids():
+        return
+    queryset = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        queryset = queryset.filter(comment_count__gte=-delta)
+    queryset.update(comment_count=F("comment_count") + delta)
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_post(sender, instance, raw=False, **kwargs):
+    # Запоминаем прежние публикацию и одобрение: комментарий могут
+    # перенести (в админке) или одобрить
+    instance._previous_state = None
+    if not raw and instance.pk and not instance._state.adding:
+        instance._previous_state = (
+            Comment.objects.filter(pk=instance.pk)
+            .values_list("post_id", "is_approved")
+            .first()
+        )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    # Счётчик учитывает только одобренные комментарии (см. blog/moderation.py)
+    if raw:
+        return  # После loaddata счётчики пересчитывает recount_comments
+    if created:
+        if instance.is_approved:
+            change_comment_count(instance.post_id, 1)
+        invalidate_tags(
+            post_tag(instance.post_id), *stored_post_tags(instance.post_id)
+        )
+        return
+    previous = getattr(instance, "_previous_state", None)
+    if previous and previous != (instance.post_id, instance.is_approved):
+        previous_post_id, was_approved = previous
+        if was_approved:
+            change_comment_count(previous_post_id, -1)
+        if instance.is_approved:
+            change_comment_count(instance.post_id, 1)
+        invalidate_tags(
+            post_tag(previous_post_id),
+            *stored_post_tags(previous_post_id),
+            *stored_post_tags(instance.post_id),
+        )
+    # Правка текста видна только на странице публикации
+    invalidate_tags(post_tag(instance.post_id))
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.post_id in _deleting_post_ids():
+        return  # Ленты сбросит удаление самой публикации
+    if instance.is_approved:
+        change_comment_count(instance.post_id, -1)
+    invalidate_tags(
+        post_tag(instance.post_id), *stored_post_tags(instance.post_id)
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_tags(sender, instance, raw=False, **kwargs):
+    # Публикация могла сменить категорию или автора: старые ленты тоже
+    # нужно инвалидировать
+    instance._previous_tags = []
+    if not raw and instance.pk and not instance._state.adding:
+        instance._previous_tags = stored_post_tags(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if needs_renditions(instance):
+        if processing_mode() == "inline":
+            update_renditions(instance)
+        else:
+            # Декодирование и сжатие — в run_jobs, не в потоке запроса
+            enqueue_image_processing(instance)
+    invalidate_tags(
+        *getattr(instance, "_previous_tags", []),
+        *stored_post_tags(instance.pk),
+    )
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender, instance, **kwargs):
+    # pre_delete отправляется для всех объектов до начала каскадного удаления
+    _deleting_post_ids().add(instance.pk)
+    instance._previous_tags = stored_post_tags(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    _deleting_post_ids().discard(instance.pk)
+    invalidate_tags(*getattr(instance, "_previous_tags", []))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def category_changed(sender, **kwargs):
+    # Снятие категории или места с публикации меняет все ленты разом
+    invalidate_tags(ALL_TAG)
+
+
+def _is_login_only(update_fields):
+    # Вход в систему обновляет только last_login — это ничего не меняет
+    return update_fields is not None and set(update_fields) <= {"last_login"}
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw=False, update_fields=None,
+                      **kwargs):
+    instance._previous_username = None
+    if not raw and instance.pk and not _is_login_only(update_fields):
+        instance._previous_username = (
+            User.objects.filter(pk=instance.pk)
+            .values_list("username", flat=True)
+            .first()
+        )
+
+
+@receiver(post_save, sender=User)
+def user_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or _is_login_only(update_fields):
+        return
+    previous = getattr(instance, "_previous_username", None)
+    if previous and previous != instance.username:
+        # Имя автора выводится на всех лентах рядом с его постами
+        invalidate_tags(ALL_TAG)
+    else:
+        invalidate_tags(author_tag(instance.username))
+
+
+@receiver(post_migrate)
+def database_reset(sender, **kwargs):
+    # migrate/flush меняют данные в обход сигналов моделей
+    if sender.name == "blog":
+        invalidate_tags(ALL_TAG)
+        ensure_search_index(kwargs.get("using", "default"))
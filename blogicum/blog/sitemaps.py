@@ -0,0 +1,255 @@
+"""Предварительно собранные карты сайта (команда build_sitemaps).
+
+Публикации раскладываются по файлам-шардам по месяцу pub_date
+(posts-2024-05-1.xml.gz и т. д., не больше MAX_URLS адресов в файле).
+Для каждого месяца в manifest.json хранится подпись — число видимых
+публикаций, последний updated_at и наибольший id, — и при повторном запуске
+перезаписываются только месяцы, подпись которых изменилась. Категории и
+профили авторов видимых публикаций пересобираются каждый раз. Индекс
+sitemap.xml ссылается на все шарды; файлы отдаёт views.static.serve или
+веб-сервер.
+"""
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, Exists, Max, OuterRef
+from django.db.models.functions import TruncMonth
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Category, Post, User
+
+MAX_URLS = 50_000  # Ограничение протокола sitemaps.org на один файл
+INDEX_NAME = "sitemap.xml"
+MANIFEST_NAME = "manifest.json"
+CHUNK_SIZE = 2000
+XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def sitemap_root():
+    return Path(settings.SITEMAP_ROOT)
+
+
+def _url_entry(location, lastmod=None):
+    entry = f"<url><loc>{escape(location)}</loc>"
+    if lastmod is not None:
+        entry += f"<lastmod>{lastmod.date().isoformat()}</lastmod>"
+    return entry + "</url>\n"
+
+
+class ShardWriter:
+    """Пишет адреса в gzip-файлы prefix-1.xml.gz, prefix-2.xml.gz, ...
+
+    Файл пишется во временный и переименовывается после закрытия, чтобы
+    веб-сервер никогда не отдал недописанный шард.
+    """
+
+    def __init__(self, root, prefix):
+        self.root = root
+        self.prefix = prefix
+        self.files = []
+        self.file = None
+        self.count = 0
+
+    def _open(self):
+        name = f"{self.prefix}-{len(self.files) + 1}.xml.gz"
+        self.files.append(name)
+        self.path = self.root / name
+        self.file = gzip.open(
+            self.path.with_suffix(".tmp"), "wt", encoding="utf-8"
+        )
+        self.file.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<urlset xmlns="{XMLNS}">\n'
+        )
+        self.count = 0
+
+    def _close(self):
+        self.file.write("</urlset>\n")
+        self.file.close()
+        os.replace(self.path.with_suffix(".tmp"), self.path)
+        self.file = None
+
+    def write(self, entry):
+        if self.file is None or self.count >= MAX_URLS:
+            if self.file is not None:
+                self._close()
+            self._open()
+        self.file.write(entry)
+        self.count += 1
+
+    def close(self):
+        if self.file is not None:
+            self._close()
+        return self.files
+
+
+def month_signatures():
+    """{"ГГГГ-ММ": [число, последний updated_at, наибольший id]}.
+
+    Все месяцы считаются одним запросом.
+    """
+    rows = (
+        Post.objects.published()
+        .annotate(month=TruncMonth("pub_date"))
+        .order_by()
+        .values("month")
+        .annotate(total=Count("id"), updated=Max("updated_at"), last=Max("id"))
+    )
+    return {
+        row["month"].strftime("%Y-%m"): [
+            row["total"],
+            row["updated"].isoformat(),
+            row["last"],
+        ]
+        for row in rows
+    }
+
+
+def _month_range(month):
+    start = timezone.make_aware(datetime.strptime(month, "%Y-%m"))
+    end = (start + timedelta(days=32)).replace(day=1)
+    return start, end
+
+
+def write_month(root, base_url, month):
+    # Публикации месяца в порядке pub_date, без загрузки всех строк в память
+    start, end = _month_range(month)
+    rows = (
+        Post.objects.published()
+        .filter(pub_date__gte=start, pub_date__lt=end)
+        .order_by("pub_date", "id")
+        .values_list("id", "updated_at")
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    writer = ShardWriter(root, f"posts-{month}")
+    for post_id, updated_at in rows:
+        writer.write(
+            _url_entry(
+                base_url + reverse("blog:post_detail", args=[post_id]),
+                updated_at,
+            )
+        )
+    return writer.close()
+
+
+def write_categories(root, base_url):
+    writer = ShardWriter(root, "categories")
+    slugs = (
+        Category.objects.filter(is_published=True)
+        .order_by("id")
+        .values_list("slug", flat=True)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for slug in slugs:
+        writer.write(
+            _url_entry(base_url + reverse("blog:category_posts", args=[slug]))
+        )
+    return writer.close()
+
+
+def write_profiles(root, base_url):
+    # Только авторы хотя бы одной видимой публикации: профиль без них
+    # для поисковика — пустая страница
+    writer = ShardWriter(root, "profiles")
+    usernames = (
+        User.objects.filter(
+            Exists(Post.objects.published().filter(author=OuterRef("pk"))),
+            is_active=True,
+        )
+        .order_by("id")
+        .values_list("username", flat=True)
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for username in usernames:
+        writer.write(
+            _url_entry(base_url + reverse("blog:profile", args=[username]))
+        )
+    return writer.close()
+
+
+def _remove(root, names):
+    for name in names:
+        (root / name).unlink(missing_ok=True)
+
+
+def write_index(root, base_url, files):
+    path = root / INDEX_NAME
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as index:
+        index.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<sitemapindex xmlns="{XMLNS}">\n'
+        )
+        for name, lastmod in files:
+            location = base_url + reverse("sitemap_file", args=[name])
+            index.write(
+                f"<sitemap><loc>{escape(location)}</loc>"
+                f"<lastmod>{lastmod}</lastmod></sitemap>\n"
+            )
+        index.write("</sitemapindex>\n")
+    os.replace(tmp, path)
+
+
+def build_sitemaps(base_url, root=None, force=False):
+    """Пересобирает изменившиеся шарды и индекс.
+
+    Возвращает словарь со списками пересобранных и удалённых месяцев.
+    """
+    root = Path(root or sitemap_root())
+    root.mkdir(parents=True, exist_ok=True)
+    base_url = base_url.rstrip("/")
+    manifest_path = root / MANIFEST_NAME
+    previous = {}
+    if manifest_path.exists():
+        previous = json.loads(manifest_path.read_text())
+    # Другой домен — все адреса в шардах устарели
+    reuse = not force and previous.get("base_url") == base_url
+    old_months = previous.get("months", {})
+    signatures = month_signatures()
+    months, rebuilt = {}, []
+
+    for month, signature in sorted(signatures.items()):
+        stored = old_months.get(month)
+        if reuse and stored and stored["signature"] == signature:
+            months[month] = stored
+            continue
+        files = write_month(root, base_url, month)
+        months[month] = {
+            "signature": signature,
+            "files": files,
+            "lastmod": signature[1][:10],
+        }
+        rebuilt.append(month)
+        if stored:
+            # Шарды перезаписаны на месте; удаляем только лишние
+            _remove(root, set(stored["files"]) - set(files))
+    removed = sorted(set(old_months) - set(signatures))
+    for month in removed:
+        _remove(root, old_months[month]["files"])
+
+    today = timezone.now().date().isoformat()
+    static_files = write_categories(root, base_url) + write_profiles(
+        root, base_url
+    )
+    _remove(root, set(previous.get("static_files", [])) - set(static_files))
+    files = [(name, today) for name in static_files]
+    for month, data in sorted(months.items()):
+        files += [(name, data["lastmod"]) for name in data["files"]]
+    write_index(root, base_url, files)
+    manifest_path.write_text(
+        json.dumps(
+            {
+                "base_url": base_url,
+                "months": months,
+                "static_files": static_files,
+            },
+            indent=1,
+        )
+    )
+    return {"rebuilt": rebuilt, "removed": removed}
@@ -0,0 +1,42 @@
+from django import template
+from django.utils import translation
+
+from blog.cache import ALL_TAG, author_tag, make_key
+from blog.images import is_processing, srcsets
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_cache_key(post):
+    # Ключ фрагмента карточки меняется при правке поста (updated_at),
+    # новых и удалённых комментариях (comment_count), правке категорий и мест
+    # (ALL_TAG) и профиля автора (тег автора). Язык — из-за названий
+    # месяцев в дате: LocaleMiddleware выбирает его по Accept-Language
+    return make_key(
+        "card",
+        (ALL_TAG, author_tag(post.author.username)),
+        translation.get_language(),
+        post.pk,
+        post.updated_at.isoformat(),
+        post.comment_count,
+        post.is_published,
+        post.category_id,
+        post.location_id,
+    )
+
+
+@register.inclusion_tag("includes/post_image.html")
+def post_image(post, css_class=""):
+    # <picture> с WebP/JPEG-копиями; браузер сам выбирает ширину по sizes
+    sets = srcsets(post)
+    return {
+        "post": post,
+        "css_class": css_class,
+        # Пока фоновая задача не обработала файл, показываем заглушку
+        "processing": is_processing(post),
+        "webp_srcset": sets.get("image/webp"),
+        "jpeg_srcset": sets.get("image/jpeg"),
+        # Карточка и страница поста не шире 40rem
+        "sizes": "(max-width: 40rem) 100vw, 40rem",
+    }
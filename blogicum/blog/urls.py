@@ -1,16 +1,31 @@
 from django.urls import include, path
 
-from . import views
+from . import api, feeds, views
 
 app_name = "blog"
 
 post_urls = [
     path("create/", views.PostCreateView.as_view(), name="create_post"),
     path("<int:post_id>/", views.PostDetailView.as_view(), name="post_detail"),
-    path("<int:post_id>/edit/", views.PostUpdateView.as_view(), name="edit_post"),
-    path("<int:post_id>/delete/", views.PostDeleteView.as_view(), name="delete_post"),
     path(
-        "<int:post_id>/comment/", views.CommentCreateView.as_view(), name="add_comment"
+        "<int:post_id>/edit/",
+        views.PostUpdateView.as_view(),
+        name="edit_post",
+    ),
+    path(
+        "<int:post_id>/delete/",
+        views.PostDeleteView.as_view(),
+        name="delete_post",
+    ),
+    path(
+        "<int:post_id>/comments/",
+        views.PostCommentsView.as_view(),
+        name="post_comments",
+    ),
+    path(
+        "<int:post_id>/comment/",
+        views.CommentCreateView.as_view(),
+        name="add_comment",
     ),
     path(
         "<int:post_id>/edit_comment/<int:comment_id>/",
@@ -29,6 +44,40 @@ profile_urls = [
     path("<str:username>/", views.UserProfileView.as_view(), name="profile"),
 ]
 
+api_urls = [
+    path("posts/", api.PostListApiView.as_view(), name="api_posts"),
+    path(
+        "posts/<int:post_id>/",
+        api.PostDetailApiView.as_view(),
+        name="api_post_detail",
+    ),
+    path(
+        "posts/<int:post_id>/comments/",
+        api.CommentListApiView.as_view(),
+        name="api_comments",
+    ),
+    path(
+        "categories/",
+        api.CategoryListApiView.as_view(),
+        name="api_categories",
+    ),
+    path(
+        "categories/<slug:category_slug>/posts/",
+        api.CategoryPostListApiView.as_view(),
+        name="api_category_posts",
+    ),
+    path(
+        "profiles/<str:username>/",
+        api.ProfileApiView.as_view(),
+        name="api_profile",
+    ),
+    path(
+        "profiles/<str:username>/posts/",
+        api.ProfilePostListApiView.as_view(),
+        name="api_profile_posts",
+    ),
+]
+
 urlpatterns = [
     path("", views.PostListView.as_view(), name="index"),
     path(
@@ -36,6 +85,24 @@ urlpatterns = [
         views.CategoryPostListView.as_view(),
         name="category_posts",
     ),
+    path("search/", views.PostSearchView.as_view(), name="search"),
+    path(
+        "moderation/comments/",
+        views.CommentModerationView.as_view(),
+        name="comment_moderation",
+    ),
+    path("feeds/<str:feed_type>/", feeds.PostFeedView.as_view(), name="feed"),
+    path(
+        "feeds/category/<slug:category_slug>/<str:feed_type>/",
+        feeds.CategoryFeedView.as_view(),
+        name="category_feed",
+    ),
+    path(
+        "feeds/author/<str:username>/<str:feed_type>/",
+        feeds.AuthorFeedView.as_view(),
+        name="author_feed",
+    ),
     path("posts/", include(post_urls)),
+    path("api/", include(api_urls)),
     path("profile/", include(profile_urls)),
 ]
@@ -1,10 +1,19 @@
-from datetime import datetime
+import hashlib
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
+from django.contrib.auth.mixins import (
+    LoginRequiredMixin,
+    PermissionRequiredMixin,
+)
+from django.core.cache import cache
+from django.db.models import Max, OuterRef, Q, Subquery
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse_lazy
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils import translation
+from django.utils.http import http_date, quote_etag, urlencode
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -12,45 +21,279 @@ from django.views.generic import (
     ListView,
     UpdateView,
 )
-
+from django.views.static import serve
+
+from core.routers import replica_cache_timeout
+
+from .cache import (
+    ALL_TAG,
+    FEED_TAG,
+    author_tag,
+    category_tag,
+    get_tag_versions,
+    make_key,
+    post_tag,
+)
 from .forms import CommentForm, PostForm, UserForm
-from .models import Category, Comment, Post
+from .models import Category, Comment, Post, published_filter
+from .moderation import (
+    MODERATE_PERMISSION,
+    approve_comments,
+    premoderation,
+    reject_comments,
+    visible_comments,
+)
+from .paginators import CachedCountPaginator, CursorPaginator, InvalidCursor
+from .search import match_expression, search_posts
 
 User = get_user_model()  # Получение текущей модели пользователя
 PAGINATE_BY = 10  # Количество публикаций на одной странице
 
 
 class PostQuerysetMixin:
-    # Миксин для получения queryset с выборкой связанных объектов и подсчетом комментариев
+    # Миксин для получения queryset с выборкой связанных объектов.
+    # Количество комментариев хранится в Post.comment_count, без GROUP BY
     def get_queryset(self):
-        return Post.objects.select_related("category", "location", "author").annotate(
-            comment_count=Count("comments")
+        return Post.objects.with_related().with_comment_count()
+
+
+class CursorPaginationMixin:
+    # Миксин для курсорной (keyset) пагинации по (pub_date, id).
+    # Режим "page" — обычный Paginator с OFFSET, "cursor" — CursorPaginator.
+    pagination_mode = None  # None — берём BLOG_PAGINATION_MODE из настроек
+    cursor_ordering = ("-pub_date", "-id")
+
+    def get_pagination_mode(self):
+        # Наличие ?cursor= в запросе всегда включает курсорный режим
+        if "cursor" in self.request.GET:
+            return "cursor"
+        return self.pagination_mode or getattr(
+            settings, "BLOG_PAGINATION_MODE", "page"
         )
 
+    def paginate_queryset(self, queryset, page_size):
+        if self.get_pagination_mode() != "cursor":
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(self.request.GET.get("cursor"))
+        except InvalidCursor:
+            raise Http404("Некорректный курсор страницы")
+        # Возвращаем саму страницу как object_list, чтобы в шаблоне page_obj
+        # был CursorPage со ссылками на соседние страницы
+        return paginator, page, page, page.has_other_pages()
+
+
+class ConditionalGetMixin:
+    # Условные GET-запросы: get_validators() одним лёгким запросом вычисляет
+    # состояние страницы, и при совпадении If-None-Match/If-Modified-Since
+    # отвечаем 304 без основной выборки и рендеринга
+    vary_on_cookie = True  # Зависит ли страница от пользователя
+    # Страницы только для чтения: ReplicaRoutingMiddleware читает их с реплик
+    read_from_replica = True
+
+    def get_validators(self):
+        # Возвращает (данные для ETag, время последнего изменения)
+        return None, None
+
+    def get_viewer_state(self):
+        # Страница зависит от пользователя (формы, ссылки на правку) и его
+        # CSRF-токена, который меняется при каждом входе
+        user = self.request.user
+        if not user.is_authenticated:
+            return None
+        return user.pk, self.request.COOKIES.get(settings.CSRF_COOKIE_NAME)
 
-class PostListView(PostQuerysetMixin, ListView):
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        state, last_modified = self.get_validators()
+        etag = timestamp = None
+        if state is not None:
+            raw = repr((state, self.get_viewer_state()))
+            etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+        if last_modified is not None:
+            timestamp = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        if etag and not response.has_header("ETag"):
+            response["ETag"] = etag
+        if timestamp and not response.has_header("Last-Modified"):
+            response["Last-Modified"] = http_date(timestamp)
+        if self.vary_on_cookie:
+            patch_vary_headers(response, ("Cookie",))
+        return response
+
+
+def feed_validators(queryset, tags):
+    # Для лент: самая свежая видимая публикация и версии тегов. Правки и
+    # удаления постов и комментариев меняют теги, выход отложенной
+    # публикации — MAX(pub_date), поэтому COUNT здесь не нужен
+    latest = queryset.order_by().aggregate(latest=Max("pub_date"))["latest"]
+    return (latest, get_tag_versions(*tags)), None
+
+
+class AnonymousPageCacheMixin:
+    # Кэш целых страниц для анонимных GET-запросов. Ключ — путь, параметры
+    # из page_cache_params (?page=, ?cursor=), активный язык (даты
+    # с названиями месяцев) и версии тегов из get_cache_tags(). Остальные
+    # параметры (utm_* и т. п.) страницу не меняют и в ключ не входят,
+    # иначе каждая метка рекламной кампании заводила бы свою копию.
+    # Короткий таймаут покрывает выход отложенных публикаций по pub_date.
+    # Вместе со страницей хранятся её ETag и Vary, так что повторный визит
+    # из кэша получает 304 без единого запроса к БД
+    page_cache_params = ("page", "cursor")
+
+    def get_cache_tags(self):
+        return (ALL_TAG,)
+
+    def get_page_cache_key(self):
+        params = [
+            (name, value)
+            for name in self.page_cache_params
+            for value in self.request.GET.getlist(name)
+        ]
+        return make_key(
+            "page",
+            self.get_cache_tags(),
+            translation.get_language(),
+            f"{self.request.path}?{urlencode(params)}",
+        )
+
+    def get_cached_page(self, key=None):
+        # Ответ из кэша страниц или None; к БД не обращается
+        cached = cache.get(key or self.get_page_cache_key())
+        if cached is None:
+            return None
+        content, content_type, etag, vary = cached
+        response = HttpResponse(content, content_type=content_type)
+        if etag:
+            response["ETag"] = etag
+        if vary:
+            response["Vary"] = vary
+        patch_vary_headers(response, ("Cookie",))
+        return get_conditional_response(
+            self.request, etag=etag, response=response
+        )
+
+    def dispatch(self, request, *args, **kwargs):
+        timeout = getattr(settings, "BLOG_PAGE_CACHE_TIMEOUT", 0)
+        if (
+            not timeout
+            or request.method != "GET"
+            or request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        key = self.get_page_cache_key()
+        cached = self.get_cached_page(key)
+        if cached is not None:
+            return cached
+        response = super().dispatch(request, *args, **kwargs)
+
+        def store(response):
+            # LocaleMiddleware добавит Vary: Accept-Language только после
+            # рендера, а страница от языка зависит уже сейчас
+            patch_vary_headers(response, ("Accept-Language",))
+            # Страницы с CSRF-токеном или cookie в общий кэш не попадают
+            if (
+                response.status_code == 200
+                and not response.cookies
+                and not request.META.get("CSRF_COOKIE_USED")
+            ):
+                cache.set(
+                    key,
+                    (
+                        response.content,
+                        response["Content-Type"],
+                        response.get("ETag"),
+                        response.get("Vary"),
+                    ),
+                    replica_cache_timeout(timeout),
+                )
+
+        if hasattr(response, "add_post_render_callback"):
+            response.add_post_render_callback(store)
+        return response
+
+
+class CachedCountMixin:
+    # Миксин, который кэширует общее число публикаций ленты для пагинатора.
+    # get_count_scope() возвращает ключ ленты и теги, сбрасывающие кэш;
+    # по умолчанию это теги ленты из get_cache_tags()
+    paginator_class = CachedCountPaginator
+    allow_estimated_count = False  # Можно ли подменить COUNT(*) оценкой
+
+    def get_count_scope(self):
+        return None, ()
+
+    def get_cache_tags(self):
+        return (ALL_TAG,)
+
+    def get_paginator(self, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True, **kwargs):
+        count_key, count_tags = self.get_count_scope()
+        return super().get_paginator(
+            queryset,
+            per_page,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+            count_key=count_key,
+            count_tags=count_tags,
+            allow_estimate=self.allow_estimated_count,
+            **kwargs,
+        )
+
+
+class PostListView(
+    AnonymousPageCacheMixin,
+    ConditionalGetMixin,
+    PostQuerysetMixin,
+    CachedCountMixin,
+    CursorPaginationMixin,
+    ListView,
+):
     template_name = "blog/index.html"  # Шаблон главной страницы
     context_object_name = "page_obj"  # Имя объекта в контексте
     paginate_by = PAGINATE_BY  # Пагинация
+    query_budget = 8  # Не больше SQL-запросов на страницу (core.middleware)
+    allow_estimated_count = True
+
+    def get_cache_tags(self):
+        return ALL_TAG, FEED_TAG
+
+    def get_count_scope(self):
+        return "feed", self.get_cache_tags()
+
+    def get_validators(self):
+        return feed_validators(Post.objects.published(), self.get_cache_tags())
 
     def get_queryset(self):
         # Выбираем только опубликованные посты с опубликованными категориями
         return (
             super()
             .get_queryset()
-            .filter(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lte=datetime.now(),
-            )
+            .published()
             .order_by("-pub_date")  # Сортировка по дате публикации
         )
 
 
-class CategoryPostListView(PostQuerysetMixin, ListView):
+class CategoryPostListView(
+    AnonymousPageCacheMixin,
+    ConditionalGetMixin,
+    PostQuerysetMixin,
+    CachedCountMixin,
+    CursorPaginationMixin,
+    ListView,
+):
     template_name = "blog/post_list.html"  # Шаблон страницы категории
     context_object_name = "page_obj"
     paginate_by = PAGINATE_BY
+    query_budget = 8
 
     def get_queryset(self):
         # Получаем категорию по slug
@@ -61,11 +304,8 @@ class CategoryPostListView(PostQuerysetMixin, ListView):
         return (
             super()
             .get_queryset()
-            .filter(
-                category=self.category,
-                is_published=True,
-                pub_date__lte=datetime.now(),
-            )
+            .filter(category=self.category)
+            .published()
             .order_by("-pub_date")
         )
 
@@ -74,37 +314,149 @@ class CategoryPostListView(PostQuerysetMixin, ListView):
         context["category"] = self.category  # Передаем категорию в шаблон
         return context
 
+    def get_cache_tags(self):
+        return ALL_TAG, category_tag(self.kwargs["category_slug"])
+
+    def get_count_scope(self):
+        return (
+            f"category:{self.kwargs['category_slug']}",
+            self.get_cache_tags(),
+        )
+
+    def get_validators(self):
+        return feed_validators(
+            Post.objects.published().filter(
+                category__slug=self.kwargs["category_slug"]
+            ),
+            self.get_cache_tags(),
+        )
+
 
-class PostDetailView(DetailView):
+class PostSearchView(PostQuerysetMixin, CachedCountMixin, ListView):
+    # Полнотекстовый поиск по опубликованным постам (см. blog/search.py)
+    template_name = "blog/search.html"
+    context_object_name = "page_obj"
+    paginate_by = PAGINATE_BY
+    query_budget = 8
+    read_from_replica = True
+
+    def get_search_query(self):
+        return self.request.GET.get("q", "").strip()
+
+    def get_cache_tags(self):
+        # Любая правка опубликованного поста меняет тег общей ленты
+        return ALL_TAG, FEED_TAG
+
+    def get_count_scope(self):
+        return (
+            f"search:{match_expression(self.get_search_query())}",
+            self.get_cache_tags(),
+        )
+
+    def get_queryset(self):
+        return search_posts(
+            super().get_queryset().published(), self.get_search_query()
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context["query"] = query
+        # Параметр поиска сохраняется в ссылках пагинатора
+        context["page_query"] = urlencode({"q": query}) + "&"
+        return context
+
+
+def comment_page(post_id, user, cursor=None):
+    # Страница комментариев поста по ключу (created_at, id): и первая,
+    # и любая следующая читают по индексу comment_post_created_idx не больше
+    # BLOG_COMMENTS_PER_PAGE строк, сколько бы комментариев ни было у поста.
+    # Видны одобренные комментарии и собственные комментарии пользователя
+    paginator = CursorPaginator(
+        Comment.objects.select_related("author").filter(
+            visible_comments(user), post_id=post_id
+        ),
+        getattr(settings, "BLOG_COMMENTS_PER_PAGE", 50),
+        ("created_at", "id"),
+    )
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        raise Http404("Некорректный курсор комментариев")
+
+
+class PostDetailView(ConditionalGetMixin, DetailView):
     model = Post
     pk_url_kwarg = "post_id"  # Имя параметра в URL
     template_name = "blog/post_detail.html"
-
-    def get_object(self):
-        # Получаем пост, учитывая права доступа
-        post = get_object_or_404(
-            Post.objects.annotate(comment_count=Count("comments")),   
-            id=self.kwargs["post_id"]
-        )
-        if self.request.user != post.author:
-            post = get_object_or_404(
-                Post,
-                id=self.kwargs["post_id"],
-                is_published=True,
-                category__is_published=True,
-                pub_date__lte=datetime.now(),
-            )
-        return post
+    query_budget = 6
+    # Курсор страницы комментариев; без JavaScript ссылка «Показать ещё»
+    # ведёт на страницу поста со следующими комментариями
+    comments_cursor_param = "comments"
+
+    post = None
+
+    def get_visible_queryset(self):
+        # Автор видит свой пост всегда, остальные — только опубликованный
+        visible = published_filter()
+        if self.request.user.is_authenticated:
+            visible |= Q(author_id=self.request.user.pk)
+        return Post.objects.filter(visible)
+
+    def get_object(self, queryset=None):
+        # Пост уже загружен в get_validators() вместе с автором, категорией
+        # и местом — повторного запроса нет
+        if self.post is None:
+            raise Http404("Публикация не найдена")
+        return self.post
+
+    def get_validators(self):
+        # Один запрос по первичному ключу: пост со связанными объектами и
+        # временем последнего комментария (подзапрос по индексу комментариев)
+        last_comment = (
+            Comment.objects.filter(post=OuterRef("pk"))
+            .order_by("-created_at")
+            .values("created_at")[:1]
+        )
+        posts = (
+            self.get_visible_queryset()
+            .with_related()
+            .with_comment_count()
+            .filter(id=self.kwargs["post_id"])
+            .annotate(last_comment=Subquery(last_comment))
+            .order_by()
+        )
+        self.post = next(iter(posts[:1]), None)
+        if self.post is None:
+            return None, None  # Основной путь ответит 404
+        post = self.post
+        last_modified = max(
+            date for date in (post.updated_at, post.last_comment) if date
+        )
+        tags = get_tag_versions(ALL_TAG, post_tag(post.pk))
+        state = (post.updated_at, post.comment_count, post.last_comment, tags)
+        return state, last_modified
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()  # Форма для добавления комментария
-        context["comments"] = Comment.objects.select_related("author").filter(
-            post=self.object
-        )  # Список комментариев к посту
+        # Только первая страница комментариев, остальные подгружаются
+        context["comments"] = comment_page(
+            self.object.pk,
+            self.request.user,
+            self.request.GET.get(self.comments_cursor_param),
+        )
         return context
 
 
+class PostCommentsView(PostDetailView):
+    # HTML-фрагмент со следующей страницей комментариев для подгрузки
+    # на странице поста. Видимость поста и ETag — как у самой страницы
+    template_name = "includes/comment_list.html"
+    query_budget = 4
+    comments_cursor_param = "cursor"
+
+
 class PostCreateView(LoginRequiredMixin, CreateView):
     form_class = PostForm  # Форма создания поста
     template_name = "blog/create.html"
@@ -113,7 +465,8 @@ class PostCreateView(LoginRequiredMixin, CreateView):
         post = form.save(commit=False)
         post.author = self.request.user  # Устанавливаем автора поста
         post.save()
-        return redirect("blog:profile", self.request.user.username)  # Переадресация на профиль
+        # Переадресация на профиль
+        return redirect("blog:profile", self.request.user.username)
 
 
 class PostUpdateView(LoginRequiredMixin, UpdateView):
@@ -131,7 +484,9 @@ class PostUpdateView(LoginRequiredMixin, UpdateView):
 
     def get_success_url(self):
         # Переадресация на страницу отредактированного поста
-        return reverse_lazy("blog:post_detail", kwargs={"post_id": self.object.id})
+        return reverse_lazy(
+            "blog:post_detail", kwargs={"post_id": self.object.id}
+        )
 
 
 class PostDeleteView(LoginRequiredMixin, DeleteView):
@@ -156,6 +511,8 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         comment = form.save(commit=False)
         comment.author = self.request.user  # Автор комментария
         comment.post = post  # Связь с постом
+        # При премодерации комментарий ждёт одобрения в очереди
+        comment.is_approved = not premoderation()
         comment.save()
         return redirect("blog:post_detail", post.id)
 
@@ -173,7 +530,9 @@ class CommentUpdateView(LoginRequiredMixin, UpdateView):
         return super().dispatch(request, *args, **kwargs)
 
     def get_success_url(self):
-        return reverse_lazy("blog:post_detail", kwargs={"post_id": self.object.post.id})
+        return reverse_lazy(
+            "blog:post_detail", kwargs={"post_id": self.object.post.id}
+        )
 
 
 class CommentDeleteView(LoginRequiredMixin, DeleteView):
@@ -188,32 +547,92 @@ class CommentDeleteView(LoginRequiredMixin, DeleteView):
         return super().dispatch(request, *args, **kwargs)
 
     def get_success_url(self):
-        return reverse_lazy("blog:post_detail", kwargs={"post_id": self.object.post.id})
+        return reverse_lazy(
+            "blog:post_detail", kwargs={"post_id": self.object.post.id}
+        )
 
 
-class UserProfileView(PostQuerysetMixin, ListView):
+class CommentModerationView(
+    PermissionRequiredMixin, CursorPaginationMixin, ListView
+):
+    # Очередь модерации: неодобренные комментарии от старых к новым
+    # keyset-страницами по индексу comment_moderation_idx. Одобрение и
+    # отклонение отмеченных — по одному запросу (см. blog/moderation.py)
+    permission_required = MODERATE_PERMISSION
+    template_name = "blog/moderation.html"
+    context_object_name = "page_obj"
+    paginate_by = PAGINATE_BY
+    pagination_mode = "cursor"
+    cursor_ordering = ("created_at", "id")
+    query_budget = 10  # Права пользователя — ещё два запроса
+
+    def get_queryset(self):
+        return Comment.objects.filter(is_approved=False).select_related(
+            "author", "post"
+        )
+
+    def post(self, request, *args, **kwargs):
+        actions = {"approve": approve_comments, "reject": reject_comments}
+        action = actions.get(request.POST.get("action"))
+        if action is None:
+            return HttpResponseBadRequest("Неизвестное действие")
+        action([
+            int(comment_id)
+            for comment_id in request.POST.getlist("comment")
+            if comment_id.isdigit()
+        ])
+        return redirect(request.get_full_path())
+
+
+class UserProfileView(
+    AnonymousPageCacheMixin,
+    ConditionalGetMixin,
+    PostQuerysetMixin,
+    CachedCountMixin,
+    CursorPaginationMixin,
+    ListView,
+):
     template_name = "blog/profile.html"
     context_object_name = "page_obj"
     paginate_by = PAGINATE_BY
+    query_budget = 8
 
     def get_queryset(self):
         # Получаем пользователя профиля и фильтруем его посты
-        self.profile_user = get_object_or_404(User, username=self.kwargs["username"])
+        self.profile_user = get_object_or_404(
+            User, username=self.kwargs["username"]
+        )
         qs = super().get_queryset().filter(author=self.profile_user)
 
         if self.request.user != self.profile_user:
-            qs = qs.filter(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lte=datetime.now(),
-            )
+            qs = qs.published()
         return qs.order_by("-pub_date")  # Сортировка по дате публикации
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["profile"] = self.profile_user  # Передаем пользователя в шаблон
+        # Передаем пользователя в шаблон
+        context["profile"] = self.profile_user
         return context
 
+    def get_cache_tags(self):
+        return ALL_TAG, author_tag(self.kwargs["username"])
+
+    def get_count_scope(self):
+        # Автор видит и неопубликованные посты, поэтому счётчики раздельные
+        own = self.request.user == self.profile_user
+        visibility = "own" if own else "public"
+        return (
+            f"author:{self.kwargs['username']}:{visibility}",
+            self.get_cache_tags(),
+        )
+
+    def get_validators(self):
+        username = self.kwargs["username"]
+        queryset = Post.objects.filter(author__username=username)
+        if self.request.user.get_username() != username:
+            queryset = queryset.published()
+        return feed_validators(queryset, self.get_cache_tags())
+
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     model = User
@@ -221,9 +640,15 @@ class ProfileUpdateView(LoginRequiredMixin, UpdateView):
     template_name = "blog/user.html"
 
     def get_object(self):
-        return self.request.user  # Редактирование профиля текущего пользователя
+        # Редактирование профиля текущего пользователя
+        return self.request.user
 
     def get_success_url(self):
         return reverse_lazy(
             "blog:profile", kwargs={"username": self.request.user.username}
         )  # Переадресация на профиль
+
+
+def sitemap_file(request, path):
+    # Готовые файлы карт сайта из SITEMAP_ROOT (см. blog/sitemaps.py)
+    return serve(request, path, document_root=settings.SITEMAP_ROOT)
@@ -3,5 +3,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "blogicum.settings")
+# Под ASGI страницы блога обслуживают асинхронные представления
+os.environ.setdefault("BLOG_URLCONF", "blogicum.urls_async")
 
 application = get_asgi_application()
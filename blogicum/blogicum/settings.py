@@ -1,5 +1,8 @@
+import os
 from pathlib import Path
 
+from .db import database_settings, replica_settings
+
 BASE_DIR = Path(__file__).resolve().parent.parent  # Корневая директория проекта
 
 SECRET_KEY = "django-insecure-xn5)z4fdefk$^j!_&-!xukk-d@@eprv!nes2l_wp5f2=6_!l(a"
@@ -10,12 +13,27 @@ EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"  # Испол
 EMAIL_FILE_PATH = BASE_DIR / "sent_emails"  # Папка для сохранения писем
 
 MEDIA_ROOT = BASE_DIR / "media"  # Папка для загружаемых файлов
+SITEMAP_ROOT = BASE_DIR / "sitemaps"  # Готовые карты сайта (manage.py build_sitemaps)
+SITEMAP_BASE_URL = "http://127.0.0.1:8000"  # Адрес сайта для ссылок в картах
 STATICFILES_DIRS = [BASE_DIR / "static"]  # Дополнительные папки со статикой
 
 LOGIN_REDIRECT_URL = "blog:index"  # URL после входа
 LOGIN_URL = "login"  # URL страницы входа
 CSRF_FAILURE_VIEW = "pages.views.csrf_failure"  # Кастомная страница ошибки CSRF
 
+BLOG_PAGINATION_MODE = "page"  # Пагинация лент: "page" (по номерам) или "cursor" (keyset)
+BLOG_COUNT_STRATEGY = "cached"  # Подсчёт публикаций для пагинации: "exact", "cached" или "estimated"
+BLOG_COUNT_CACHE_TIMEOUT = 60  # Секунд; покрывает выход отложенных публикаций
+BLOG_ESTIMATED_COUNT_THRESHOLD = 100_000  # С какого размера таблицы ленте достаточно оценки
+BLOG_ASYNC_THREADS = 16  # Потоков для БД и рендеринга асинхронных страниц
+BLOG_FEED_CACHE_TIMEOUT = 3600  # Секунд кэша RSS/Atom; ключ меняется при правке постов
+BLOG_IMAGE_PROCESSING = "background"  # Обработка изображений: "background" (manage.py run_jobs) или "inline"
+BLOG_COMMENT_PREMODERATION = False  # True — новые комментарии видны другим только после одобрения
+BLOG_COMMENTS_PER_PAGE = 50  # Комментариев на первой странице поста и в каждой подгрузке
+BLOG_PAGE_CACHE_TIMEOUT = 30  # Секунд кэша страниц лент для анонимов; 0 — выключить
+BLOG_SERVER_TIMING = DEBUG  # Заголовок Server-Timing: время SQL и рендеринга
+BLOG_QUERY_BUDGET_STRICT = False  # True — превышение query_budget представления вызывает ошибку (в тестах)
+
 INSTALLED_APPS = [
     "django.contrib.admin",
     "django.contrib.auth",
@@ -30,17 +48,20 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "blogicum.urls"
+# blogicum.urls_async — те же адреса с асинхронными страницами (для ASGI)
+ROOT_URLCONF = os.environ.get("BLOG_URLCONF", "blogicum.urls")
 TEMPLATES_DIR = BASE_DIR / "templates"  # Директория с шаблонами
 
 TEMPLATES = [
@@ -61,13 +82,27 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "blogicum.wsgi.application"
 
-DATABASES = {
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",  # База данных SQLite
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "blogicum",
+        "OPTIONS": {"MAX_ENTRIES": 10000},  # Карточки публикаций, счётчики и т. п.
     }
 }
 
+# SQLite по умолчанию; PostgreSQL и пул соединений — через переменные
+# окружения (см. blogicum/db.py)
+DATABASES = {
+    "default": database_settings(BASE_DIR),
+    **replica_settings(BASE_DIR),
+}
+# Чтение страниц-списков и публикаций идёт с реплик, запись — в default
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["core.routers.ReplicaRouter"]
+# Сколько секунд после записи пользователь читает только из default,
+# чтобы сразу увидеть свою публикацию или комментарий
+DATABASE_REPLICA_STICKY_SECONDS = 10
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},
@@ -81,5 +116,21 @@ USE_I18N = True
 USE_L10N = True
 USE_TZ = True
 
+# Строка JSON со статистикой SQL на каждый запрос (core.middleware)
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "blogicum.requests": {
+            "handlers": ["console"],
+            "level": os.environ.get("BLOG_REQUEST_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
 STATIC_URL = "/static/"  # URL для статических файлов
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
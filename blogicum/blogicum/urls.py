@@ -2,9 +2,11 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
-from django.urls import include, path, reverse_lazy
+from django.urls import include, path, re_path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from blog.views import sitemap_file
+
 handler404 = "pages.views.page_not_found"  
 handler403 = "pages.views.csrf_failure" 
 handler500 = "pages.views.internal_server_error"  
@@ -12,6 +14,14 @@ urlpatterns = [
     path("", include("blog.urls")),
     path("pages/", include("pages.urls")),
     path("admin/", admin.site.urls),
+    # Карты сайта собирает manage.py build_sitemaps; в продакшене их
+    # лучше отдавать веб-сервером прямо из SITEMAP_ROOT
+    path("sitemap.xml", sitemap_file, {"path": "sitemap.xml"}, name="sitemap"),
+    re_path(
+        r"^sitemaps/(?P<path>[\w-]+\.xml\.gz)$",
+        sitemap_file,
+        name="sitemap_file",
+    ),
     path("auth/", include("django.contrib.auth.urls")),
     path(
         "auth/registration/",
@@ -0,0 +1,14 @@
+"""Корневой URLconf для ASGI: блог с асинхронными страницами.
+
+Выбирается переменной окружения BLOG_URLCONF=blogicum.urls_async
+(по умолчанию так делает blogicum/asgi.py).
+"""
+from django.urls import include, path
+
+from .urls import handler403, handler404, handler500  # noqa: F401
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("", include("blog.async_urls")),
+    *sync_urlpatterns[1:],  # Всё, кроме блога, без изменений
+]
@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import Job
+
+
+# Очередь фоновых задач: только просмотр, задачи создаёт приложение
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'status', 'attempts', 'created_at',
+                    'locked_at')  # Отображаемые поля
+    list_filter = ('status', 'name')  # Фильтры по статусу и обработчику
+    search_fields = ('key',)  # Поиск по ключу задачи
+    readonly_fields = ('name', 'key', 'payload', 'attempts', 'locked_at',
+                       'error')
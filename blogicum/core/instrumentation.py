@@ -0,0 +1,99 @@
+"""Счётчики SQL-запросов и времени рендеринга для текущего запроса.
+
+Обёртка execute_wrapper ставится на каждое новое соединение
+(core/signals.py) и записывает запросы в RequestStats из contextvar.
+Контекст копируется в потоки sync_to_async, поэтому запросы асинхронных
+страниц из пула потоков попадают в статистику того же HTTP-запроса.
+"""
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+_current = ContextVar('request_stats', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    # AssertionError: в строгом режиме (тесты) превышение — это провал теста
+    pass
+
+
+class RequestStats:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.render_time = 0.0
+        self.statements = Counter()  # SQL -> сколько раз выполнен
+        self.exact = Counter()  # (SQL, параметры) -> сколько раз выполнен
+
+    def record(self, sql, params, duration):
+        self.queries += 1
+        self.sql_time += duration
+        self.statements[sql] += 1
+        try:
+            self.exact[(sql, repr(params))] += 1
+        except Exception:
+            pass
+
+    @property
+    def duplicates(self):
+        # Повторы одного и того же запроса с теми же параметрами
+        return sum(count - 1 for count in self.exact.values())
+
+    @property
+    def similar(self):
+        # Наибольшее число запусков одного SQL с разными параметрами:
+        # признак N+1
+        return max(self.statements.values(), default=0)
+
+    @property
+    def total_time(self):
+        return time.perf_counter() - self.started
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'duplicates': self.duplicates,
+            'similar': self.similar,
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'render_ms': round(self.render_time * 1000, 2),
+            'total_ms': round(self.total_time * 1000, 2),
+        }
+
+    def server_timing(self):
+        return ', '.join((
+            f'db;dur={self.sql_time * 1000:.2f};desc="{self.queries} queries"',
+            f'tpl;dur={self.render_time * 1000:.2f}',
+            f'total;dur={self.total_time * 1000:.2f}',
+        ))
+
+
+def start():
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def finish(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.record(sql, params, time.perf_counter() - started)
+
+
+def install(connection):
+    # Обёртка переживает переподключения, поэтому ставится один раз
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
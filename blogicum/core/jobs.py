@@ -0,0 +1,137 @@
+"""Локальная очередь фоновых задач в БД.
+
+Задача — строка core.Job с именем обработчика и JSON-параметрами.
+Веб-процесс только ставит задачу в очередь (enqueue), а выполняет её
+команда run_jobs в пуле процессов, поэтому тяжёлая работа (например,
+декодирование изображений) не занимает потоки, обслуживающие запросы.
+"""
+import logging
+from datetime import timedelta
+from importlib import import_module
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_handlers = {}
+_failure_handlers = {}
+
+
+def register(name, on_failure=None):
+    """Декоратор: регистрирует функцию как обработчик задач name.
+
+    on_failure(**payload) вызывается, когда задача исчерпала попытки
+    и помечена неудачной.
+    """
+    def decorator(function):
+        _handlers[name] = function
+        if on_failure is not None:
+            _failure_handlers[name] = on_failure
+        return function
+    return decorator
+
+
+def get_handler(name):
+    if name not in _handlers:
+        # Обработчики регистрируются при импорте модуля "<app>.jobs"
+        import_module(name.rsplit(".", 1)[0] + ".jobs")
+    return _handlers[name]
+
+
+def enqueue(name, payload, key=""):
+    """Ставит задачу в очередь; ожидающую задачу с тем же key не дублирует."""
+    if key and Job.objects.filter(
+        key=key, status=Job.Status.PENDING
+    ).exists():
+        return None
+    return Job.objects.create(name=name, key=key, payload=payload)
+
+
+def _notify_failed(name, payload):
+    get_handler(name)  # Импортирует модуль с обработчиками
+    handler = _failure_handlers.get(name)
+    if handler is None:
+        return
+    try:
+        handler(**payload)
+    except Exception:
+        logger.exception("Не удалось обработать отказ задачи %s", name)
+
+
+def max_attempts():
+    return getattr(settings, "JOBS_MAX_ATTEMPTS", 3)
+
+
+def claim(limit):
+    """Забирает до limit ожидающих задач и возвращает их id.
+
+    Каждая задача захватывается отдельным UPDATE ... WHERE status='pending',
+    поэтому несколько запущенных run_jobs не выполнят одну задачу дважды.
+    """
+    claimed = []
+    candidates = Job.objects.filter(status=Job.Status.PENDING).values_list(
+        "pk", flat=True
+    )[:limit]
+    for pk in list(candidates):
+        if Job.objects.filter(pk=pk, status=Job.Status.PENDING).update(
+            status=Job.Status.RUNNING,
+            locked_at=timezone.now(),
+            attempts=F("attempts") + 1,
+        ):
+            claimed.append(pk)
+    return claimed
+
+
+def release_stale(timeout):
+    # Задачи упавшего обработчика снова становятся ожидающими. Задача,
+    # которая исчерпала попытки (например, каждый раз роняет процесс),
+    # помечается неудачной, как при обычной ошибке, а не крутится вечно
+    stale = Job.objects.filter(
+        status=Job.Status.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(seconds=timeout),
+    )
+    failed = list(
+        stale.filter(attempts__gte=max_attempts()).values_list(
+            "pk", "name", "payload"
+        )
+    )
+    Job.objects.filter(pk__in=[pk for pk, _, _ in failed]).update(
+        status=Job.Status.FAILED,
+        locked_at=None,
+        error="Обработчик не завершился за отведённое время",
+    )
+    for _, name, payload in failed:
+        _notify_failed(name, payload)
+    return len(failed) + stale.update(
+        status=Job.Status.PENDING, locked_at=None
+    )
+
+
+def run_job(pk):
+    """Выполняет захваченную задачу и записывает результат в БД."""
+    job = Job.objects.get(pk=pk)
+    try:
+        get_handler(job.name)(**job.payload)
+    except Exception as error:
+        logger.exception("Задача %s завершилась с ошибкой", job)
+        status = (
+            Job.Status.PENDING
+            if job.attempts < max_attempts()
+            else Job.Status.FAILED
+        )
+        Job.objects.filter(pk=pk).update(
+            status=status,
+            locked_at=None,
+            error=f"{type(error).__name__}: {error}",
+        )
+        if status == Job.Status.FAILED:
+            _notify_failed(job.name, job.payload)
+        return pk, False
+    Job.objects.filter(pk=pk).update(
+        status=Job.Status.DONE, locked_at=None, error=""
+    )
+    return pk, True
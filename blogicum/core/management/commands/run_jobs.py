@@ -0,0 +1,71 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from core import worker
+from core.jobs import claim, release_stale
+
+
+class Command(BaseCommand):
+    help = "Выполняет задачи из очереди core.Job в пуле процессов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Количество процессов-обработчиков.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Пауза в секундах, когда очередь пуста.",
+        )
+        parser.add_argument(
+            "--stale-timeout",
+            type=int,
+            default=600,
+            help=(
+                "Через сколько секунд зависшая задача возвращается "
+                "в очередь."
+            ),
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить накопившиеся задачи и завершиться.",
+        )
+
+    def handle(self, *args, workers, poll_interval, stale_timeout, once,
+               **options):
+        done = failed = 0
+        # spawn, а не fork: дочерние процессы не наследуют соединения с БД
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=worker.init
+        ) as executor:
+            while True:
+                release_stale(stale_timeout)
+                # Берём не больше, чем процессов: остальное достанется
+                # другим экземплярам run_jobs
+                pks = claim(workers)
+                if not pks:
+                    if once:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                for pk, success in executor.map(worker.execute, pks):
+                    if success:
+                        done += 1
+                    else:
+                        failed += 1
+                        self.stderr.write(f"Задача {pk} завершилась с ошибкой")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Выполнено задач: {done}, с ошибками: {failed}"
+            )
+        )
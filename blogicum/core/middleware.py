@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+import time
+
+from django.conf import settings
+
+from . import instrumentation
+from .routers import enable_replica_reads
+
+logger = logging.getLogger('blogicum.requests')
+
+STICKY_COOKIE = 'primary_until'
+
+
+class ReplicaRoutingMiddleware:
+    """Включает чтение с реплик для страниц только для чтения.
+
+    Представление разрешает реплики атрибутом read_from_replica = True.
+    После запроса на запись (POST и т. п.) браузер получает cookie, и до
+    истечения DATABASE_REPLICA_STICKY_SECONDS его запросы читают из
+    основной БД: автор сразу видит свою публикацию или комментарий, даже
+    если реплика ещё отстаёт.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            enable_replica_reads(False)
+        if request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE'):
+            seconds = settings.DATABASE_REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE,
+                str(int(time.time() + seconds)),
+                max_age=seconds,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        enable_replica_reads(
+            request.method in ('GET', 'HEAD')
+            and getattr(view_class, 'read_from_replica', False)
+            and not self.is_sticky(request)
+        )
+
+    def is_sticky(self, request):
+        try:
+            until = int(request.COOKIES.get(STICKY_COOKIE, 0))
+        except ValueError:
+            return False
+        return until > time.time()
+
+
+class QueryInstrumentationMiddleware:
+    """Число и время SQL-запросов, повторы и время рендеринга шаблона.
+
+    Результат уходит в заголовок Server-Timing (если включён
+    BLOG_SERVER_TIMING) и в строку журнала blogicum.requests в формате
+    JSON. Представление может задать атрибут query_budget — наибольшее
+    допустимое число запросов; превышение пишется в журнал, а при
+    BLOG_QUERY_BUDGET_STRICT = True (в тестах) вызывает QueryBudgetExceeded.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так Django распознаёт асинхронный экземпляр middleware
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        stats, token = instrumentation.start()
+        request.query_stats = stats  # Для тестов и benchmarks/
+        try:
+            response = self.get_response(request)
+        finally:
+            instrumentation.finish(token)
+        return self.report(request, response, stats)
+
+    async def __acall__(self, request):
+        stats, token = instrumentation.start()
+        request.query_stats = stats
+        try:
+            response = await self.get_response(request)
+        finally:
+            instrumentation.finish(token)
+        return self.report(request, response, stats)
+
+    def process_template_response(self, request, response):
+        # Вызывается прямо перед render(); конец рендеринга отмечает
+        # обратный вызов после него
+        stats = instrumentation.current()
+        if stats is not None:
+            started = time.perf_counter()
+
+            def rendered(response):
+                stats.render_time += time.perf_counter() - started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    def get_budget(self, request):
+        match = request.resolver_match
+        if match is None:
+            return None
+        view = getattr(match.func, 'view_class', match.func)
+        return getattr(view, 'query_budget', None)
+
+    def report(self, request, response, stats):
+        data = stats.as_dict()
+        budget = self.get_budget(request)
+        match = request.resolver_match
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'budget': budget,
+            **data,
+        }))
+        if getattr(settings, 'BLOG_SERVER_TIMING', False):
+            response['Server-Timing'] = stats.server_timing()
+        if budget is not None and stats.queries > budget:
+            message = (
+                f'{request.method} {request.path}: {stats.queries} '
+                f'SQL-запросов при бюджете {budget}'
+            )
+            if getattr(settings, 'BLOG_QUERY_BUDGET_STRICT', False):
+                raise instrumentation.QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
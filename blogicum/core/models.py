@@ -19,3 +19,59 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class Job(CreatedModel):
+    # Фоновая задача локальной очереди (см. core/jobs.py)
+    class Status(models.TextChoices):
+        PENDING = "pending", "Ожидает"
+        RUNNING = "running", "Выполняется"
+        DONE = "done", "Выполнена"
+        FAILED = "failed", "Ошибка"
+
+    name = models.CharField(
+        max_length=100,
+        verbose_name="Обработчик",
+    )
+    # Ключ для защиты от дублей: одинаковая ожидающая задача не ставится дважды
+    key = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name="Ключ задачи",
+    )
+    payload = models.JSONField(
+        default=dict,
+        verbose_name="Параметры",
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name="Статус",
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name="Попыток",
+    )
+    locked_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Взята в работу",
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name="Ошибка",
+    )
+
+    class Meta:
+        verbose_name = "фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ("id",)
+        indexes = (
+            # Выборка очереди: status = 'pending' ORDER BY id
+            models.Index(fields=("status", "id"), name="job_status_idx"),
+            models.Index(fields=("key", "status"), name="job_key_idx"),
+        )
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.get_status_display()})"
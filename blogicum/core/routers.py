@@ -0,0 +1,71 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# Модели этих приложений можно читать с реплик; пользователи, сессии
+# и очередь задач всегда читаются из основной БД
+REPLICA_APPS = ('blog',)
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def enable_replica_reads(enabled=True):
+    # Флаг живёт в контексте запроса; ReplicaRoutingMiddleware сбрасывает
+    # его после ответа, чтобы он не достался следующему запросу потока
+    _replica_reads.set(enabled)
+
+
+def replica_cache_timeout(timeout):
+    """Срок кэширования того, что прочитано в текущем запросе.
+
+    Ключи кэша меняются при записи в основную БД, а реплика может ещё
+    отставать: значение, посчитанное по ней, храним не дольше окна
+    DATABASE_REPLICA_STICKY_SECONDS, иначе устаревший результат
+    продержится до следующей правки.
+    """
+    replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+    if not (replicas and _replica_reads.get()):
+        return timeout
+    window = settings.DATABASE_REPLICA_STICKY_SECONDS
+    return window if timeout is None else min(timeout, window)
+
+
+class ReplicaRouter:
+    """Запись — в default, чтение — с реплики, если его разрешил запрос."""
+
+    def db_for_read(self, model, **hints):
+        replicas = getattr(settings, 'DATABASE_REPLICAS', ())
+        if (
+            replicas
+            and _replica_reads.get()
+            and model._meta.app_label in REPLICA_APPS
+        ):
+            return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в основной БД
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db == 'default'
+
+
+def sync_sqlite_replicas(using='default'):
+    """Копирует основную SQLite-базу во все реплики (backup API SQLite).
+
+    Заменяет настоящую репликацию при локальной разработке и в тестах.
+    """
+    source = connections[using]
+    source.ensure_connection()
+    for alias in settings.DATABASE_REPLICAS:
+        target = connections[alias]
+        if target.vendor != 'sqlite':
+            raise ValueError(f'Реплика {alias} — не SQLite')
+        target.ensure_connection()
+        source.connection.backup(target.connection)
@@ -0,0 +1,21 @@
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import instrumentation
+
+
+@receiver(connection_created)
+def install_query_recorder(sender, connection, **kwargs):
+    instrumentation.install(connection)
+
+
+@receiver(connection_created)
+def apply_pragmas(sender, connection, **kwargs):
+    # PRAGMA из профиля БД (DB_PROFILE в blogicum/db.py) действуют только
+    # в пределах соединения, поэтому выполняются для каждого нового
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
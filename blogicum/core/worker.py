@@ -0,0 +1,17 @@
+"""Точки входа дочерних процессов run_jobs.
+
+Процессы запускаются через spawn, поэтому модуль импортируется до
+настройки Django: модели подгружаются только внутри функций.
+"""
+import django
+
+
+def init():
+    # Каждый процесс открывает собственные соединения с БД
+    django.setup()
+
+
+def execute(pk):
+    from .jobs import run_job
+
+    return run_job(pk)
@@ -4,8 +4,9 @@ def page_not_found(request, exception):
     # Обработка ошибки 404: страница не найдена
     return render(request, "pages/404.html", status=404)
 
-def csrf_failure(request, reason=""):
-    # Обработка ошибки 403: CSRF токен недействителен
+def csrf_failure(request, reason="", exception=None):
+    # Обработка ошибки 403: CSRF токен недействителен; эта же страница
+    # служит handler403, который передаёт exception
     return render(request, "pages/403csrf.html", status=403)
 
 def internal_server_error(request):
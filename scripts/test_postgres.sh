@@ -0,0 +1,29 @@
+#!/usr/bin/env bash
+# Прогон тестов на временном экземпляре PostgreSQL без docker.
+#
+#   scripts/test_postgres.sh [аргументы pytest]
+#
+# Нужны initdb/pg_ctl в PATH (или в PG_BIN) и psycopg2 в окружении.
+# Кластер создаётся во временном каталоге, слушает только unix-сокет
+# в том же каталоге и удаляется после прогона.
+set -euo pipefail
+
+PG_BIN=${PG_BIN:-$(dirname "$(command -v pg_ctl || echo /usr/lib/postgresql/bin/pg_ctl)")}
+PORT=${PG_PORT:-55432}
+DATA=$(mktemp -d -t blogicum-pg.XXXXXX)
+
+cleanup() {
+    "$PG_BIN/pg_ctl" -D "$DATA" -m immediate stop >/dev/null 2>&1 || true
+    rm -rf "$DATA"
+}
+trap cleanup EXIT
+
+"$PG_BIN/initdb" -D "$DATA" -U blogicum -A trust -E UTF8 \
+    --locale=C.UTF-8 >/dev/null
+"$PG_BIN/pg_ctl" -D "$DATA" -w -l "$DATA/server.log" \
+    -o "-k $DATA -p $PORT -c listen_addresses='' -c fsync=off" start >/dev/null
+"$PG_BIN/createdb" -h "$DATA" -p "$PORT" -U blogicum blogicum
+
+cd "$(dirname "$0")/.."
+DATABASE_URL="postgres://blogicum@/blogicum?host=$DATA&port=$PORT" \
+    python -m pytest "$@"
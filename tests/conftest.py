@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Field, Model
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,21 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def strict_query_budget():
+    # Превышение query_budget представления роняет тест (core.middleware)
+    with override_settings(BLOG_QUERY_BUDGET_STRICT=True):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Кэш страниц, счётчиков и версий тегов не переживает тест
+    cache.clear()
+    yield
+    cache.clear()
+
+
 class SafeImportFromContextManager:
     def __init__(
         self,
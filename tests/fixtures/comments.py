@@ -28,4 +28,7 @@ def comment_to_a_post(
     comment_model_name = CommentModel.__name__
     post_field_name = CommentModelAdapter(CommentModel).post.field.name
     mixer_kwargs = {post_field_name: post_with_published_location}
-    return mixer.blend(f"blog.{comment_model_name}", **mixer_kwargs)
+    # Неодобренные комментарии видны только их автору
+    return mixer.blend(
+        f"blog.{comment_model_name}", is_approved=True, **mixer_kwargs
+    )
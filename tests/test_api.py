@@ -0,0 +1,150 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+
+@pytest.fixture
+def api_posts(mixer, user, published_category):
+    now = timezone.now()
+    posts = [
+        mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=True,
+            pub_date=now - timedelta(hours=index + 1),
+        )
+        for index in range(5)
+    ]
+    hidden = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=False,
+        pub_date=now - timedelta(days=1),
+    )
+    return posts, hidden
+
+
+@pytest.mark.django_db
+def test_feed_cursor_pagination(client, api_posts):
+    posts, hidden = api_posts
+    url = reverse("blog:api_posts")
+    ids = []
+    data = client.get(url, {"limit": 2, "fields": "id,title"}).json()
+    while True:
+        assert all(set(item) == {"id", "title"} for item in data["results"])
+        ids += [item["id"] for item in data["results"]]
+        if not data["next"]:
+            break
+        data = client.get(data["next"]).json()
+    assert ids == [post.id for post in posts]
+    assert data["previous"]
+
+
+@pytest.mark.django_db
+def test_feed_serializes_without_models(client, api_posts):
+    with CaptureQueriesContext(connection) as queries:
+        data = client.get(reverse("blog:api_posts")).json()
+    # Агрегат для ETag и одна выборка values()
+    assert len(queries) == 2
+    item = data["results"][0]
+    assert item["author"] == api_posts[0][0].author.username
+    assert item["category"] == api_posts[0][0].category.slug
+
+
+@pytest.mark.django_db
+def test_unknown_field_and_bad_cursor(client, api_posts):
+    url = reverse("blog:api_posts")
+    response = client.get(url, {"fields": "id,password"})
+    assert response.status_code == 400
+    assert "password" in response.json()["error"]
+    assert client.get(url, {"cursor": "broken"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_visibility_rules(client, user_client, user, api_posts):
+    posts, hidden = api_posts
+    detail = reverse("blog:api_post_detail", args=[hidden.id])
+    assert client.get(detail).status_code == 404
+    assert user_client.get(detail).json()["id"] == hidden.id
+
+    profile_posts = reverse("blog:api_profile_posts", args=[user.username])
+    assert len(client.get(profile_posts, {"limit": 10}).json()["results"]) == 5
+    assert (
+        len(user_client.get(profile_posts, {"limit": 10}).json()["results"])
+        == 6
+    )
+    assert client.get(
+        reverse("blog:api_category_posts", args=["missing"])
+    ).status_code == 404
+    assert client.get(
+        reverse("blog:api_profile", args=[user.username])
+    ).json()["username"] == user.username
+
+
+@pytest.mark.django_db
+def test_comments_keyset(client, mixer, api_posts):
+    post = api_posts[0][0]
+    comments = mixer.cycle(3).blend(
+        "blog.Comment", post=post, is_approved=True
+    )
+    url = reverse("blog:api_comments", args=[post.id])
+    first = client.get(url, {"limit": 2}).json()
+    second = client.get(first["next"]).json()
+    assert [item["id"] for item in first["results"] + second["results"]] == [
+        comment.id for comment in comments
+    ]
+
+
+@pytest.mark.django_db
+def test_api_etag(client, api_posts):
+    post = api_posts[0][0]
+    for url in (
+        reverse("blog:api_posts"),
+        reverse("blog:api_post_detail", args=[post.id]),
+        reverse("blog:api_comments", args=[post.id]),
+    ):
+        etag = client.get(url)["ETag"]
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    detail = reverse("blog:api_post_detail", args=[post.id])
+    etag = client.get(detail)["ETag"]
+    post.title = "Новый"
+    post.save()
+    assert client.get(detail, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_unpublished_location_is_hidden(client, mixer, api_posts):
+    post = api_posts[0][0]
+    for is_published, expected in ((True, "Где-то"), (False, None)):
+        location = mixer.blend(
+            "blog.Location", name="Где-то", is_published=is_published
+        )
+        post.location = location
+        post.save()
+        url = reverse("blog:api_post_detail", args=[post.id])
+        assert client.get(url).json()["location"] == expected
+        feed = client.get(reverse("blog:api_posts")).json()["results"]
+        assert feed[0]["location"] == expected
+
+
+@pytest.mark.django_db
+def test_comments_follow_moderation(
+    client, user_client, user, mixer, api_posts
+):
+    post = api_posts[0][0]
+    approved = mixer.blend("blog.Comment", post=post, is_approved=True)
+    own = mixer.blend(
+        "blog.Comment", post=post, author=user, is_approved=False
+    )
+    mixer.blend("blog.Comment", post=post, is_approved=False)
+    url = reverse("blog:api_comments", args=[post.id])
+    ids = [row["id"] for row in client.get(url).json()["results"]]
+    assert ids == [approved.id]
+    ids = [row["id"] for row in user_client.get(url).json()["results"]]
+    assert ids == [approved.id, own.id]
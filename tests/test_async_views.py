@@ -0,0 +1,69 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import resolve, reverse
+
+# Асинхронные страницы работают с БД из потоков пула, у которых свои
+# соединения: данные теста должны быть закоммичены
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture(autouse=True)
+def async_urlconf(settings):
+    settings.ROOT_URLCONF = "blogicum.urls_async"
+
+
+@pytest.fixture
+def urls(user, post_with_published_location):
+    post = post_with_published_location
+    return [
+        reverse("blog:index"),
+        reverse("blog:category_posts", args=[post.category.slug]),
+        reverse("blog:profile", args=[user.username]),
+        reverse("blog:post_detail", args=[post.id]),
+    ]
+
+
+def test_views_are_async(urls):
+    for url in urls:
+        assert resolve(url).func.__name__.startswith("async_")
+
+
+def test_async_pages_render_like_sync(client, settings, urls):
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0  # Обе версии рендерят страницу
+    async_pages = [client.get(url) for url in urls]
+    settings.ROOT_URLCONF = "blogicum.urls"
+    for url, response in zip(urls, async_pages):
+        assert response.status_code == 200, url
+        sync_response = client.get(url)
+        assert response["ETag"] == sync_response["ETag"], url
+        assert response.content == sync_response.content, url
+
+
+def test_asgi_handler(urls, post_with_published_location):
+    client = AsyncClient()
+
+    @async_to_sync
+    async def get(url):
+        return await client.get(url)
+
+    for url in urls:
+        assert get(url).status_code == 200, url
+    missing = reverse(
+        "blog:post_detail", args=[post_with_published_location.id + 1]
+    )
+    assert get(missing).status_code == 404
+
+
+def test_cached_page_skips_thread_pool(client, monkeypatch, urls):
+    first = client.get(urls[0])
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("Страница из кэша не должна уходить в пул")
+
+    monkeypatch.setattr("blog.async_views.run_in_pool", fail)
+    response = client.get(urls[0])
+    assert response.content == first.content
+    assert client.get(
+        urls[0], HTTP_IF_NONE_MATCH=first["ETag"]
+    ).status_code == 304
@@ -0,0 +1,32 @@
+import pytest
+
+from benchmarks import dataset, measure, scenarios
+from blog.models import Comment, Post
+
+pytestmark = pytest.mark.django_db
+
+MINI_SCALE = {
+    "users": 5,
+    "categories": 3,
+    "locations": 2,
+    "posts": 30,
+    "comments": 60,
+}
+
+
+@pytest.fixture
+def seeded(monkeypatch):
+    monkeypatch.setitem(dataset.SCALES, "mini", MINI_SCALE)
+    return dataset.seed("mini")
+
+
+def test_scale_is_seeded(seeded):
+    assert seeded["posts+comments"]["posts"] == Post.objects.count() == 30
+    assert Comment.objects.count() == 60
+
+
+def test_scenarios_respond(seeded):
+    users = scenarios.bench_users()
+    for scenario in scenarios.build_scenarios():
+        result = measure.measure_client(scenario, users, 1, warmup=0)
+        assert result["queries"] > 0, scenario.name
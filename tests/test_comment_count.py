@@ -0,0 +1,76 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Comment, Post
+
+
+def _count(post):
+    return Post.objects.values_list("comment_count", flat=True).get(pk=post.pk)
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_views(user_client, post_with_published_location):
+    post = post_with_published_location
+    for text in ("первый", "второй"):
+        user_client.post(
+            reverse("blog:add_comment", args=[post.id]), {"text": text}
+        )
+    assert _count(post) == 2
+
+    comment = Comment.objects.filter(post=post).first()
+    user_client.post(
+        reverse("blog:delete_comment", args=[post.id, comment.id])
+    )
+    assert _count(post) == 1
+
+
+@pytest.mark.django_db
+def test_comment_count_follows_orm_and_moves(
+    mixer, post_with_published_location, post_of_another_author
+):
+    post, other = post_with_published_location, post_of_another_author
+    comments = mixer.cycle(3).blend(
+        "blog.Comment", post=post, is_approved=True
+    )
+    assert _count(post) == 3
+
+    comments[0].post = other
+    comments[0].save()
+    assert (_count(post), _count(other)) == (2, 1)
+
+    Comment.objects.filter(post=post).delete()
+    assert _count(post) == 0
+
+
+@pytest.mark.django_db
+def test_cascade_delete_skips_counter_updates(
+    mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(5).blend("blog.Comment", post=post, is_approved=True)
+    with CaptureQueriesContext(connection) as queries:
+        post.delete()
+    assert not any(
+        query["sql"].startswith('UPDATE "blog_post"') for query in queries
+    )
+
+
+@pytest.mark.django_db
+def test_list_query_has_no_group_by(client, post_with_published_location):
+    with CaptureQueriesContext(connection) as queries:
+        client.get(reverse("blog:index"))
+    assert not any("GROUP BY" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_recount_comments_repairs_counters(
+    mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(4).blend("blog.Comment", post=post, is_approved=True)
+    Post.objects.filter(pk=post.pk).update(comment_count=42)
+    call_command("recount_comments", batch_size=1)
+    assert _count(post) == 4
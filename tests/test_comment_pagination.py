@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+pytestmark = pytest.mark.django_db
+
+PER_PAGE = 5
+
+
+@pytest.fixture(autouse=True)
+def comments_per_page(settings):
+    settings.BLOG_COMMENTS_PER_PAGE = PER_PAGE
+
+
+def _add_comments(mixer, post, count):
+    now = timezone.now()
+    # Пары комментариев с одинаковым created_at проверяют ничьи по id
+    dates = (now - timedelta(minutes=count - i // 2) for i in range(count))
+    comments = mixer.cycle(count).blend(
+        "blog.Comment", post=post, created_at=dates, is_approved=True
+    )
+    return sorted(comments, key=lambda c: (c.created_at, c.id))
+
+
+def _ids(page):
+    return [comment.id for comment in page]
+
+
+def test_detail_renders_first_page(
+    client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comments = _add_comments(mixer, post, 12)
+    response = client.get(reverse("blog:post_detail", args=[post.id]))
+    page = response.context["comments"]
+    assert _ids(page) == _ids(comments[:PER_PAGE])
+    content = response.content.decode()
+    assert content.count('name="comment_') == PER_PAGE
+    assert reverse("blog:post_comments", args=[post.id]) in content
+
+
+def test_fragments_load_remaining_comments(
+    client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comments = _add_comments(mixer, post, 12)
+    page = client.get(
+        reverse("blog:post_detail", args=[post.id])
+    ).context["comments"]
+    loaded = _ids(page)
+    url = reverse("blog:post_comments", args=[post.id])
+    while page.has_next():
+        response = client.get(url, {"cursor": page.next_cursor})
+        assert response.status_code == 200
+        assert "<html" not in response.content.decode()
+        page = response.context["comments"]
+        loaded += _ids(page)
+    assert loaded == _ids(comments)
+    assert "data-comments-url" not in response.content.decode()
+
+    # Без JavaScript та же страница открывается на странице поста
+    response = client.get(
+        reverse("blog:post_detail", args=[post.id]),
+        {"comments": page.previous_cursor},
+    )
+    assert _ids(response.context["comments"]) == _ids(comments[5:10])
+
+
+def test_detail_queries_do_not_grow_with_comments(
+    client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    url = reverse("blog:post_detail", args=[post.id])
+    _add_comments(mixer, post, 2)
+    with CaptureQueriesContext(connection) as quiet:
+        client.get(url)
+    _add_comments(mixer, post, 40)
+    with CaptureQueriesContext(connection) as busy:
+        response = client.get(url)
+    assert len(busy) == len(quiet)
+    assert len(response.context["comments"]) == PER_PAGE
+
+
+def test_fragment_errors(client, mixer, post_with_published_location):
+    post = post_with_published_location
+    url = reverse("blog:post_comments", args=[post.id])
+    assert client.get(url, {"cursor": "garbage"}).status_code == 404
+    post.is_published = False
+    post.save()
+    assert client.get(url).status_code == 404
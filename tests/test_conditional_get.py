@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+
+@pytest.fixture
+def urls(user, post_with_published_location):
+    post = post_with_published_location
+    return [
+        reverse("blog:index"),
+        reverse("blog:category_posts", args=[post.category.slug]),
+        reverse("blog:profile", args=[user.username]),
+        reverse("blog:post_detail", args=[post.id]),
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_repeat_visit_gets_304(request, client_name, urls):
+    client = request.getfixturevalue(client_name)
+    for url in urls:
+        client.get(url)  # Первый визит может выставить CSRF-cookie
+        etag = client.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, url
+        assert not response.content
+        # Не больше одного запроса к таблицам блога — только валидаторы
+        assert (
+            len([q for q in queries if '"blog_' in q["sql"]]) <= 1
+        ), url
+
+
+@pytest.mark.django_db
+def test_detail_last_modified(client, urls):
+    response = client.get(urls[-1])
+    response = client.get(
+        urls[-1], HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.django_db
+def test_etag_changes_with_content(
+    client, user_client, mixer, urls, post_with_published_location
+):
+    etags = {url: client.get(url)["ETag"] for url in urls}
+    mixer.blend("blog.Comment", post=post_with_published_location)
+    for url in urls:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == 200, url
+        assert response["ETag"] != etags[url]
+
+    # Разные пользователи получают разные валидаторы
+    for url in urls:
+        assert client.get(url)["ETag"] != user_client.get(url)["ETag"]
@@ -0,0 +1,100 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.models import Post
+from blog.paginators import estimate_table_count
+
+
+def _count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, [q for q in queries if "COUNT(*)" in q["sql"]]
+
+
+@pytest.mark.django_db
+def test_count_is_cached_and_invalidated(
+    client, mixer, user, published_category, many_posts_with_published_locations
+):
+    url = reverse("blog:index")
+    response, counts = _count_queries(client, url)
+    assert len(counts) == 1
+    total = response.context["paginator"].count
+
+    _, counts = _count_queries(client, url)
+    assert not counts
+
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now(),
+    )
+    response, counts = _count_queries(client, url)
+    assert len(counts) == 1
+    assert response.context["paginator"].count == total + 1
+
+
+@pytest.mark.django_db
+def test_counts_are_per_scope(
+    user_client, client, user, many_posts_with_published_locations
+):
+    Post.objects.filter(
+        pk=many_posts_with_published_locations[0].pk
+    ).update(is_published=False)
+    url = reverse("blog:profile", args=[user.username])
+    own = user_client.get(url).context["paginator"].count
+    public = client.get(url).context["paginator"].count
+    assert own == public + 1
+
+
+@pytest.mark.django_db
+@override_settings(
+    BLOG_COUNT_STRATEGY="estimated", BLOG_ESTIMATED_COUNT_THRESHOLD=1
+)
+def test_estimated_count_skips_count_query(
+    client, many_posts_with_published_locations
+):
+    response, counts = _count_queries(client, reverse("blog:index"))
+    assert not counts
+    assert response.context["paginator"].count >= 1
+
+
+@pytest.fixture
+def analyzed_posts(many_posts_with_published_locations):
+    # Частичный индекс post_published_pub_date_idx не содержит
+    # неопубликованную публикацию, поэтому его статистика занижена
+    Post.objects.filter(
+        pk=many_posts_with_published_locations[0].pk
+    ).update(is_published=False)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE blog_post")
+    return many_posts_with_published_locations
+
+
+@pytest.mark.django_db
+def test_estimate_ignores_partial_index_stats(analyzed_posts):
+    assert estimate_table_count(Post) == Post.objects.count()
+
+
+@pytest.mark.django_db
+@override_settings(
+    BLOG_COUNT_STRATEGY="estimated", BLOG_ESTIMATED_COUNT_THRESHOLD=1
+)
+def test_partial_index_stats_fall_back_to_count(client, analyzed_posts):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM sqlite_stat1 WHERE tbl = 'blog_post' "
+            "AND (idx IS NULL OR idx != 'post_published_pub_date_idx')"
+        )
+    assert estimate_table_count(Post) is None
+    response, counts = _count_queries(client, reverse("blog:index"))
+    assert len(counts) == 1
+    assert response.context["paginator"].count == Post.objects.filter(
+        is_published=True
+    ).count()
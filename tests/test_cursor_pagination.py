@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+N_POSTS = 25
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category):
+    now = timezone.now()
+    # Пары постов с одинаковым pub_date проверяют разрешение ничьих по id
+    dates = (now - timedelta(hours=i // 2) for i in range(1, N_POSTS + 1))
+    return mixer.cycle(N_POSTS).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=dates,
+    )
+
+
+def _walk(client, url, direction="next_cursor"):
+    response = client.get(url, {"cursor": ""})
+    assert response.status_code == 200
+    pages = [list(response.context["page_obj"])]
+    while getattr(response.context["page_obj"], direction):
+        response = client.get(
+            url, {"cursor": getattr(response.context["page_obj"], direction)}
+        )
+        assert response.status_code == 200
+        pages.append(list(response.context["page_obj"]))
+    return pages, response
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("view", ["index", "category_posts", "profile"])
+def test_cursor_pages_cover_feed(client, user, feed_posts, view):
+    kwargs = {
+        "index": {},
+        "category_posts": {"category_slug": feed_posts[0].category.slug},
+        "profile": {"username": user.username},
+    }[view]
+    url = reverse(f"blog:{view}", kwargs=kwargs)
+    pages, last_response = _walk(client, url)
+    posts = [post for page in pages for post in page]
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert len({post.id for post in posts}) == N_POSTS
+    assert posts == sorted(
+        posts, key=lambda post: (post.pub_date, post.id), reverse=True
+    )
+
+    # Обратный проход по previous_cursor возвращает те же страницы
+    page = last_response.context["page_obj"]
+    back = []
+    while page.has_previous():
+        page = client.get(url, {"cursor": page.previous_cursor}).context[
+            "page_obj"
+        ]
+        back.insert(0, list(page))
+    assert back == pages[:-1]
+
+
+@pytest.mark.django_db
+def test_cursor_page_does_not_count(client, feed_posts):
+    url = reverse("blog:index")
+    cursor = client.get(url, {"cursor": ""}).context["page_obj"].next_cursor
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url, {"cursor": cursor})
+    # Ни пагинатор, ни валидаторы условного GET не считают строки
+    assert not any("COUNT(" in query["sql"] for query in queries)
+    assert not any("OFFSET" in query["sql"] for query in queries)
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_is_404(client, feed_posts):
+    response = client.get(reverse("blog:index"), {"cursor": "not-a-cursor"})
+    assert response.status_code == 404
@@ -0,0 +1,111 @@
+from datetime import timedelta
+from xml.etree import ElementTree
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+@pytest.fixture
+def feed_posts(mixer, user, published_category, another_category):
+    def make(category, days, is_published=True):
+        return mixer.blend(
+            "blog.Post",
+            author=user,
+            category=category,
+            is_published=is_published,
+            pub_date=timezone.now() - timedelta(days=days),
+        )
+
+    return [
+        make(published_category, 1),
+        make(another_category, 2),
+        make(published_category, 3),
+        make(published_category, 0, is_published=False),
+    ]
+
+
+def _content(response):
+    assert response.streaming
+    return b"".join(response.streaming_content)
+
+
+def _rss_links(response):
+    root = ElementTree.fromstring(_content(response))
+    return [item.findtext("link") for item in root.iter("item")]
+
+
+def _post_url(post):
+    return "http://testserver" + reverse("blog:post_detail", args=[post.id])
+
+
+@pytest.mark.django_db
+def test_feed_scopes(client, user, published_category, feed_posts):
+    first, second, third, _ = feed_posts
+    response = client.get(reverse("blog:feed", args=["rss"]))
+    assert response["Content-Type"].startswith("application/rss+xml")
+    assert _rss_links(response) == [
+        _post_url(post) for post in (first, second, third)
+    ]
+    response = client.get(
+        reverse("blog:category_feed", args=[published_category.slug, "rss"])
+    )
+    assert _rss_links(response) == [_post_url(first), _post_url(third)]
+    response = client.get(
+        reverse("blog:author_feed", args=[user.username, "atom"])
+    )
+    root = ElementTree.fromstring(_content(response))
+    assert len(root.findall(f"{ATOM}entry")) == 3
+
+
+@pytest.mark.django_db
+def test_feed_unknown_scope_or_format(client, user):
+    assert client.get(reverse("blog:feed", args=["json"])).status_code == 404
+    assert client.get(
+        reverse("blog:category_feed", args=["missing", "rss"])
+    ).status_code == 404
+    assert client.get(
+        reverse("blog:author_feed", args=["missing", "rss"])
+    ).status_code == 404
+
+
+@pytest.mark.django_db
+def test_feed_conditional_get_and_cache(client, mixer, user, feed_posts):
+    url = reverse("blog:feed", args=["atom"])
+    response = client.get(url)
+    body = _content(response)
+    assert "Cookie" not in response.get("Vary", "")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
+    assert len(queries) == 1
+    with CaptureQueriesContext(connection) as queries:
+        assert _content(client.get(url)) == body
+    assert len(queries) == 1  # Тело ленты взято из кэша
+
+    post = feed_posts[0]
+    post.title = "Новый заголовок"
+    post.save()
+    assert "Новый заголовок".encode() in _content(client.get(url))
+
+
+@pytest.mark.django_db
+def test_feed_ignores_if_modified_since(client, feed_posts):
+    url = reverse("blog:feed", args=["rss"])
+    response = client.get(url)
+    _content(response)
+    assert not response.has_header("Last-Modified")
+
+    post = feed_posts[0]
+    post.title = "Заголовок после правки"
+    post.save()
+    response = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=http_date(timezone.now().timestamp())
+    )
+    assert response.status_code == 200
+    assert "Заголовок после правки".encode() in _content(response)
@@ -0,0 +1,200 @@
+from datetime import timedelta
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import is_processing
+from blog.models import Post
+from core.jobs import claim, release_stale, run_job
+from core.models import Job
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_IMAGE_PROCESSING = "background"
+    return tmp_path
+
+
+def _rotated_jpeg(width, height, name="photo.jpg"):
+    # Снимок «с камеры»: EXIF Orientation=6 (повернуть на 90° по часовой)
+    image = Image.new("RGB", (width, height), color=(200, 30, 30))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", exif=exif.tobytes())
+    return ImageFile(buffer, name=name)
+
+
+@pytest.fixture
+def post_with_photo(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=_rotated_jpeg(1200, 800),
+    )
+
+
+@pytest.mark.django_db
+def test_upload_enqueues_job_once(post_with_photo):
+    post = Post.objects.get(pk=post_with_photo.pk)
+    assert post.image_renditions == {}
+    post.title = "Другой заголовок"
+    post.save()
+    job = Job.objects.get()
+    assert job.status == Job.Status.PENDING
+    assert job.payload == {"post_id": post.pk, "name": post.image.name}
+
+
+@pytest.mark.django_db
+def test_placeholder_until_processed(client, post_with_photo):
+    url = reverse("blog:post_detail", args=[post_with_photo.pk])
+    content = client.get(url).content.decode()
+    assert "img/placeholder.svg" in content
+    assert "_320w.webp" not in content
+
+    assert claim(10) == [Job.objects.get().pk]
+    assert run_job(Job.objects.get().pk) == (Job.objects.get().pk, True)
+    assert Job.objects.get().status == Job.Status.DONE
+
+    for url in (url, reverse("blog:index")):
+        content = client.get(url).content.decode()
+        assert "img/placeholder.svg" not in content
+        assert "_320w.webp 320w" in content
+
+
+@pytest.mark.django_db
+def test_job_normalizes_image(post_with_photo):
+    run_job(claim(1)[0])
+    post = Post.objects.get(pk=post_with_photo.pk)
+    with default_storage.open(post.image.name) as file:
+        with Image.open(file) as image:
+            # Повёрнуто по EXIF, метаданные удалены
+            assert image.size == (800, 1200)
+            assert not image.getexif()
+    assert post.image_renditions["widths"] == [320, 640, 800]
+
+
+@pytest.mark.django_db
+def test_claimed_job_is_not_claimed_again(post_with_photo):
+    assert len(claim(10)) == 1
+    assert claim(10) == []
+
+
+@pytest.mark.django_db
+def test_failed_job_is_retried_then_failed(settings, post_with_photo):
+    settings.JOBS_MAX_ATTEMPTS = 2
+    default_storage.delete(post_with_photo.image.name)
+    pk = Job.objects.get().pk
+    for status in (Job.Status.PENDING, Job.Status.FAILED):
+        assert run_job(claim(1)[0]) == (pk, False)
+        job = Job.objects.get()
+        assert job.status == status
+        assert job.error
+    assert claim(1) == []
+
+
+@pytest.mark.django_db
+def test_failed_job_shows_original_image(
+    settings, client, post_with_photo
+):
+    settings.JOBS_MAX_ATTEMPTS = 1
+    settings.BLOG_PAGE_CACHE_TIMEOUT = 0
+    default_storage.delete(post_with_photo.image.name)
+    run_job(claim(1)[0])
+    post = Post.objects.get(pk=post_with_photo.pk)
+    assert post.image_renditions["failed"]
+    assert not is_processing(post)
+    html = client.get(
+        reverse("blog:post_detail", args=[post.pk])
+    ).content.decode()
+    assert post.image.url in html
+    assert "placeholder.svg" not in html
+
+
+def _upload(image, pillow_format, name, **params):
+    buffer = BytesIO()
+    image.save(buffer, format=pillow_format, **params)
+    return ImageFile(buffer, name=name)
+
+
+@pytest.mark.django_db
+def test_converted_image_gets_matching_extension(
+    settings, mixer, user, published_category
+):
+    settings.BLOG_IMAGE_MAX_SIDE = 100
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=_upload(Image.new("RGB", (300, 200)), "TIFF", "x.tif"),
+    )
+    original = post.image.name
+    run_job(claim(1)[0])
+    post = Post.objects.get(pk=post.pk)
+    assert post.image.name.endswith(".png")
+    with default_storage.open(post.image.name) as file:
+        with Image.open(file) as image:
+            assert image.format == "PNG"
+            assert image.size == (100, 67)
+    # Исходный файл удалён только после обновления поля
+    assert not default_storage.exists(original)
+
+
+@pytest.mark.django_db
+def test_mpo_is_saved_as_jpeg(settings, mixer, user, published_category):
+    settings.BLOG_IMAGE_MAX_SIDE = 100
+    frames = [Image.new("RGB", (300, 200)), Image.new("RGB", (300, 200))]
+    upload = _upload(
+        frames[0], "MPO", "phone.jpg", save_all=True,
+        append_images=frames[1:],
+    )
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=upload,
+    )
+    run_job(claim(1)[0])
+    post = Post.objects.get(pk=post.pk)
+    assert post.image.name.endswith(".jpg")
+    with default_storage.open(post.image.name) as file:
+        with Image.open(file) as image:
+            assert image.format == "JPEG"
+
+
+@pytest.mark.django_db
+def test_failed_save_keeps_upload(monkeypatch, post_with_photo):
+    name = post_with_photo.image.name
+
+    def broken(*args, **kwargs):
+        raise OSError("диск заполнен")
+
+    monkeypatch.setattr(default_storage, "save", broken)
+    assert run_job(claim(1)[0])[1] is False
+    assert default_storage.exists(name)
+    assert Post.objects.get(pk=post_with_photo.pk).image.name == name
+
+
+@pytest.mark.django_db
+def test_stale_job_fails_after_max_attempts(settings, post_with_photo):
+    settings.JOBS_MAX_ATTEMPTS = 2
+    for status in (Job.Status.PENDING, Job.Status.FAILED):
+        # Обработчик «упал» вместе с процессом: задача осталась running
+        claim(1)
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        assert release_stale(60) == 1
+        assert Job.objects.get().status == status
+    assert Job.objects.get().error
+    assert claim(1) == []
+    post = Post.objects.get(pk=post_with_photo.pk)
+    assert post.image_renditions["failed"]
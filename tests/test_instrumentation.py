@@ -0,0 +1,87 @@
+import json
+import logging
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.views import PostDetailView, PostListView
+from core import instrumentation
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def posts(mixer, user, published_category, published_location):
+    return mixer.cycle(15).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def test_server_timing_header(user_client, posts, settings):
+    settings.BLOG_SERVER_TIMING = True
+    response = user_client.get(reverse("blog:index"))
+    timing = response["Server-Timing"]
+    assert timing.startswith("db;dur=")
+    assert "tpl;dur=" in timing and "total;dur=" in timing
+    settings.BLOG_SERVER_TIMING = False
+    assert "Server-Timing" not in user_client.get(reverse("blog:index"))
+
+
+def test_request_log_line(user_client, posts, caplog, monkeypatch):
+    # Журнал не передаёт записи корневому логгеру, где их ловит caplog
+    monkeypatch.setattr(
+        logging.getLogger("blogicum.requests"), "propagate", True
+    )
+    with caplog.at_level(logging.INFO, logger="blogicum.requests"):
+        user_client.get(reverse("blog:post_detail", args=[posts[0].id]))
+    data = json.loads(caplog.records[-1].getMessage())
+    assert data["view"] == "blog:post_detail"
+    assert data["status"] == 200
+    assert data["budget"] == PostDetailView.query_budget
+    assert 0 < data["queries"] <= data["budget"]
+    assert data["render_ms"] > 0
+
+
+def test_budget_exceeded_fails_in_strict_mode(
+    user_client, posts, monkeypatch, settings
+):
+    monkeypatch.setattr(PostListView, "query_budget", 1)
+    with pytest.raises(instrumentation.QueryBudgetExceeded):
+        user_client.get(reverse("blog:index"))
+    settings.BLOG_QUERY_BUDGET_STRICT = False
+    assert user_client.get(reverse("blog:index")).status_code == 200
+
+
+def test_non_author_detail_stays_in_budget(another_user_client, posts):
+    # Раньше категория и место поста для чужого пользователя
+    # подгружались отдельными запросами
+    response = another_user_client.get(
+        reverse("blog:post_detail", args=[posts[0].id])
+    )
+    assert response.status_code == 200
+
+
+def test_duplicate_queries_are_counted(posts):
+    stats, token = instrumentation.start()
+    try:
+        with connection.cursor() as cursor:
+            for post in posts[:3]:
+                cursor.execute(
+                    "SELECT title FROM blog_post WHERE id = %s", [post.id]
+                )
+            cursor.execute(
+                "SELECT title FROM blog_post WHERE id = %s", [posts[0].id]
+            )
+    finally:
+        instrumentation.finish(token)
+    assert stats.queries == 4
+    assert stats.duplicates == 1
+    assert stats.similar == 4
@@ -0,0 +1,170 @@
+import pytest
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Comment, Post
+from blog.moderation import approve_comments, reject_comments
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def moderator_client(client, mixer):
+    moderator = mixer.blend("auth.User")
+    moderator.user_permissions.add(
+        Permission.objects.get(codename="change_comment")
+    )
+    client.force_login(moderator)
+    return client
+
+
+def _count(post):
+    return Post.objects.get(pk=post.pk).comment_count
+
+
+def _shown(client, post):
+    response = client.get(reverse("blog:post_detail", args=[post.id]))
+    return {comment.id for comment in response.context["comments"]}
+
+
+def test_pending_comment_visible_only_to_author(
+    mixer, user, client, user_client, another_user_client,
+    post_with_published_location,
+):
+    post = post_with_published_location
+    approved = mixer.blend(
+        "blog.Comment", post=post, is_approved=True
+    )
+    pending = mixer.blend(
+        "blog.Comment", post=post, author=user, is_approved=False
+    )
+    assert _shown(user_client, post) == {approved.id, pending.id}
+    assert _shown(another_user_client, post) == {approved.id}
+    assert _shown(client, post) == {approved.id}
+    api = client.get(reverse("blog:api_comments", args=[post.id])).json()
+    assert [row["id"] for row in api["results"]] == [approved.id]
+
+
+def test_counter_counts_only_approved(mixer, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, is_approved=False)
+    assert _count(post) == 0
+    comment.is_approved = True
+    comment.save()
+    assert _count(post) == 1
+    comment.is_approved = False
+    comment.save()
+    assert _count(post) == 0
+    comment.delete()
+    assert _count(post) == 0
+    mixer.blend("blog.Comment", post=post, is_approved=True).delete()
+    assert _count(post) == 0
+
+
+def test_bulk_approve_and_reject_are_single_statements(mixer, user):
+    posts = mixer.cycle(2).blend("blog.Post", author=user)
+    pending = [
+        mixer.blend("blog.Comment", post=post, is_approved=False)
+        for post in (posts[0], posts[0], posts[1])
+    ]
+    approved = mixer.blend("blog.Comment", post=posts[1], is_approved=True)
+    assert [_count(post) for post in posts] == [0, 1]
+
+    with CaptureQueriesContext(connection) as queries:
+        assert approve_comments([c.id for c in pending] + [approved.id]) == 3
+    updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+    assert len(updates) == 2
+    assert [_count(post) for post in posts] == [2, 2]
+
+    with CaptureQueriesContext(connection) as queries:
+        assert reject_comments([pending[0].id, approved.id]) == 2
+    sql = [q["sql"] for q in queries]
+    assert len([s for s in sql if s.startswith("DELETE")]) == 1
+    assert len([s for s in sql if s.startswith("UPDATE")]) == 1
+    assert [_count(post) for post in posts] == [1, 1]
+    assert not Comment.objects.filter(pk=approved.pk).exists()
+
+    # Счётчики совпадают с пересчётом с нуля
+    Post.objects.update(comment_count=0)
+    call_command("recount_comments", stdout=None)
+    assert [_count(post) for post in posts] == [1, 1]
+
+
+def test_moderation_queue(
+    mixer, user_client, moderator_client, post_with_published_location
+):
+    post = post_with_published_location
+    pending = mixer.cycle(3).blend(
+        "blog.Comment", post=post, is_approved=False
+    )
+    mixer.blend("blog.Comment", post=post, is_approved=True)
+    url = reverse("blog:comment_moderation")
+    assert user_client.get(url).status_code == 403
+
+    response = moderator_client.get(url)
+    assert [c.id for c in response.context["page_obj"]] == [
+        c.id for c in pending
+    ]
+    response = moderator_client.post(
+        url, {"action": "approve", "comment": [pending[0].id, pending[1].id]}
+    )
+    assert response.status_code == 302
+    response = moderator_client.post(
+        url, {"action": "reject", "comment": [pending[2].id]}
+    )
+    assert response.status_code == 302
+    assert Comment.objects.filter(is_approved=False).count() == 0
+    assert _count(post) == 3
+    assert moderator_client.post(url, {"action": "drop"}).status_code == 400
+
+
+def test_admin_actions(admin_client, mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(2).blend(
+        "blog.Comment", post=post, is_approved=False
+    )
+    admin_client.post(
+        reverse("admin:blog_comment_changelist"),
+        {
+            "action": "approve",
+            "_selected_action": [comment.id for comment in comments],
+        },
+    )
+    assert _count(post) == 2
+
+
+@pytest.mark.parametrize("premoderation", [True, False])
+def test_premoderation_setting(
+    settings, user_client, post_with_published_location, premoderation
+):
+    settings.BLOG_COMMENT_PREMODERATION = premoderation
+    post = post_with_published_location
+    user_client.post(
+        reverse("blog:add_comment", args=[post.id]), {"text": "Комментарий"}
+    )
+    comment = Comment.objects.get(post=post)
+    assert comment.is_approved is not premoderation
+    assert _count(post) == (0 if premoderation else 1)
+
+
+def test_drifted_counter_is_not_negative(mixer, post_with_published_location):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, is_approved=True)
+    Post.objects.filter(pk=post.pk).update(comment_count=0)
+    assert reject_comments([comment.id]) == 1
+    assert _count(post) == 0
+
+
+def test_header_link_follows_permission(
+    mixer, moderator_client, post_with_published_location
+):
+    url = reverse("blog:comment_moderation")
+    staff_client = Client()
+    staff_client.force_login(mixer.blend("auth.User", is_staff=True))
+    content = staff_client.get(reverse("blog:index")).content.decode()
+    assert url not in content
+    assert url in moderator_client.get(reverse("blog:index")).content.decode()
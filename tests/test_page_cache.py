@@ -0,0 +1,114 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import translation
+from django.utils.formats import date_format
+
+from blog.models import Post
+
+
+@pytest.fixture
+def list_urls(user, post_with_published_location):
+    return [
+        reverse("blog:index"),
+        reverse(
+            "blog:category_posts",
+            args=[post_with_published_location.category.slug],
+        ),
+        reverse("blog:profile", args=[user.username]),
+    ]
+
+
+def _get(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response.content.decode(), len(queries)
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_are_cached(client, list_urls):
+    for url in list_urls:
+        first, _ = _get(client, url)
+        second, n_queries = _get(client, url)
+        assert second == first
+        assert n_queries == 0, url
+
+
+@pytest.mark.django_db
+def test_authenticated_pages_are_not_cached(client, user_client, list_urls):
+    for url in list_urls:
+        _get(client, url)
+        content, n_queries = _get(user_client, url)
+        assert n_queries > 0, url
+        assert "Выйти" in content
+
+
+@pytest.mark.django_db
+def test_pages_are_invalidated_by_tags(
+    client, mixer, list_urls, post_with_published_location
+):
+    post = post_with_published_location
+    for url in list_urls:
+        _get(client, url)
+
+    post.title = "Заголовок после правки"
+    post.save()
+    for url in list_urls:
+        content, _ = _get(client, url)
+        assert "Заголовок после правки" in content, url
+
+    mixer.blend("blog.Comment", post=post, is_approved=True)
+    for url in list_urls:
+        content, _ = _get(client, url)
+        assert "Комментарии (1)" in content, url
+
+
+@pytest.mark.django_db
+def test_unknown_parameters_share_cached_page(client, list_urls):
+    for url in list_urls:
+        first, _ = _get(client, url)
+        second, n_queries = _get(client, url + "?utm_source=mail&utm_x=1")
+        assert n_queries == 0, url
+        assert second == first
+
+
+@pytest.mark.django_db
+def test_pages_are_cached_per_language(client, list_urls):
+    post = Post.objects.get()
+
+    def month(language):
+        with translation.override(language):
+            return date_format(post.pub_date, "E Y")
+
+    for url in list_urls:
+        english = client.get(url, HTTP_ACCEPT_LANGUAGE="en")
+        assert month("en") in english.content.decode(), url
+        russian = client.get(url, HTTP_ACCEPT_LANGUAGE="ru")
+        assert month("ru") in russian.content.decode(), url
+        with CaptureQueriesContext(connection) as queries:
+            cached = client.get(url, HTTP_ACCEPT_LANGUAGE="ru")
+        assert not queries, url
+        assert "Accept-Language" in cached["Vary"], url
+        assert "Cookie" in cached["Vary"], url
+
+
+@pytest.mark.django_db
+def test_page_parameter_is_part_of_key(
+    client, many_posts_with_published_locations
+):
+    url = reverse("blog:index")
+    first, _ = _get(client, url)
+    second, n_queries = _get(client, url + "?page=2")
+    assert n_queries > 0
+    assert first != second
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_page_cache_can_be_disabled(client, list_urls):
+    _get(client, list_urls[0])
+    _, n_queries = _get(client, list_urls[0])
+    assert n_queries > 0
@@ -0,0 +1,61 @@
+import pytest
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import translation
+from django.utils.formats import date_format
+
+from blog.models import Post
+
+
+def _index(client):
+    return client.get(reverse("blog:index")).content.decode()
+
+
+@pytest.mark.django_db
+def test_card_is_served_from_cache(client, post_with_published_location):
+    post = post_with_published_location
+    assert post.title in _index(client)
+    # update() не трогает updated_at — карточка остаётся в кэше
+    Post.objects.filter(pk=post.pk).update(title="Совсем новый заголовок")
+    assert "Совсем новый заголовок" not in _index(client)
+
+    post.refresh_from_db()
+    post.save()
+    assert "Совсем новый заголовок" in _index(client)
+
+
+@pytest.mark.django_db
+def test_card_follows_comments_and_location(
+    client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    assert "Комментарии (0)" in _index(client)
+    mixer.blend("blog.Comment", post=post, is_approved=True)
+    assert "Комментарии (1)" in _index(client)
+
+    assert post.location.name in _index(client)
+    post.location.is_published = False
+    post.location.save()
+    assert post.location.name not in _index(client)
+
+
+@pytest.mark.django_db
+def test_card_follows_author_profile(client, user, post_with_published_location):
+    assert f"@{user.username}" in _index(client)
+    user.username = "renamed_author"
+    user.save()
+    assert "@renamed_author" in _index(client)
+
+
+@pytest.mark.django_db
+@override_settings(BLOG_PAGE_CACHE_TIMEOUT=0)
+def test_card_is_cached_per_language(client, post_with_published_location):
+    def month(language):
+        with translation.override(language):
+            return date_format(post_with_published_location.pub_date, "E Y")
+
+    url = reverse("blog:index")
+    english = client.get(url, HTTP_ACCEPT_LANGUAGE="en").content.decode()
+    assert month("en") in english
+    russian = client.get(url, HTTP_ACCEPT_LANGUAGE="ru").content.decode()
+    assert month("ru") in russian
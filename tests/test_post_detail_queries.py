@@ -0,0 +1,48 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+
+def _post_queries(client, post):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("blog:post_detail", args=[post.id]))
+    return response, [
+        q["sql"] for q in queries if 'FROM "blog_post"' in q["sql"]
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_detail_loads_post_in_one_query(
+    request, client_name, post_with_published_location, mixer
+):
+    client = request.getfixturevalue(client_name)
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post=post, is_approved=True)
+    response, post_queries = _post_queries(client, post)
+    assert response.status_code == 200
+    assert len(post_queries) == 1
+    assert response.context["post"].comment_count == 2
+
+    # Автор, категория и место уже загружены вместе с постом
+    with CaptureQueriesContext(connection) as queries:
+        obj = response.context["post"]
+        obj.author.username, obj.category.slug, obj.location.name
+    assert not queries
+
+
+@pytest.mark.django_db
+def test_hidden_post_visible_only_to_author(
+    client, user_client, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.pub_date = timezone.now() + timedelta(days=1)
+    post.save()
+    url = reverse("blog:post_detail", args=[post.id])
+    assert user_client.get(url).status_code == 200
+    assert another_user_client.get(url).status_code == 404
+    assert client.get(url).status_code == 404
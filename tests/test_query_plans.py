@@ -0,0 +1,80 @@
+import re
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import Post
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN есть только в SQLite"
+)
+
+
+def explain(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ordering", [("-pub_date",), ("-pub_date", "-id")])
+def test_published_feed_uses_index(ordering):
+    plan = explain(
+        Post.objects.published().with_related().order_by(*ordering)[:10]
+    )
+    assert any(
+        "blog_post USING INDEX post_published_pub_date_idx" in step
+        for step in plan
+    ), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+BAD_STEP = re.compile(r"^SCAN (blog_\w+)$|TEMP B-TREE")
+
+
+def view_plans(client, url):
+    # Все SELECT к таблицам блога, выполненные при обработке запроса,
+    # вместе с их планами
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, url
+    plans = []
+    for query in queries:
+        sql = query["sql"]
+        if not sql.startswith("SELECT") or '"blog_' not in sql:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+    assert plans, url
+    return plans
+
+
+@pytest.fixture
+def hot_urls(user, post_with_published_location, mixer):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    return [
+        reverse("blog:index"),
+        reverse("blog:index") + "?cursor=",
+        reverse("blog:category_posts", args=[post.category.slug]),
+        reverse("blog:category_posts", args=[post.category.slug]) + "?cursor=",
+        reverse("blog:profile", args=[user.username]),
+        reverse("blog:profile", args=[user.username]) + "?cursor=",
+        reverse("blog:post_detail", args=[post.id]),
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_views_do_not_scan_or_sort(request, client_name, hot_urls):
+    client = request.getfixturevalue(client_name)
+    cache.clear()  # Иначе COUNT(*) мог быть взят из кэша
+    for url in hot_urls:
+        for sql, plan in view_plans(client, url):
+            bad = [step for step in plan if BAD_STEP.search(step)]
+            assert not bad, f"{url}: {bad}\n{sql}\n{plan}"
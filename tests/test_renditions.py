@@ -0,0 +1,81 @@
+from io import BytesIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+
+from blog.images import rendition_name
+from blog.models import Post
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.BLOG_IMAGE_PROCESSING = "inline"
+    return tmp_path
+
+
+def _image_file(width, height, name="big.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(10, 120, 200)).save(
+        buffer, format="JPEG"
+    )
+    return ImageFile(buffer, name=name)
+
+
+@pytest.fixture
+def post_with_big_image(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        image=_image_file(1500, 1000),
+    )
+
+
+@pytest.mark.django_db
+def test_renditions_created_on_upload(post_with_big_image):
+    post = Post.objects.get(pk=post_with_big_image.pk)
+    assert post.image_renditions["widths"] == [320, 640, 1024]
+    for width in (320, 640, 1024):
+        for extension in ("webp", "jpg"):
+            name = rendition_name(post.image.name, width, extension)
+            assert default_storage.exists(name)
+            with default_storage.open(name) as file, Image.open(file) as image:
+                assert image.width == width
+
+
+@pytest.mark.django_db
+def test_small_image_is_not_upscaled(mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image=_image_file(200, 100, "small.jpg"),
+    )
+    post.refresh_from_db()
+    assert post.image_renditions["widths"] == [200]
+
+
+@pytest.mark.django_db
+def test_pages_use_srcset(client, post_with_big_image):
+    for url in (
+        reverse("blog:index"),
+        reverse("blog:post_detail", args=[post_with_big_image.id]),
+    ):
+        content = client.get(url).content.decode()
+        assert 'type="image/webp"' in content
+        assert "_320w.webp 320w" in content
+        assert "_1024w.jpg 1024w" in content
+
+
+@pytest.mark.django_db
+def test_backfill_command(post_with_big_image):
+    Post.objects.update(image_renditions={})
+    call_command("build_renditions", workers=2, batch_size=1)
+    post = Post.objects.get(pk=post_with_big_image.pk)
+    assert post.image_renditions["widths"] == [320, 640, 1024]
@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connections
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.middleware import STICKY_COOKIE
+from core.routers import sync_sqlite_replicas
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def replica(tmp_path, settings):
+    # Вторая SQLite-база; данные в неё попадают только через sync_sqlite_replicas
+    connections.databases["replica1"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": str(tmp_path / "replica.sqlite3"),
+    }
+    settings.DATABASE_REPLICAS = ["replica1"]
+    # Нулевое окно: посчитанное по реплике не кэшируется, и после
+    # синхронизации страница сразу видит новые данные
+    settings.DATABASE_REPLICA_STICKY_SECONDS = 0
+    sync_sqlite_replicas()
+    yield
+    connections["replica1"].close()
+    del connections["replica1"]
+    del connections.databases["replica1"]
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(**kwargs):
+        return mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+            **kwargs,
+        )
+
+    return make
+
+
+def test_list_reads_from_replica(replica, client, make_post):
+    post = make_post()
+    url = reverse("blog:index")
+    assert post not in client.get(url).context["page_obj"]
+    sync_sqlite_replicas()
+    assert post in client.get(url).context["page_obj"]
+
+
+def test_author_sees_own_comment_after_write(
+    replica, user_client, make_post, settings
+):
+    settings.DATABASE_REPLICA_STICKY_SECONDS = 10
+    post = make_post()
+    sync_sqlite_replicas()
+    detail_url = reverse("blog:post_detail", args=[post.id])
+    response = user_client.post(
+        reverse("blog:add_comment", args=[post.id]), {"text": "Свежий"}
+    )
+    assert STICKY_COOKIE in response.cookies
+    assert "Свежий" in user_client.get(detail_url).content.decode()
+
+
+def test_sticky_window_expires(replica, user_client, make_post):
+    post = make_post()
+    sync_sqlite_replicas()
+    with override_settings(DATABASE_REPLICA_STICKY_SECONDS=-1):
+        user_client.post(
+            reverse("blog:add_comment", args=[post.id]), {"text": "Свежий"}
+        )
+    response = user_client.get(reverse("blog:post_detail", args=[post.id]))
+    assert "Свежий" not in response.content.decode()
+
+
+def test_write_views_use_primary(replica, user_client, make_post):
+    # Форма редактирования читает пост из основной БД, а не с реплики
+    post = make_post()
+    response = user_client.get(reverse("blog:edit_post", args=[post.id]))
+    assert response.status_code == 200
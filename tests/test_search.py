@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+from django.urls import reverse
+
+from blog.models import Post
+from blog.search import (
+    TRIGGERS_SQL,
+    ensure_search_index,
+    match_expression,
+    pg_tsquery,
+    search_posts,
+)
+
+pytestmark = pytest.mark.django_db
+sqlite_only = pytest.mark.skipif(
+    connection.vendor != "sqlite", reason="FTS5 есть только в SQLite"
+)
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    def make(title, text, is_published=True):
+        return mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=is_published,
+            pub_date=timezone.now() - timedelta(days=1),
+            title=title,
+            text=text,
+        )
+
+    return {
+        "title": make("Осенний лес", "Прогулка по парку"),
+        "text": make("Прогулка", "Жёлтые листья, осенний лес и река"),
+        "other": make("Город", "Шумные улицы"),
+        "hidden": make("Осенний лес", "Черновик", is_published=False),
+    }
+
+
+def test_match_expression_quotes_user_input():
+    assert match_expression('лес" OR NEAR(a b) *') == '"лес" "OR" "NEAR" "a" "b"*'
+    assert match_expression("  ...  ") == ""
+
+
+def test_pg_tsquery_escapes_operators():
+    assert pg_tsquery("лес & !река | (a:*)") == "лес & река & a:*"
+    assert pg_tsquery("  ...  ") == ""
+
+
+def test_search_ranks_title_matches_first(posts):
+    found = list(search_posts(Post.objects.published(), "осенний лес"))
+    assert found == [posts["title"], posts["text"]]
+
+
+def test_index_follows_updates_and_deletes(posts):
+    Post.objects.filter(pk=posts["other"].pk).update(text="Осенний дождь")
+    assert posts["other"] in search_posts(Post.objects.all(), "дождь")
+    posts["title"].delete()
+    assert list(search_posts(Post.objects.published(), "парку")) == []
+
+
+def test_search_prefix_matches_last_word(posts):
+    assert list(search_posts(Post.objects.published(), "шумн")) == [
+        posts["other"]
+    ]
+
+
+def test_search_view(client, posts):
+    url = reverse("blog:search")
+    response = client.get(url, {"q": "лес"})
+    assert response.status_code == 200
+    assert list(response.context["page_obj"]) == [
+        posts["title"],
+        posts["text"],
+    ]
+    assert client.get(url).status_code == 200
+    assert not client.get(url, {"q": "*"}).context["page_obj"]
+
+
+@sqlite_only
+def test_search_uses_fts_index(posts):
+    queryset = search_posts(Post.objects.published(), "лес")
+    with connection.cursor() as cursor:
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+    assert "VIRTUAL TABLE INDEX" in plan
+    assert "SCAN blog_post " not in plan + " "
+
+
+def test_admin_search_uses_index(admin_client, posts):
+    response = admin_client.get(
+        reverse("admin:blog_post_changelist"), {"q": "листья"}
+    )
+    assert list(response.context["cl"].result_list) == [posts["text"]]
+
+
+@sqlite_only
+def test_missing_triggers_are_restored(posts):
+    with connection.cursor() as cursor:
+        for name in TRIGGERS_SQL:
+            cursor.execute(f"DROP TRIGGER {name}")
+    ensure_search_index()
+    Post.objects.filter(pk=posts["other"].pk).update(title="Осенний дождь")
+    assert posts["other"] in search_posts(Post.objects.all(), "дождь")
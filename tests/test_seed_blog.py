@@ -0,0 +1,127 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post
+
+pytestmark = pytest.mark.django_db
+
+SIZES = [
+    "--users=10",
+    "--categories=4",
+    "--locations=3",
+    "--posts=200",
+    "--comments=1000",
+]
+
+
+def seed_blog(*args):
+    out = StringIO()
+    call_command("seed_blog", *SIZES, *args, stdout=out)
+    return out.getvalue()
+
+
+def snapshot():
+    # Строки последнего запуска со сдвигом id к началу: при повторном
+    # заполнении id продолжаются после уже существующих
+    first_user = get_user_model().objects.order_by("-id")[9].id
+    first_post = Post.objects.order_by("id").first().id
+    first_comment = Comment.objects.order_by("id").first().id
+    posts = [
+        (id - first_post, author_id - first_user, category_id, count)
+        for id, author_id, category_id, count in Post.objects.order_by(
+            "id"
+        ).values_list("id", "author_id", "category_id", "comment_count")
+    ]
+    comments = [
+        (id - first_comment, post_id - first_post, text)
+        for id, post_id, text in Comment.objects.order_by("id").values_list(
+            "id", "post_id", "text"
+        )
+    ]
+    return posts, comments
+
+
+def test_seed_counts_and_report():
+    output = seed_blog()
+    assert "строк/с" in output
+    assert get_user_model().objects.count() == 10
+    assert Category.objects.count() == 4
+    assert Post.objects.count() == 200
+    assert Comment.objects.count() == 1000
+    actual = dict(
+        Post.objects.annotate(total=Count("comments")).values_list(
+            "id", "total"
+        )
+    )
+    stored = dict(Post.objects.values_list("id", "comment_count"))
+    assert actual == stored
+
+
+def test_distributions():
+    seed_blog("--future-share=0.5", "--comment-skew=1.5")
+    now = timezone.now()
+    future = Post.objects.filter(pub_date__gt=now).count()
+    assert 60 < future < 140
+    hottest = Post.objects.order_by("-comment_count").first()
+    assert hottest.comment_count > 100
+    # Комментарии не старше публикации и идут по времени
+    comments = list(
+        hottest.comments.order_by("id").values_list("created_at", flat=True)
+    )
+    assert comments == sorted(comments)
+    assert comments[0] >= min(hottest.pub_date, now)
+
+
+def test_appends_to_existing_data():
+    seed_blog()
+    seed_blog("--seed=1")
+    assert Post.objects.count() == 400
+    assert get_user_model().objects.filter(username="seed20").exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_process_pool_gives_same_rows():
+    seed_blog()
+    expected = snapshot()
+    Post.objects.all().delete()
+    Category.objects.all().delete()
+    seed_blog("--workers=2")
+    assert snapshot() == expected
+
+
+def test_empty_tables_are_allowed():
+    call_command(
+        "seed_blog", "--users=5", "--posts=0", "--comments=0",
+        stdout=StringIO(),
+    )
+    call_command(
+        "seed_blog", "--categories=0", "--posts=10", "--comments=20",
+        stdout=StringIO(),
+    )
+    assert Post.objects.count() == 10
+    assert not Post.objects.filter(category__isnull=False).exists()
+    assert Comment.objects.count() == 20
+
+
+def test_invalid_sizes_leave_no_rows():
+    with pytest.raises(CommandError):
+        call_command(
+            "seed_blog", "--users=0", "--posts=10", stdout=StringIO()
+        )
+    assert not Category.objects.exists()
+
+
+def test_failed_run_is_rolled_back(monkeypatch):
+    def broken(task):
+        raise RuntimeError("сбой генерации")
+
+    monkeypatch.setattr("blog.seed_rows.generate", broken)
+    with pytest.raises(RuntimeError):
+        call_command("seed_blog", *SIZES, stdout=StringIO())
+    assert not get_user_model().objects.exists()
+    assert not Category.objects.exists()
@@ -0,0 +1,117 @@
+import gzip
+from datetime import datetime
+from xml.etree import ElementTree
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.sitemaps import build_sitemaps
+
+NS = {"s": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+BASE = "https://blog.example"
+
+
+@pytest.fixture(autouse=True)
+def sitemap_root(settings, tmp_path):
+    settings.SITEMAP_ROOT = tmp_path
+    settings.SITEMAP_BASE_URL = BASE
+    return tmp_path
+
+
+@pytest.fixture
+def dated_posts(mixer, user, published_category):
+    def make(year, month, is_published=True):
+        return mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=is_published,
+            pub_date=timezone.make_aware(datetime(year, month, 10)),
+        )
+
+    return {
+        "january": make(2024, 1),
+        "february": make(2024, 2),
+        "february_2": make(2024, 2),
+        "hidden": make(2024, 3, is_published=False),
+    }
+
+
+def _locations(path):
+    with gzip.open(path) as file:
+        root = ElementTree.parse(file).getroot()
+    return [loc.text for loc in root.findall("s:url/s:loc", NS)]
+
+
+def _post_url(post):
+    return BASE + reverse("blog:post_detail", args=[post.id])
+
+
+@pytest.mark.django_db
+def test_build_sitemaps(
+    sitemap_root, dated_posts, user, another_user, mixer, published_category
+):
+    mixer.blend(
+        "blog.Post",
+        author=another_user,
+        category=published_category,
+        is_published=False,
+    )
+    call_command("build_sitemaps")
+    index = ElementTree.parse(sitemap_root / "sitemap.xml").getroot()
+    shards = [loc.text for loc in index.findall("s:sitemap/s:loc", NS)]
+    assert shards == [
+        BASE + "/sitemaps/categories-1.xml.gz",
+        BASE + "/sitemaps/profiles-1.xml.gz",
+        BASE + "/sitemaps/posts-2024-01-1.xml.gz",
+        BASE + "/sitemaps/posts-2024-02-1.xml.gz",
+    ]
+    assert _locations(sitemap_root / "posts-2024-02-1.xml.gz") == [
+        _post_url(dated_posts["february"]),
+        _post_url(dated_posts["february_2"]),
+    ]
+    assert _locations(sitemap_root / "categories-1.xml.gz") == [
+        BASE + reverse("blog:category_posts", args=[published_category.slug])
+    ]
+    # У another_user только неопубликованная публикация
+    assert _locations(sitemap_root / "profiles-1.xml.gz") == [
+        BASE + reverse("blog:profile", args=[user.username])
+    ]
+
+
+@pytest.mark.django_db
+def test_incremental_rebuild(sitemap_root, dated_posts):
+    assert build_sitemaps(BASE)["rebuilt"] == ["2024-01", "2024-02"]
+    assert build_sitemaps(BASE)["rebuilt"] == []
+
+    post = dated_posts["january"]
+    post.title = "Исправленный заголовок"
+    post.save()
+    assert build_sitemaps(BASE)["rebuilt"] == ["2024-01"]
+
+    dated_posts["february"].delete()
+    dated_posts["february_2"].delete()
+    result = build_sitemaps(BASE)
+    assert result == {"rebuilt": [], "removed": ["2024-02"]}
+    assert not (sitemap_root / "posts-2024-02-1.xml.gz").exists()
+    assert build_sitemaps(BASE, force=True)["rebuilt"] == ["2024-01"]
+
+
+@pytest.mark.django_db
+def test_large_month_is_split(monkeypatch, sitemap_root, dated_posts):
+    monkeypatch.setattr("blog.sitemaps.MAX_URLS", 1)
+    build_sitemaps(BASE)
+    assert _locations(sitemap_root / "posts-2024-02-2.xml.gz") == [
+        _post_url(dated_posts["february_2"])
+    ]
+
+
+@pytest.mark.django_db
+def test_sitemaps_are_served(client, dated_posts):
+    build_sitemaps(BASE)
+    assert client.get("/sitemap.xml").status_code == 200
+    response = client.get("/sitemaps/posts-2024-01-1.xml.gz")
+    assert response.status_code == 200
+    assert client.get("/sitemaps/manifest.json").status_code == 404
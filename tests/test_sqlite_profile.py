@@ -0,0 +1,57 @@
+import pytest
+from django.db.utils import ConnectionHandler
+
+from blogicum.db import database_settings
+
+# Без метки pytest-django запрещает любые соединения, даже к отдельной БД
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def connect(tmp_path):
+    handlers = []
+
+    def make(**env):
+        handler = ConnectionHandler({"default": database_settings(tmp_path, env)})
+        handlers.append(handler)
+        return handler["default"]
+
+    yield make
+    for handler in handlers:
+        handler.close_all()
+
+
+def pragma(connection, name):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {name}")
+        return cursor.fetchone()[0]
+
+
+def test_production_profile_applies_pragmas(connect):
+    connection = connect(DB_PROFILE="sqlite-production", DB_BUSY_TIMEOUT="2500")
+    assert pragma(connection, "journal_mode") == "wal"
+    assert pragma(connection, "synchronous") == 1  # NORMAL
+    assert pragma(connection, "temp_store") == 2  # MEMORY
+    assert pragma(connection, "cache_size") == -64 * 1024
+    assert pragma(connection, "busy_timeout") == 2500
+
+
+def test_default_profile_keeps_sqlite_defaults(connect):
+    connection = connect()
+    assert pragma(connection, "journal_mode") == "delete"
+    assert pragma(connection, "synchronous") == 2  # FULL
+
+
+@pytest.mark.parametrize(
+    "env",
+    [
+        {"DB_PROFILE": "fast"},
+        {
+            "DATABASE_URL": "postgres://localhost/blogicum",
+            "DB_PROFILE": "sqlite-production",
+        },
+    ],
+)
+def test_invalid_profile(tmp_path, env):
+    with pytest.raises(ValueError):
+        database_settings(tmp_path, env=env)
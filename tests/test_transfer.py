@@ -0,0 +1,83 @@
+import gzip
+import json
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+
+from blog.models import Category, Comment, Location, Post
+
+pytestmark = pytest.mark.django_db
+
+MODELS = (get_user_model(), Category, Location, Post, Comment)
+
+
+@pytest.fixture
+def blog_data():
+    call_command(
+        "seed_blog",
+        "--users=6",
+        "--categories=3",
+        "--locations=2",
+        "--posts=40",
+        "--comments=120",
+        stdout=StringIO(),
+    )
+
+
+def rows():
+    return {
+        model: list(model.objects.order_by("pk").values())
+        for model in MODELS
+    }
+
+
+def clear():
+    for model in reversed(MODELS):
+        model.objects.all().delete()
+
+
+@pytest.mark.parametrize("name", ["blog.jsonl", "blog.jsonl.gz"])
+def test_round_trip_keeps_rows_and_pks(blog_data, tmp_path, name):
+    path = tmp_path / name
+    expected = rows()
+    call_command("export_blog", str(path), "--chunk-size=7", stdout=StringIO())
+    clear()
+    out = StringIO()
+    call_command("import_blog", str(path), "--batch-size=9", stdout=out)
+    assert "Загружено строк: 171" in out.getvalue()
+    assert rows() == expected
+
+
+def test_dump_is_ordered_by_dependencies(blog_data, tmp_path):
+    path = tmp_path / "blog.jsonl.gz"
+    call_command("export_blog", str(path), stdout=StringIO())
+    with gzip.open(path, "rt", encoding="utf-8") as dump:
+        header = json.loads(next(dump))
+        labels = [json.loads(line)["model"] for line in dump]
+    assert header["models"] == [
+        "auth.user", "blog.category", "blog.location", "blog.post",
+        "blog.comment",
+    ]
+    # Модели идут блоками в порядке заголовка
+    assert labels == sorted(labels, key=header["models"].index)
+
+
+def test_conflicts(blog_data, tmp_path):
+    path = tmp_path / "blog.jsonl"
+    call_command("export_blog", str(path), stdout=StringIO())
+    call_command(
+        "import_blog", str(path), "--ignore-conflicts", stdout=StringIO()
+    )
+    assert Post.objects.count() == 40
+    with pytest.raises(IntegrityError):
+        call_command("import_blog", str(path), stdout=StringIO())
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "db.json"
+    path.write_text('[{"model": "blog.post"}]\n')
+    with pytest.raises(CommandError):
+        call_command("import_blog", str(path), stdout=StringIO())